@@ -33,10 +33,13 @@ class TaeinClient(object):
         self,
         *,
         client_delay: typing.Optional[str] = None,
-        proxy: typing.Optional[str] = None
+        proxy: typing.Optional[str] = None,
+        trim: bool = False
     ) -> None:
         super().__init__()
         self.client_delay = client_delay
+        # 통계/낙찰사례 페이지의 trimmed_data 를 만듭니다
+        self.trim = trim
 
         # Header Settings
         self.session = BaseUrlSession("https://www.taein.co.kr/")
@@ -263,7 +266,7 @@ class TaeinClient(object):
             )
         )
 
-        return TaeinStatisticsResponse.from_html(response)
+        return TaeinStatisticsResponse.from_html(response, self.trim)
 
     def fetch_bid_list_page(
         self,
@@ -346,4 +349,4 @@ class TaeinClient(object):
             )
         )
 
-        return TaeinBidResponse.from_html(response)
+        return TaeinBidResponse.from_html(response, self.trim)
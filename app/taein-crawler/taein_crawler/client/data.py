@@ -5,12 +5,63 @@ import attr
 import bs4
 
 
+TRIMMED_HTML_TEMPLATE = (
+    '<html><head><meta charset="utf-8"/></head><body>{}</body></html>'
+)
+
+#: 낙찰사례 결과 테이블에만 있는 머리글
+BID_RESULT_HEADER = "사건번호"
+
+
 class TaeinData(metaclass=ABCMeta):
     @abstractmethod
     def to_html(self) -> str:
         pass
 
 
+def trim_html(
+    data: str, fragments: typing.List[typing.Optional[bs4.Tag]]
+) -> str:
+    """
+    필요한 fragment 만 남긴 최소한의 html 문서를 만듭니다. 다른 fragment
+    안에 포함된 fragment 는 한 번만 넣고, 찾지 못한 경우 원본을 그대로
+    반환합니다.
+    """
+    fragments = [x for x in fragments if x is not None]
+    if not fragments:
+        return data
+
+    top_level_fragments = [
+        fragment
+        for fragment in fragments
+        if not any(
+            parent is other
+            for other in fragments
+            for parent in fragment.parents
+        )
+    ]
+    return TRIMMED_HTML_TEMPLATE.format(
+        "".join(str(x) for x in top_level_fragments)
+    )
+
+
+def find_bid_result_tables(soup: bs4.BeautifulSoup) -> typing.List[bs4.Tag]:
+    """
+    낙찰사례 결과 테이블(사건번호 머리글이 있는 가장 안쪽 테이블)을
+    찾습니다. 찾지 못하면 모든 테이블을 반환합니다.
+    """
+    tables = soup.find_all("table")
+    result_tables = [
+        table
+        for table in tables
+        if BID_RESULT_HEADER in table.get_text()
+        and not any(
+            BID_RESULT_HEADER in x.get_text() for x in table.find_all("table")
+        )
+    ]
+    return result_tables or tables
+
+
 @attr.s
 class TaeinGugun(TaeinData):
     gugun_name: str = attr.ib()
@@ -133,9 +184,13 @@ class TaeinStatisticsResponse(TaeinData):
     bid_total_page: int = attr.ib()
     dong_statistics_exist: bool = attr.ib()
     raw_data: str = attr.ib()
+    #: trim 하지 않으면 None
+    trimmed_data: typing.Optional[str] = attr.ib(default=None)
 
     @classmethod
-    def from_html(cls, data: str) -> "TaeinStatisticsResponse":
+    def from_html(
+        cls, data: str, trim: bool = False
+    ) -> "TaeinStatisticsResponse":
         soup = bs4.BeautifulSoup(data, "lxml")
         statistics_div = soup.find(
             "div", attrs={"class": "stdata_area prt_area"}
@@ -164,11 +219,18 @@ class TaeinStatisticsResponse(TaeinData):
         if len(header_th_list) >= 4:
             dong_statistics_exist = True
 
+        raw_data = str(soup)
+
         return cls(
             bid_count=bid_count,
             bid_total_page=bid_total_page,
             dong_statistics_exist=dong_statistics_exist,
-            raw_data=str(soup),
+            raw_data=raw_data,
+            trimmed_data=(
+                trim_html(raw_data, [statistics_div, statistics_table])
+                if trim
+                else None
+            ),
         )
 
     def to_html(self) -> str:
@@ -178,11 +240,21 @@ class TaeinStatisticsResponse(TaeinData):
 @attr.s
 class TaeinBidResponse(TaeinData):
     raw_data: str = attr.ib()
+    #: trim 하지 않으면 None
+    trimmed_data: typing.Optional[str] = attr.ib(default=None)
 
     @classmethod
-    def from_html(cls, data: str) -> "TaeinBidResponse":
+    def from_html(cls, data: str, trim: bool = False) -> "TaeinBidResponse":
         soup = bs4.BeautifulSoup(data, "lxml")
-        return cls(raw_data=str(soup))
+        raw_data = str(soup)
+        return cls(
+            raw_data=raw_data,
+            trimmed_data=(
+                trim_html(raw_data, find_bid_result_tables(soup))
+                if trim
+                else None
+            ),
+        )
 
     def to_html(self) -> str:
         return self.raw_data
@@ -48,6 +48,24 @@ SCHEMA = {
     'SENTRY_DSN': fields.StringField(optional=True),
     # 요청 딜레이
     "CLIENT_DELAY": fields.StringField(optional=False),
+    # 백그라운드 S3 업로드 스레드 수, 대기열 크기, 재시도 횟수
+    "UPLOAD_WORKERS": fields.IntegerField(optional=True, default=4),
+    "UPLOAD_QUEUE_SIZE": fields.IntegerField(optional=True, default=32),
+    "UPLOAD_MAX_TRIALS": fields.IntegerField(optional=True, default=3),
+    # 통계/낙찰사례 페이지에서 필요한 영역만 남겨서 저장
+    "TRIM_PAGES": fields.BooleanField(optional=True, default=False),
+    # 동 단위로 파싱된 통계/낙찰사례 sidecar(json lines) 저장
+    "WRITE_SIDECAR": fields.BooleanField(optional=True, default=False),
+    # 동(물건종류)의 페이지를 하나의 shard 객체로 묶어서 저장
+    "SHARD_PAGES": fields.BooleanField(optional=True, default=False),
+    # 이전 크롤링과 같은 페이지는 reference 로 대신 저장
+    "DEDUP_PAGES": fields.BooleanField(optional=True, default=False),
+    # 페이지 압축 방식 (zstd 는 zstandard 패키지 필요)
+    "PAGE_COMPRESSION": fields.OneOfField(
+        {"none", "gzip", "zstd", }, default="none",
+    ),
+    # manifest 항목을 이어서 쓰는 로컬 파일 (Store 스트리밍 적재용 큐)
+    "NOTIFY_FILE": fields.StringField(optional=True, default=None),
 }
 
 
@@ -0,0 +1,56 @@
+import json
+import typing
+
+import structlog
+from botocore.exceptions import ClientError
+from crawler.aws_client import S3Client
+
+logger = structlog.get_logger(__name__)
+
+CATALOG_FILE_NAME = "runs.json"
+LATEST_FILE_NAME = "LATEST.json"
+
+
+class TaeinRunCatalog(object):
+    """
+    크롤링 실행 목록입니다. 상태가 바뀔 때마다 항목을 뒤에 추가하기만 하고,
+    같은 time_stamp 의 마지막 항목이 현재 상태입니다. 완료된 최신 실행은
+    LATEST 에 따로 기록해서 Store 가 한 번의 GET 으로 찾을 수 있게 합니다.
+    """
+
+    def __init__(self, s3_client: S3Client, folder_name: str) -> None:
+        super().__init__()
+        self.s3_client = s3_client
+        self.folder_name = folder_name
+
+    def fetch_entries(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        key = f"{self.folder_name}/{CATALOG_FILE_NAME}"
+        try:
+            response = self.s3_client.get_object(key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                raise
+            return list()
+        return json.loads(response.body.read())
+
+    def append(self, entry: typing.Dict[str, typing.Any]) -> None:
+        entries = self.fetch_entries()
+        entries.append(entry)
+        self.s3_client.upload_json(
+            folder_name=self.folder_name,
+            file_name=CATALOG_FILE_NAME,
+            data=entries,
+        )
+
+        logger.info(
+            "Append run catalog",
+            time_stamp=entry["time_stamp"],
+            status=entry["status"],
+        )
+
+    def set_latest(self, entry: typing.Dict[str, typing.Any]) -> None:
+        self.s3_client.upload_json(
+            folder_name=self.folder_name,
+            file_name=LATEST_FILE_NAME,
+            data=entry,
+        )
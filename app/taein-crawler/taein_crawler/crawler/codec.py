@@ -0,0 +1,36 @@
+import gzip
+import typing
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .exc import TaeinCrawlerError
+
+#: 압축 방식별 (키 접미사, 압축된 경우의 Content-Type)
+PAGE_ENCODINGS: typing.Dict[str, typing.Tuple[str, typing.Optional[str]]] = {
+    "none": ("", None),
+    "gzip": (".gz", "application/gzip"),
+    "zstd": (".zst", "application/zstd"),
+}
+
+
+def encode_page(
+    data: bytes, compression: str, mime_type: str = "text/html"
+) -> typing.Tuple[bytes, str, str]:
+    """
+    페이지를 압축하고 (본문, 키 접미사, Content-Type) 을 반환합니다.
+    Store 는 키 접미사와 매직 바이트로 압축 여부를 판단합니다.
+    """
+    suffix, encoded_mime_type = PAGE_ENCODINGS[compression]
+    mime_type = encoded_mime_type or mime_type
+
+    if compression == "gzip":
+        data = gzip.compress(data, compresslevel=6)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise TaeinCrawlerError("zstandard is not installed")
+        data = zstandard.ZstdCompressor(level=3).compress(data)
+
+    return data, suffix, mime_type
@@ -8,22 +8,39 @@ import attr
 import pytz
 import structlog
 from crawler.aws_client import S3Client
-from crawler.utils.download import write_file
 from dateutil.relativedelta import relativedelta
 from taein_crawler.client import TaeinClient
 from taein_crawler.client.data import TaeinRegion, TaeinGugun
 from tanker.slack import SlackClient
 from tanker.utils.datetime import tznow, timestamp
-from tanker.utils.tempfile import TempDir
 
+from .catalog import TaeinRunCatalog
+from .codec import PAGE_ENCODINGS, encode_page
 from .data import CrawlerStatistics, slack_failure_percentage_statistics
+from .dedup import REFERENCE_SUFFIX, TaeinPageIndex, page_hash
 from .exc import TaeinCrawlerNotFoundError
+from .manifest import MANIFEST_FOLDER_NAME, TaeinManifest
+from .shard import SHARD_FILE_NAME, TaeinShardWriter
+from .sidecar import SIDECAR_FILE_NAME, TaeinSidecar
+from .trim import trimmed_bid_page, trimmed_statistics_page
+from .uploader import TaeinUploader
 
 logger = structlog.get_logger(__name__)
 
 SeoulTZ = pytz.timezone("Asia/Seoul")
 
 
+def manifest_region(
+    sido_name: str, gugun_name: str, dong_name: str, mulgun_text: str
+) -> typing.Dict[str, str]:
+    return {
+        "sido": sido_name,
+        "gugun": gugun_name,
+        "dong": dong_name,
+        "mulgun": mulgun_text,
+    }
+
+
 class TaeinCrawler(object):
     def __init__(
         self,
@@ -36,9 +53,25 @@ class TaeinCrawler(object):
         )
         self.taein_client = TaeinClient(
             client_delay=self.config['CLIENT_DELAY'],
-            proxy=random.choice(self.config['PROXY_HOST_LIST'])
+            proxy=random.choice(self.config['PROXY_HOST_LIST']),
+            trim=self.config['TRIM_PAGES'],
         )
         self.s3_client = S3Client(config)
+        self.uploader = TaeinUploader(
+            self.s3_client,
+            max_workers=self.config["UPLOAD_WORKERS"],
+            max_pending=self.config["UPLOAD_QUEUE_SIZE"],
+            max_trials=self.config["UPLOAD_MAX_TRIALS"],
+        )
+        # 날짜 폴더 목록을 보는 Store 에 섞이지 않도록 meta/ 아래에 둡니다
+        self.page_index = TaeinPageIndex(
+            self.s3_client, f"meta/{self.config['ENVIRONMENT']}"
+        )
+        self.run_catalog = TaeinRunCatalog(
+            self.s3_client, f"meta/{self.config['ENVIRONMENT']}/catalog"
+        )
+        self.sidecar = TaeinSidecar()
+        self.shard = TaeinShardWriter()
         self.total_statistics = CrawlerStatistics()
         self.failure_statistics = CrawlerStatistics()
         self.crawling_date: datetime.datetime = tznow(
@@ -47,6 +80,12 @@ class TaeinCrawler(object):
         self.crawling_start_time: str = str(
             timestamp(tznow(pytz.timezone("Asia/Seoul")))
         )
+        self.manifest = TaeinManifest(
+            self.uploader,
+            f"{self.run_folder_name()}/{MANIFEST_FOLDER_NAME}",
+            self.crawling_start_time,
+            notify_path=self.config["NOTIFY_FILE"],
+        )
 
     def run(self, run_by: str) -> None:
         self.slack_client.send_info_slack(
@@ -55,9 +94,32 @@ class TaeinCrawler(object):
             f"({self.config['ENVIRONMENT']}, {run_by})"
         )
 
-        self.crawl()
+        if self.config["DEDUP_PAGES"]:
+            self.page_index.load()
+
+        self.run_catalog.append(self.run_catalog_entry(run_by, "running"))
+
+        try:
+            self.crawl()
+            # 크롤링 로그를 올리기 전에 남아있는 페이지 업로드를 모두 마칩니다
+            self.uploader.flush()
+            # 업로드가 끝난 객체의 manifest 를 마저 올립니다
+            self.manifest.flush()
+            self.uploader.flush()
+        except Exception:
+            self.run_catalog.append(self.run_catalog_entry(run_by, "failed"))
+            raise
+        finally:
+            self.uploader.shutdown()
+
+        if self.config["DEDUP_PAGES"]:
+            self.page_index.save()
         self.upload_crawler_log_to_s3(run_by)
 
+        catalog_entry = self.run_catalog_entry(run_by, "completed")
+        self.run_catalog.append(catalog_entry)
+        self.run_catalog.set_latest(catalog_entry)
+
         statistics = slack_failure_percentage_statistics(
             self.total_statistics, self.failure_statistics
         )
@@ -130,7 +192,8 @@ class TaeinCrawler(object):
         if re.search(self.config["REGION_REGEX_LEVEL_2"], gugun_name):
             self.taein_client = TaeinClient(
                 client_delay=self.config['CLIENT_DELAY'],
-                proxy=random.choice(self.config['PROXY_HOST_LIST'])
+                proxy=random.choice(self.config['PROXY_HOST_LIST']),
+                trim=self.config['TRIM_PAGES'],
             )
             self.taein_client.login(
                 self.config["LOGIN_ID"],
@@ -157,6 +220,8 @@ class TaeinCrawler(object):
     ) -> None:
         for dong_name in dong_list:
             if re.search(self.config["REGION_REGEX_LEVEL_3"], dong_name):
+                self.sidecar = TaeinSidecar()
+                self.shard = TaeinShardWriter()
                 area_step = self.config["BUILDING_AREA_STEP"]
                 area_start = self.config["BUILDING_AREA_START"]
                 area_end = self.config["BUILDING_AREA_END"]
@@ -187,6 +252,22 @@ class TaeinCrawler(object):
                     mulgun_value,
                 )
 
+                if self.config["SHARD_PAGES"]:
+                    self.upload_shard_to_s3(
+                        sido_name, gugun_name, dong_name, mulgun_text
+                    )
+                if self.config["WRITE_SIDECAR"]:
+                    self.upload_sidecar_to_s3(
+                        sido_name, gugun_name, dong_name, mulgun_text
+                    )
+
+                self.manifest.close_dong(
+                    manifest_region(
+                        sido_name, gugun_name, dong_name, mulgun_text
+                    )
+                )
+                self.manifest.flush()
+
     def crawl_statistics_page(
         self,
         sido_name: str,
@@ -232,7 +313,14 @@ class TaeinCrawler(object):
 
         self.total_statistics.statistics_count += 1
 
-        data = statistics_response.raw_data
+        # trim 을 확인하면서 파싱한 값은 sidecar 에 다시 씁니다
+        record = None
+        if self.config["TRIM_PAGES"]:
+            data, record = trimmed_statistics_page(
+                statistics_response.raw_data, statistics_response.trimmed_data
+            )
+        else:
+            data = statistics_response.raw_data
 
         file_name = (
             f"{sido_name}_"
@@ -244,19 +332,19 @@ class TaeinCrawler(object):
             f"statistics.html"
         )
 
-        with TempDir() as temp_dir:
-            temp_path = str(temp_dir) + "\\"
-            file_path = temp_path + file_name
-            write_file(file_path, data)
-            self.upload_page_to_s3(
-                sido_name,
-                gugun_name,
-                dong_name,
-                mulgun_text,
-                file_path,
-                file_name,
-                "statistics",
-            )
+        if self.config["WRITE_SIDECAR"]:
+            self.sidecar.add_statistics_page(file_name, data, record)
+
+        self.upload_page_to_s3(
+            sido_name,
+            gugun_name,
+            dong_name,
+            mulgun_text,
+            data,
+            file_name,
+            "statistics",
+            0 if start_area == "최소" else int(start_area),
+        )
 
     def crawl_bid_page(
         self,
@@ -308,7 +396,13 @@ class TaeinCrawler(object):
 
                     self.total_statistics.bids_count += 1
 
-                    data = bid_response.raw_data
+                    records = None
+                    if self.config["TRIM_PAGES"]:
+                        data, records = trimmed_bid_page(
+                            bid_response.raw_data, bid_response.trimmed_data
+                        )
+                    else:
+                        data = bid_response.raw_data
 
                     logger.info(
                         "Crawling bid page",
@@ -328,19 +422,19 @@ class TaeinCrawler(object):
                         f"bid_{index}.html"
                     )
 
-                    with TempDir() as temp_dir:
-                        temp_path = str(temp_dir) + "\\"
-                        file_path = temp_path + file_name
-                        write_file(file_path, data)
-                        self.upload_page_to_s3(
-                            sido_name,
-                            gugun_name,
-                            dong_name,
-                            mulgun_text,
-                            file_path,
-                            file_name,
-                            "bid",
-                        )
+                    if self.config["WRITE_SIDECAR"]:
+                        self.sidecar.add_bid_page(file_name, data, records)
+
+                    self.upload_page_to_s3(
+                        sido_name,
+                        gugun_name,
+                        dong_name,
+                        mulgun_text,
+                        data,
+                        file_name,
+                        "bid",
+                        index,
+                    )
             except Exception as e:
                 self.failure_statistics.bids_count += 1
                 raise e
@@ -351,43 +445,203 @@ class TaeinCrawler(object):
         gugun_name: str,
         dong_name: str,
         mulgun_text: str,
-        file_path: str,
+        data: str,
         file_name: str,
         data_type: str,
+        page: int,
     ) -> None:
-        folder_name = (
-            f"{self.config['ENVIRONMENT']}/"
-            f"{self.crawling_date.year}/"
-            f"{self.crawling_date.month:02}/"
-            f"{self.crawling_date.day:02}/"
-            f"{str(self.crawling_start_time)}/"
-            f"data/"
-            f"{sido_name}/"
-            f"{gugun_name}/"
-            f"{dong_name}/"
-            f"{mulgun_text}"
+        folder_name = self.data_folder_name(
+            sido_name, gugun_name, dong_name, mulgun_text
+        )
+        region = manifest_region(sido_name, gugun_name, dong_name, mulgun_text)
+        body = data.encode("utf-8")
+
+        # 이전 크롤링과 본문이 같으면 원본을 가리키는 reference 만 올립니다
+        index_key = (
+            f"{sido_name}/{gugun_name}/{dong_name}/{mulgun_text}/{file_name}"
         )
+        sha256 = page_hash(body)
+        reference: typing.Optional[bytes] = None
+        if self.config["DEDUP_PAGES"]:
+            reference = self.page_index.reference(index_key, sha256)
+
+        if self.config["SHARD_PAGES"]:
+            # 동 단위로 모아서 upload_shard_to_s3 에서 한 번에 올립니다
+            member_name = file_name
+            if data_type == "bid":
+                member_name = f"{data_type}/{file_name}"
+            self.shard.add(member_name, reference or body)
+            if reference is None:
+                suffix, _ = PAGE_ENCODINGS[self.config["PAGE_COMPRESSION"]]
+                self.page_index.stage(
+                    index_key,
+                    sha256,
+                    f"{folder_name}/{SHARD_FILE_NAME}{suffix}",
+                    member_name,
+                )
+            return
 
         if data_type == "bid":
             folder_name += f"/{data_type}"
 
-        self.s3_client.upload_any_file(
-            folder_name=folder_name,
-            file_name=file_name,
-            file_path=file_path,
-            mime_type="text/html",
-            mode="rb",
-        )
+        on_uploaded = self.manifest.track(region, data_type, page)
+        if reference is not None:
+            self.uploader.submit(
+                folder_name,
+                file_name + REFERENCE_SUFFIX,
+                reference,
+                "application/json",
+                on_uploaded,
+            )
+        else:
+            body, suffix, mime_type = encode_page(
+                body, self.config["PAGE_COMPRESSION"]
+            )
+            self.uploader.submit(
+                folder_name, file_name + suffix, body, mime_type, on_uploaded
+            )
+            self.page_index.stage(
+                index_key, sha256, f"{folder_name}/{file_name}{suffix}"
+            )
 
         logger.info(
-            "Upload page to s3",
+            "Queue page upload to s3",
             sido=sido_name,
             gugun=gugun_name,
             dong=dong_name,
             mulgun_text=mulgun_text,
             data_type=data_type,
+            deduplicated=reference is not None,
         )
 
+    def upload_shard_to_s3(
+        self,
+        sido_name: str,
+        gugun_name: str,
+        dong_name: str,
+        mulgun_text: str,
+    ) -> None:
+        if not self.shard.index:
+            return
+
+        folder_name = self.data_folder_name(
+            sido_name, gugun_name, dong_name, mulgun_text
+        )
+        body, suffix, mime_type = encode_page(
+            self.shard.to_bytes(),
+            self.config["PAGE_COMPRESSION"],
+            "application/octet-stream",
+        )
+        self.uploader.submit(
+            folder_name,
+            SHARD_FILE_NAME + suffix,
+            body,
+            mime_type,
+            self.manifest.track(
+                manifest_region(
+                    sido_name, gugun_name, dong_name, mulgun_text
+                ),
+                "shard",
+            ),
+        )
+
+        logger.info(
+            "Queue shard upload to s3",
+            sido=sido_name,
+            gugun=gugun_name,
+            dong=dong_name,
+            mulgun_text=mulgun_text,
+            page_count=len(self.shard.index),
+        )
+
+    def upload_sidecar_to_s3(
+        self,
+        sido_name: str,
+        gugun_name: str,
+        dong_name: str,
+        mulgun_text: str,
+    ) -> None:
+        if not self.sidecar.valid or not self.sidecar.lines:
+            return
+
+        folder_name = self.data_folder_name(
+            sido_name, gugun_name, dong_name, mulgun_text
+        )
+        body, suffix, mime_type = encode_page(
+            self.sidecar.to_bytes(),
+            self.config["PAGE_COMPRESSION"],
+            "application/x-ndjson",
+        )
+        self.uploader.submit(
+            folder_name,
+            SIDECAR_FILE_NAME + suffix,
+            body,
+            mime_type,
+            self.manifest.track(
+                manifest_region(
+                    sido_name, gugun_name, dong_name, mulgun_text
+                ),
+                "sidecar",
+            ),
+        )
+
+        logger.info(
+            "Queue sidecar upload to s3",
+            sido=sido_name,
+            gugun=gugun_name,
+            dong=dong_name,
+            mulgun_text=mulgun_text,
+            record_count=len(self.sidecar.lines),
+        )
+
+    def run_folder_name(self) -> str:
+        return (
+            f"{self.config['ENVIRONMENT']}/"
+            f"{self.crawling_date.year}/"
+            f"{self.crawling_date.month:02}/"
+            f"{self.crawling_date.day:02}/"
+            f"{str(self.crawling_start_time)}"
+        )
+
+    def data_folder_name(
+        self,
+        sido_name: str,
+        gugun_name: str,
+        dong_name: str,
+        mulgun_text: str,
+    ) -> str:
+        return (
+            f"{self.run_folder_name()}/"
+            f"data/"
+            f"{sido_name}/"
+            f"{gugun_name}/"
+            f"{dong_name}/"
+            f"{mulgun_text}"
+        )
+
+    def run_catalog_entry(
+        self, run_by: str, status: str
+    ) -> typing.Dict[str, typing.Any]:
+        return {
+            "time_stamp": self.crawling_start_time,
+            "prefix": f"{self.run_folder_name()}/",
+            "status": status,
+            "run_by": run_by,
+            "updated_time_stamp": str(timestamp(tznow())),
+            "scope": {
+                "region_regex_level_1": self.config["REGION_REGEX_LEVEL_1"],
+                "region_regex_level_2": self.config["REGION_REGEX_LEVEL_2"],
+                "region_regex_level_3": self.config["REGION_REGEX_LEVEL_3"],
+                "mulgun_kind": self.config["MULGUN_KIND"],
+                "building_area_start": self.config["BUILDING_AREA_START"],
+                "building_area_end": self.config["BUILDING_AREA_END"],
+                "building_area_step": self.config["BUILDING_AREA_STEP"],
+            },
+            "total_statistics": attr.asdict(self.total_statistics),
+            "failure_statistics": attr.asdict(self.failure_statistics),
+            "manifest_parts": self.manifest.part_count,
+        }
+
     def upload_crawler_log_to_s3(self, run_by: str) -> None:
         total_statistics = attr.asdict(self.total_statistics)
         area_step = self.config["BUILDING_AREA_STEP"]
@@ -405,16 +659,10 @@ class TaeinCrawler(object):
             "finish_time_stamp": str(timestamp(tznow())),
             "total_statistics": total_statistics,
             "area_range": area_range,
+            "manifest_parts": self.manifest.part_count,
         }
 
-        folder_name = (
-            f"{self.config['ENVIRONMENT']}/"
-            f"{self.crawling_date.year}/"
-            f"{self.crawling_date.month:02}/"
-            f"{self.crawling_date.day:02}/"
-            f"{str(self.crawling_start_time)}/"
-            f"crawler-log"
-        )
+        folder_name = f"{self.run_folder_name()}/crawler-log"
 
         file_name = f"{self.crawling_start_time}.json"
 
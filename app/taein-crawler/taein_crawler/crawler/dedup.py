@@ -0,0 +1,73 @@
+import hashlib
+import json
+import typing
+
+import structlog
+from botocore.exceptions import ClientError
+from crawler.aws_client import S3Client
+
+logger = structlog.get_logger(__name__)
+
+PAGE_INDEX_FILE_NAME = "page-index.json"
+REFERENCE_SUFFIX = ".ref"
+
+
+def page_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class TaeinPageIndex(object):
+    """
+    이전 크롤링에서 올린 페이지의 해시와 S3 위치를 지역/물건종류/페이지
+    단위로 기억합니다. 본문이 같으면 전체 페이지 대신 원본을 가리키는
+    reference 만 올립니다. reference 는 항상 실제 본문을 가리키도록
+    원본 위치를 그대로 유지합니다.
+    """
+
+    def __init__(self, s3_client: S3Client, folder_name: str) -> None:
+        super().__init__()
+        self.s3_client = s3_client
+        self.folder_name = folder_name
+        self.entries: typing.Dict[str, typing.Dict[str, str]] = dict()
+        self.updates: typing.Dict[str, typing.Dict[str, str]] = dict()
+
+    def load(self) -> None:
+        key = f"{self.folder_name}/{PAGE_INDEX_FILE_NAME}"
+        try:
+            response = self.s3_client.get_object(key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                raise
+            logger.info("Page index not found", key=key)
+            return
+        self.entries = json.loads(response.body.read())
+
+    def reference(self, index_key: str, sha256: str) -> typing.Optional[bytes]:
+        entry = self.entries.get(index_key)
+        if not entry or entry["sha256"] != sha256:
+            return None
+        return json.dumps(
+            {"taein_ref": 1, **entry}, ensure_ascii=False
+        ).encode("utf-8")
+
+    def stage(
+        self,
+        index_key: str,
+        sha256: str,
+        key: str,
+        member: typing.Optional[str] = None,
+    ) -> None:
+        entry = {"sha256": sha256, "key": key}
+        if member:
+            entry["member"] = member
+        self.updates[index_key] = entry
+
+    def save(self) -> None:
+        """업로드가 모두 성공한 뒤에만 호출해서 index 를 갱신합니다."""
+        self.entries.update(self.updates)
+        self.updates = dict()
+        self.s3_client.upload_json(
+            folder_name=self.folder_name,
+            file_name=PAGE_INDEX_FILE_NAME,
+            data=self.entries,
+        )
@@ -4,3 +4,7 @@ class TaeinCrawlerError(Exception):
 
 class TaeinCrawlerNotFoundError(TaeinCrawlerError):
     pass
+
+
+class TaeinCrawlerUploadError(TaeinCrawlerError):
+    pass
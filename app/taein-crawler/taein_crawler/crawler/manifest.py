@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import typing
+
+import structlog
+
+from .uploader import TaeinUploader, UploadCallback
+
+logger = structlog.get_logger(__name__)
+
+MANIFEST_FOLDER_NAME = "manifest"
+
+
+class TaeinManifest(object):
+    """
+    이번 크롤링에서 올린 객체의 key, 크기, 해시, ETag, 지역, 물건종류, 데이터
+    종류, 페이지 번호를 기록합니다. 업로드가 끝난 객체만 기록하며, flush 할
+    때마다 새 part(json lines)를 올립니다. 동의 모든 객체가 올라가면
+    dong_complete 항목을 남겨서 Store 가 동 단위로 적재할 수 있게 합니다.
+
+    notify_path 가 있으면 flush 한 항목을 time_stamp 와 함께 그 파일에도
+    이어서 씁니다. Store 의 스트리밍 적재가 알림 큐 대신 읽습니다.
+    """
+
+    def __init__(
+        self,
+        uploader: TaeinUploader,
+        folder_name: str,
+        time_stamp: str,
+        notify_path: typing.Optional[str] = None,
+    ) -> None:
+        super().__init__()
+        self.uploader = uploader
+        self.folder_name = folder_name
+        self.time_stamp = time_stamp
+        self.notify_path = notify_path
+        self.lock = threading.Lock()
+        self.entries: typing.List[typing.Dict[str, typing.Any]] = list()
+        self.part_count = 0
+        self.pending: typing.Dict[str, int] = dict()
+        self.closed: typing.Dict[str, typing.Dict[str, str]] = dict()
+
+    @staticmethod
+    def _dong_key(region: typing.Dict[str, str]) -> str:
+        return "/".join(
+            region[x] for x in ("sido", "gugun", "dong", "mulgun")
+        )
+
+    def track(
+        self,
+        region: typing.Dict[str, str],
+        data_type: str,
+        page: typing.Optional[int] = None,
+    ) -> UploadCallback:
+        dong_key = self._dong_key(region)
+        with self.lock:
+            self.pending[dong_key] = self.pending.get(dong_key, 0) + 1
+
+        def on_uploaded(key: str, body: bytes) -> None:
+            entry = dict(
+                region,
+                key=key,
+                size=len(body),
+                sha256=hashlib.sha256(body).hexdigest(),
+                # S3 가 한 번에 올린 객체에 붙이는 ETag 와 같아서 Store 가
+                # 목록 조회로 만든 트리와 같은 버전으로 비교합니다
+                etag=hashlib.md5(body).hexdigest(),
+                data_type=data_type,
+                page=page,
+            )
+            with self.lock:
+                self.entries.append(entry)
+                self.pending[dong_key] -= 1
+                self._complete_dong_if_done(dong_key)
+
+        return on_uploaded
+
+    def close_dong(self, region: typing.Dict[str, str]) -> None:
+        dong_key = self._dong_key(region)
+        with self.lock:
+            self.pending.setdefault(dong_key, 0)
+            self.closed[dong_key] = region
+            self._complete_dong_if_done(dong_key)
+
+    def _complete_dong_if_done(self, dong_key: str) -> None:
+        if dong_key in self.closed and self.pending[dong_key] == 0:
+            region = self.closed.pop(dong_key)
+            self.entries.append(dict(region, data_type="dong_complete"))
+
+    def flush(self) -> None:
+        with self.lock:
+            entries, self.entries = self.entries, list()
+            if not entries:
+                return
+            self.part_count += 1
+            part_number = self.part_count
+
+        body = "".join(
+            json.dumps(x, ensure_ascii=False) + "\n" for x in entries
+        ).encode("utf-8")
+        self.uploader.submit(
+            self.folder_name,
+            f"{self.time_stamp}-{part_number:05}.jsonl",
+            body,
+            "application/x-ndjson",
+        )
+        if self.notify_path:
+            self.notify(entries)
+
+        logger.info(
+            "Queue manifest part upload to s3",
+            part_number=part_number,
+            entry_count=len(entries),
+        )
+
+    def notify(
+        self, entries: typing.List[typing.Dict[str, typing.Any]]
+    ) -> None:
+        # 한 번의 write 로 줄 단위가 섞이지 않게 씁니다
+        lines = "".join(
+            json.dumps(
+                dict(x, time_stamp=self.time_stamp), ensure_ascii=False
+            )
+            + "\n"
+            for x in entries
+        )
+        with open(self.notify_path, "a", encoding="utf-8") as f:
+            f.write(lines)
@@ -0,0 +1,40 @@
+import json
+import struct
+import typing
+
+SHARD_MAGIC = b"TSHD"
+SHARD_VERSION = 1
+SHARD_FILE_NAME = "pages.shard"
+
+
+class TaeinShardWriter(object):
+    """
+    동(물건종류) 하나의 페이지를 하나의 S3 객체로 묶습니다.
+
+    형식: magic(4) | version(1) | index 길이(4, big endian) | index(json) |
+    페이지 본문들. index 의 offset 은 본문 영역 시작 기준입니다.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.index: typing.List[typing.Dict[str, typing.Any]] = list()
+        self.bodies: typing.List[bytes] = list()
+        self.size = 0
+
+    def add(self, name: str, body: bytes) -> None:
+        self.index.append(
+            {"name": name, "offset": self.size, "length": len(body)}
+        )
+        self.bodies.append(body)
+        self.size += len(body)
+
+    def to_bytes(self) -> bytes:
+        index = json.dumps(self.index, ensure_ascii=False).encode("utf-8")
+        return b"".join(
+            [
+                SHARD_MAGIC,
+                struct.pack(">BI", SHARD_VERSION, len(index)),
+                index,
+                *self.bodies,
+            ]
+        )
@@ -0,0 +1,171 @@
+import datetime
+import decimal
+import json
+import typing
+
+import structlog
+from crawler import taein_schema
+
+logger = structlog.get_logger(__name__)
+
+#: Store 의 파싱 결과 형식이 바뀌면 올려야 합니다
+SIDECAR_SCHEMA_VERSION = 1
+SIDECAR_FILE_NAME = "records.jsonl"
+
+STATISTICS_RATE_FIELDS = (
+    "year_avg_price_rate",
+    "year_avg_bid_rate",
+    "six_month_avg_price_rate",
+    "six_month_avg_bid_rate",
+)
+STATISTICS_COUNT_FIELDS = (
+    "year_bid_count",
+    "six_month_bid_count",
+)
+
+
+def _json_default(value: typing.Any) -> typing.Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        # float 로 바꾸면 가격과 면적의 정밀도를 잃습니다
+        return str(value)
+    raise TypeError(f"{type(value)} is not JSON serializable")
+
+
+def _statistics_section(
+    statistics: taein_schema.TaeinStatisticsResponse, level: str
+) -> typing.Dict[str, typing.Any]:
+    section: typing.Dict[str, typing.Any] = dict()
+    for field in STATISTICS_RATE_FIELDS:
+        value = getattr(statistics, f"{level}_{field}")
+        section[f"{field}_str"] = str(value)
+        section[field] = value
+    for field in STATISTICS_COUNT_FIELDS:
+        section[field] = getattr(statistics, f"{level}_{field}")
+    return section
+
+
+def statistics_to_json(
+    statistics: taein_schema.TaeinStatisticsResponse,
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "sido_name": statistics.sido_name,
+        "gugun_name": statistics.gugun_name,
+        "dong_name": statistics.dong_name,
+        "building_start_area": statistics.building_start_area,
+        "building_end_area": statistics.building_end_area,
+        "start_date_str": statistics.start_date_str,
+        "start_date": statistics.start_date,
+        "end_date_str": statistics.end_date_str,
+        "end_date": statistics.end_date,
+        "sido": _statistics_section(statistics, "sido"),
+        "gugun": _statistics_section(statistics, "gugun"),
+        "dong": _statistics_section(statistics, "dong"),
+    }
+
+
+def bid_to_json(
+    bid: taein_schema.TaeinBidData,
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "bid_date_str": bid.bid_date_str,
+        "bid_date": bid.bid_date,
+        "bid_event_number": bid.bid_event_number,
+        "address": bid.address,
+        "bid_judged_price": bid.bid_judged_price,
+        "bid_success_price": bid.bid_success_price,
+        "average_bid_rate_str": bid.average_bid_rate_str,
+        "average_bid_rate": bid.average_bid_rate,
+        "bidder_count": bid.bidder_count,
+        "bid_kind": bid.bid_kind,
+    }
+
+
+def parse_statistics_page(data: str) -> typing.Dict[str, typing.Any]:
+    return statistics_to_json(
+        taein_schema.TaeinStatisticsResponse.from_html(data)
+    )
+
+
+def parse_bid_page(data: str) -> typing.List[typing.Dict[str, typing.Any]]:
+    return [
+        bid_to_json(x)
+        for x in taein_schema.TaeinBidResponse.from_html(data).taein_bid_list
+    ]
+
+
+class TaeinSidecar(object):
+    """
+    동(물건종류) 하나에서 수집한 통계/낙찰사례를 Store 가 바로 읽을 수 있는
+    json lines 로 모읍니다. 한 페이지라도 추출에 실패하면 sidecar 를
+    올리지 않고 Store 가 html 을 파싱하도록 둡니다. 이미 파싱한 값을
+    넘기면 페이지를 다시 파싱하지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: typing.List[str] = list()
+        self.valid = True
+
+    def _append(
+        self, data_type: str, file_name: str, record: typing.Dict
+    ) -> None:
+        self.lines.append(
+            json.dumps(
+                {
+                    "schema_version": SIDECAR_SCHEMA_VERSION,
+                    "type": data_type,
+                    "file_name": file_name,
+                    "record": record,
+                },
+                ensure_ascii=False,
+                default=_json_default,
+            )
+        )
+
+    def add_statistics_page(
+        self,
+        file_name: str,
+        data: str,
+        record: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    ) -> None:
+        if not self.valid:
+            return
+        try:
+            if record is None:
+                record = parse_statistics_page(data)
+        except Exception as e:
+            logger.warning(
+                "Failed to extract statistics sidecar",
+                file_name=file_name,
+                exc_info=e,
+            )
+            self.valid = False
+            return
+        self._append("statistics", file_name, record)
+
+    def add_bid_page(
+        self,
+        file_name: str,
+        data: str,
+        records: typing.Optional[typing.List[typing.Dict]] = None,
+    ) -> None:
+        if not self.valid:
+            return
+        try:
+            if records is None:
+                records = parse_bid_page(data)
+        except Exception as e:
+            logger.warning(
+                "Failed to extract bid sidecar",
+                file_name=file_name,
+                exc_info=e,
+            )
+            self.valid = False
+            return
+        for record in records:
+            self._append("bid", file_name, record)
+
+    def to_bytes(self) -> bytes:
+        return "".join(x + "\n" for x in self.lines).encode("utf-8")
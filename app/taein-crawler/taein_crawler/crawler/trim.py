@@ -0,0 +1,47 @@
+import typing
+
+import structlog
+
+from .sidecar import parse_bid_page, parse_statistics_page
+
+logger = structlog.get_logger(__name__)
+
+#: (올릴 페이지, 그 페이지를 taein_schema 로 파싱한 값). 파싱하지 않았거나
+#: 파싱하지 못했으면 값은 None 입니다
+TrimmedPage = typing.Tuple[str, typing.Any]
+
+
+def _verified(
+    parse: typing.Callable[[str], typing.Any],
+    raw_data: str,
+    trimmed_data: str,
+) -> TrimmedPage:
+    """
+    trim 한 페이지를 store 와 같은 taein_schema 로 다시 파싱해서 원본과
+    같은 값이 나올 때만 사용하고, 다르면 원본을 올립니다. 파싱한 값은
+    sidecar 가 다시 파싱하지 않도록 함께 반환합니다.
+    """
+    if trimmed_data == raw_data:
+        return raw_data, None
+    try:
+        expected = parse(raw_data)
+    except Exception:
+        # 원본도 파싱하지 못하면 store 가 원본으로 판단하게 둡니다
+        return raw_data, None
+    try:
+        actual = parse(trimmed_data)
+    except Exception as e:
+        logger.warning("Failed to parse trimmed page", exc_info=e)
+        return raw_data, expected
+    if actual != expected:
+        logger.warning("Trimmed page lost parsed values")
+        return raw_data, expected
+    return trimmed_data, actual
+
+
+def trimmed_statistics_page(raw_data: str, trimmed_data: str) -> TrimmedPage:
+    return _verified(parse_statistics_page, raw_data, trimmed_data)
+
+
+def trimmed_bid_page(raw_data: str, trimmed_data: str) -> TrimmedPage:
+    return _verified(parse_bid_page, raw_data, trimmed_data)
@@ -0,0 +1,163 @@
+import functools
+import os
+import threading
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import structlog
+from botocore.exceptions import BotoCoreError, ClientError
+from crawler.aws_client import S3Client
+from tanker.utils.retryer import Retryer
+from tanker.utils.retryer.strategy import ExponentialModulusBackoffStrategy
+from tanker.utils.tempfile import TempDir
+
+from .exc import TaeinCrawlerUploadError
+
+logger = structlog.get_logger(__name__)
+
+#: 업로드가 끝난 뒤 (key, 본문) 으로 호출됩니다
+UploadCallback = typing.Callable[[str, bytes], None]
+
+
+class TaeinUploader(object):
+    """
+    페이지 업로드를 백그라운드 스레드에서 처리합니다. 대기 중인 업로드가
+    max_pending 개를 넘으면 submit 이 블록되어 크롤러 속도를 맞춰주고,
+    flush 는 지금까지 요청된 업로드가 모두 끝날 때까지 기다립니다.
+    업로드가 한 번 실패하면 다음 submit 부터 그 예외를 내서 크롤링을 바로
+    멈춥니다.
+    """
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        *,
+        max_workers: int,
+        max_pending: int,
+        max_trials: int,
+    ) -> None:
+        super().__init__()
+        self.s3_client = s3_client
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="taein-uploader"
+        )
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.retryer = Retryer(
+            strategy_factory=(
+                ExponentialModulusBackoffStrategy.create_factory(2, 10)
+            ),
+            should_retry=lambda e: isinstance(
+                e, (BotoCoreError, ClientError, OSError)
+            ),
+            default_max_trials=max_trials,
+        )
+        self.lock = threading.Lock()
+        self.pending: typing.List[typing.Tuple[str, Future]] = list()
+        #: 처음 실패한 업로드의 (key, 예외)
+        self.failure: typing.Optional[
+            typing.Tuple[str, BaseException]
+        ] = None
+
+    def submit(
+        self,
+        folder_name: str,
+        file_name: str,
+        data: bytes,
+        mime_type: str,
+        on_uploaded: typing.Optional[UploadCallback] = None,
+    ) -> Future:
+        """on_uploaded 는 업로드 스레드에서 호출됩니다."""
+        self.raise_failure()
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(
+                self.upload,
+                folder_name,
+                file_name,
+                data,
+                mime_type,
+                on_uploaded,
+            )
+        except Exception:
+            self.slots.release()
+            raise
+
+        key = f"{folder_name}/{file_name}"
+        with self.lock:
+            self.pending.append((key, future))
+        future.add_done_callback(functools.partial(self._on_done, key))
+        return future
+
+    def upload(
+        self,
+        folder_name: str,
+        file_name: str,
+        data: bytes,
+        mime_type: str,
+        on_uploaded: typing.Optional[UploadCallback] = None,
+    ) -> None:
+        try:
+            self.retryer.run(
+                functools.partial(
+                    self._upload_once, folder_name, file_name, data, mime_type
+                )
+            )
+        except Exception as e:
+            # future 가 끝나기 전에 기록해서 다음 submit 이 바로 알게 합니다
+            with self.lock:
+                if self.failure is None:
+                    self.failure = (f"{folder_name}/{file_name}", e)
+            raise
+        if on_uploaded:
+            on_uploaded(f"{folder_name}/{file_name}", data)
+
+    def _upload_once(
+        self,
+        folder_name: str,
+        file_name: str,
+        data: bytes,
+        mime_type: str,
+    ) -> None:
+        with TempDir() as temp_dir:
+            file_path = os.path.join(str(temp_dir), file_name)
+            with open(file_path, "wb") as f:
+                f.write(data)
+            self.s3_client.upload_any_file(
+                folder_name=folder_name,
+                file_name=file_name,
+                file_path=file_path,
+                mime_type=mime_type,
+                mode="rb",
+            )
+
+    def _on_done(self, key: str, future: Future) -> None:
+        self.slots.release()
+
+        exc = future.exception()
+        if exc is not None:
+            logger.error("Failed to upload page to s3", key=key, exc_info=exc)
+
+    def raise_failure(self) -> None:
+        with self.lock:
+            failure = self.failure
+        if failure is not None:
+            key, exc = failure
+            raise TaeinCrawlerUploadError(
+                f"failed to upload page({key})", [key]
+            ) from exc
+
+    def flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, list()
+        wait([future for _, future in pending])
+
+        failed_keys = [
+            key for key, future in pending if future.exception() is not None
+        ]
+        if failed_keys:
+            raise TaeinCrawlerUploadError(
+                f"failed to upload {len(failed_keys)} page(s)", failed_keys
+            )
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
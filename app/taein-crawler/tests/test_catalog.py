@@ -0,0 +1,65 @@
+import json
+import types
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from taein_crawler.crawler.catalog import (
+    CATALOG_FILE_NAME,
+    LATEST_FILE_NAME,
+    TaeinRunCatalog,
+)
+
+
+class TaeinRunCatalogTest(unittest.TestCase):
+    def test_append(self) -> None:
+        s3_client = mock.Mock()
+        body = json.dumps([{"time_stamp": "1", "status": "running"}])
+        s3_client.get_object.return_value = types.SimpleNamespace(
+            body=mock.Mock(read=lambda: body.encode("utf-8"))
+        )
+        catalog = TaeinRunCatalog(s3_client, "meta/dev/catalog")
+        catalog.append({"time_stamp": "1", "status": "completed"})
+
+        s3_client.get_object.assert_called_once_with(
+            f"meta/dev/catalog/{CATALOG_FILE_NAME}"
+        )
+        s3_client.upload_json.assert_called_once_with(
+            folder_name="meta/dev/catalog",
+            file_name=CATALOG_FILE_NAME,
+            data=[
+                {"time_stamp": "1", "status": "running"},
+                {"time_stamp": "1", "status": "completed"},
+            ],
+        )
+
+    def test_append_first_entry(self) -> None:
+        s3_client = mock.Mock()
+        s3_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+        )
+        catalog = TaeinRunCatalog(s3_client, "meta/dev/catalog")
+        catalog.append({"time_stamp": "1", "status": "running"})
+
+        self.assertEqual(
+            [{"time_stamp": "1", "status": "running"}],
+            s3_client.upload_json.call_args[1]["data"],
+        )
+
+    def test_fetch_entries_raises_other_errors(self) -> None:
+        s3_client = mock.Mock()
+        s3_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied"}}, "GetObject"
+        )
+        catalog = TaeinRunCatalog(s3_client, "meta/dev/catalog")
+        with self.assertRaises(ClientError):
+            catalog.fetch_entries()
+
+    def test_set_latest(self) -> None:
+        s3_client = mock.Mock()
+        catalog = TaeinRunCatalog(s3_client, "meta/dev/catalog")
+        catalog.set_latest({"time_stamp": "1", "status": "completed"})
+        self.assertEqual(
+            LATEST_FILE_NAME, s3_client.upload_json.call_args[1]["file_name"]
+        )
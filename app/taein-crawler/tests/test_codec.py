@@ -0,0 +1,32 @@
+import gzip
+import unittest
+
+from taein_crawler.crawler.codec import encode_page, zstandard
+from taein_crawler.crawler.exc import TaeinCrawlerError
+
+PAGE = "<html><body>서울 강남구</body></html>".encode("utf-8")
+
+
+class EncodePageTest(unittest.TestCase):
+    def test_none(self) -> None:
+        self.assertEqual((PAGE, "", "text/html"), encode_page(PAGE, "none"))
+
+    def test_gzip(self) -> None:
+        data, suffix, mime_type = encode_page(PAGE, "gzip")
+        self.assertEqual(".gz", suffix)
+        self.assertEqual("application/gzip", mime_type)
+        self.assertEqual(PAGE, gzip.decompress(data))
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self) -> None:
+        data, suffix, mime_type = encode_page(PAGE, "zstd")
+        self.assertEqual(".zst", suffix)
+        self.assertEqual("application/zstd", mime_type)
+        self.assertEqual(
+            PAGE, zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        )
+
+    @unittest.skipIf(zstandard is not None, "zstandard is installed")
+    def test_zstd_not_installed(self) -> None:
+        with self.assertRaises(TaeinCrawlerError):
+            encode_page(PAGE, "zstd")
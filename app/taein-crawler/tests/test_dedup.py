@@ -0,0 +1,91 @@
+import json
+import types
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from taein_crawler.crawler.dedup import (
+    PAGE_INDEX_FILE_NAME,
+    TaeinPageIndex,
+    page_hash,
+)
+
+SHA256 = page_hash(b"<html></html>")
+
+
+def s3_body(data: object) -> types.SimpleNamespace:
+    body = mock.Mock()
+    body.read.return_value = json.dumps(data).encode("utf-8")
+    return types.SimpleNamespace(body=body)
+
+
+class TaeinPageIndexTest(unittest.TestCase):
+    def create_index(self, entries: dict) -> TaeinPageIndex:
+        s3_client = mock.Mock()
+        s3_client.get_object.return_value = s3_body(entries)
+        index = TaeinPageIndex(s3_client, "meta/dev")
+        index.load()
+        return index
+
+    def test_reference(self) -> None:
+        index = self.create_index(
+            {
+                "서울/강남구/개포동/아파트/bid/1": {
+                    "sha256": SHA256,
+                    "key": "taein/2020/pages.shard",
+                    "member": "a_bid_1.html",
+                }
+            }
+        )
+
+        body = index.reference("서울/강남구/개포동/아파트/bid/1", SHA256)
+        # Store 는 이 접두어로 reference 를 구분합니다
+        self.assertTrue(body.startswith(b'{"taein_ref"'))
+        self.assertEqual(
+            {
+                "taein_ref": 1,
+                "sha256": SHA256,
+                "key": "taein/2020/pages.shard",
+                "member": "a_bid_1.html",
+            },
+            json.loads(body),
+        )
+
+    def test_changed_page_has_no_reference(self) -> None:
+        index = self.create_index(
+            {"a": {"sha256": SHA256, "key": "taein/2020/a_bid_1.html"}}
+        )
+        self.assertIsNone(index.reference("a", page_hash(b"changed")))
+        self.assertIsNone(index.reference("b", SHA256))
+
+    def test_load_without_index(self) -> None:
+        s3_client = mock.Mock()
+        s3_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+        )
+        index = TaeinPageIndex(s3_client, "meta/dev")
+        index.load()
+        self.assertEqual(dict(), index.entries)
+
+    def test_save_applies_staged_entries(self) -> None:
+        index = self.create_index(
+            {"a": {"sha256": SHA256, "key": "taein/2019/a_bid_1.html"}}
+        )
+        index.stage("b", SHA256, "taein/2020/pages.shard", "a_bid_2.html")
+        self.assertIsNone(index.reference("b", SHA256))
+
+        index.save()
+        index.s3_client.upload_json.assert_called_once_with(
+            folder_name="meta/dev",
+            file_name=PAGE_INDEX_FILE_NAME,
+            data={
+                "a": {"sha256": SHA256, "key": "taein/2019/a_bid_1.html"},
+                "b": {
+                    "sha256": SHA256,
+                    "key": "taein/2020/pages.shard",
+                    "member": "a_bid_2.html",
+                },
+            },
+        )
+        self.assertIsNotNone(index.reference("b", SHA256))
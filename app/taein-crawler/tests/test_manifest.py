@@ -0,0 +1,65 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from taein_crawler.crawler.manifest import TaeinManifest
+
+REGION = dict(sido="서울", gugun="강남구", dong="개포동", mulgun="아파트")
+
+
+def uploaded_entries(uploader: mock.Mock) -> list:
+    body = uploader.submit.call_args[0][2]
+    return [json.loads(x) for x in body.decode("utf-8").splitlines()]
+
+
+class TaeinManifestTest(unittest.TestCase):
+    def test_dong_complete_after_uploads(self) -> None:
+        uploader = mock.Mock()
+        manifest = TaeinManifest(uploader, "manifest/dev", "20201012")
+        on_uploaded = manifest.track(REGION, "bid", 1)
+        manifest.close_dong(REGION)
+        # 업로드가 끝나기 전에는 동을 완료로 기록하지 않습니다
+        self.assertEqual([], manifest.entries)
+
+        on_uploaded("taein/a_bid_1.html", b"<html></html>")
+        manifest.flush()
+
+        folder_name, file_name = uploader.submit.call_args[0][:2]
+        self.assertEqual("manifest/dev", folder_name)
+        self.assertEqual("20201012-00001.jsonl", file_name)
+        entries = uploaded_entries(uploader)
+        self.assertEqual(
+            ["bid", "dong_complete"], [x["data_type"] for x in entries]
+        )
+        self.assertEqual("taein/a_bid_1.html", entries[0]["key"])
+        self.assertEqual(13, entries[0]["size"])
+        self.assertEqual(
+            hashlib.md5(b"<html></html>").hexdigest(), entries[0]["etag"]
+        )
+        self.assertEqual(1, entries[0]["page"])
+
+    def test_flush_without_entries(self) -> None:
+        uploader = mock.Mock()
+        manifest = TaeinManifest(uploader, "manifest/dev", "20201012")
+        manifest.flush()
+        uploader.submit.assert_not_called()
+
+    def test_notify(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            notify_path = os.path.join(temp_dir, "notify.jsonl")
+            manifest = TaeinManifest(
+                mock.Mock(), "manifest/dev", "20201012", notify_path
+            )
+            manifest.close_dong(REGION)
+            manifest.flush()
+
+            with open(notify_path, encoding="utf-8") as f:
+                entries = [json.loads(x) for x in f]
+
+        self.assertEqual(
+            [dict(REGION, data_type="dong_complete", time_stamp="20201012")],
+            entries,
+        )
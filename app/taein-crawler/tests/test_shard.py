@@ -0,0 +1,33 @@
+import json
+import struct
+import unittest
+
+from taein_crawler.crawler.shard import (
+    SHARD_MAGIC,
+    SHARD_VERSION,
+    TaeinShardWriter,
+)
+
+
+class TaeinShardWriterTest(unittest.TestCase):
+    def test_to_bytes(self) -> None:
+        writer = TaeinShardWriter()
+        writer.add("a_statistics.html", b"statistics")
+        writer.add("a_bid_1.html", "입찰".encode("utf-8"))
+        body = writer.to_bytes()
+
+        self.assertTrue(body.startswith(SHARD_MAGIC))
+        offset = len(SHARD_MAGIC)
+        version, index_length = struct.unpack_from(">BI", body, offset)
+        self.assertEqual(SHARD_VERSION, version)
+
+        offset += struct.calcsize(">BI")
+        index = json.loads(body[offset:offset + index_length])
+        data = body[offset + index_length:]
+        self.assertEqual(
+            ["a_statistics.html", "a_bid_1.html"], [x["name"] for x in index]
+        )
+        self.assertEqual(
+            [b"statistics", "입찰".encode("utf-8")],
+            [data[x["offset"]:x["offset"] + x["length"]] for x in index],
+        )
@@ -0,0 +1,76 @@
+import decimal
+import json
+import types
+import unittest
+from unittest import mock
+
+from taein_crawler.crawler.sidecar import (
+    SIDECAR_SCHEMA_VERSION,
+    TaeinSidecar,
+    _json_default,
+    taein_schema,
+)
+
+
+def bid_data(**kwargs: object) -> types.SimpleNamespace:
+    values = dict(
+        bid_date_str="2020.10.12",
+        bid_date=None,
+        bid_event_number="2019타경12345",
+        address="서울 강남구 개포동 12",
+        bid_judged_price=1000000000,
+        bid_success_price=950000000,
+        average_bid_rate_str="95.0",
+        average_bid_rate=decimal.Decimal("95.0"),
+        bidder_count=7,
+        bid_kind="아파트",
+    )
+    values.update(kwargs)
+    return types.SimpleNamespace(**values)
+
+
+class JsonDefaultTest(unittest.TestCase):
+    def test_decimal_keeps_precision(self) -> None:
+        value = decimal.Decimal("1234567890.123456789")
+        self.assertEqual("1234567890.123456789", _json_default(value))
+
+
+class TaeinSidecarTest(unittest.TestCase):
+    def test_bid_page(self) -> None:
+        sidecar = TaeinSidecar()
+        response = types.SimpleNamespace(taein_bid_list=[bid_data()])
+        with mock.patch.object(
+            taein_schema.TaeinBidResponse, "from_html", return_value=response
+        ):
+            sidecar.add_bid_page("a_bid_1.html", "<html></html>")
+
+        lines = sidecar.to_bytes().decode("utf-8").splitlines()
+        self.assertEqual(1, len(lines))
+        row = json.loads(lines[0])
+        self.assertEqual(SIDECAR_SCHEMA_VERSION, row["schema_version"])
+        self.assertEqual("bid", row["type"])
+        self.assertEqual("95.0", row["record"]["average_bid_rate"])
+
+    def test_failed_page_invalidates_sidecar(self) -> None:
+        sidecar = TaeinSidecar()
+        with mock.patch.object(
+            taein_schema.TaeinBidResponse,
+            "from_html",
+            side_effect=ValueError("broken page"),
+        ):
+            sidecar.add_bid_page("a_bid_1.html", "<html></html>")
+
+        self.assertFalse(sidecar.valid)
+
+    def test_parsed_page_is_not_parsed_again(self) -> None:
+        sidecar = TaeinSidecar()
+        with mock.patch.object(
+            taein_schema.TaeinStatisticsResponse, "from_html"
+        ) as from_html:
+            sidecar.add_statistics_page(
+                "a_statistics.html", "<html></html>", {"sido_name": "서울"}
+            )
+
+        from_html.assert_not_called()
+        row = json.loads(sidecar.to_bytes().decode("utf-8"))
+        self.assertEqual({"sido_name": "서울"}, row["record"])
@@ -0,0 +1,117 @@
+import os
+import unittest
+
+import bs4
+
+from taein_crawler.client.data import (
+    TaeinBidResponse,
+    TaeinStatisticsResponse,
+    find_bid_result_tables,
+)
+
+try:
+    from crawler import taein_schema
+except ImportError:
+    taein_schema = None
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(file_name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, file_name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TrimHtmlTest(unittest.TestCase):
+    def test_bid_page_keeps_only_result_table(self) -> None:
+        response = TaeinBidResponse.from_html(
+            read_fixture("bid_page.html"), trim=True
+        )
+        soup = bs4.BeautifulSoup(response.trimmed_data, "lxml")
+
+        tables = soup.find_all("table")
+        self.assertEqual(["list_tbl"], [x["class"][0] for x in tables])
+        self.assertIn("2019타경12345", response.trimmed_data)
+        self.assertLess(len(response.trimmed_data), len(response.raw_data))
+
+    def test_bid_page_without_result_table_keeps_all_tables(self) -> None:
+        soup = bs4.BeautifulSoup(
+            "<table id='a'><tr><td>a</td></tr></table>"
+            "<table id='b'><tr><td>b</td></tr></table>",
+            "lxml",
+        )
+        self.assertEqual(
+            ["a", "b"], [x["id"] for x in find_bid_result_tables(soup)]
+        )
+
+    def test_trimmed_data_only_when_trimming(self) -> None:
+        data = read_fixture("bid_page.html")
+        self.assertIsNone(TaeinBidResponse.from_html(data).trimmed_data)
+        self.assertIsNone(
+            TaeinStatisticsResponse.from_html(
+                read_fixture("statistics_page.html")
+            ).trimmed_data
+        )
+
+    def test_statistics_page_keeps_header_and_statistics(self) -> None:
+        response = TaeinStatisticsResponse.from_html(
+            read_fixture("statistics_page.html"), trim=True
+        )
+        trimmed = TaeinStatisticsResponse.from_html(response.trimmed_data)
+
+        self.assertEqual(response.bid_count, trimmed.bid_count)
+        self.assertEqual(
+            response.dong_statistics_exist, trimmed.dong_statistics_exist
+        )
+        self.assertNotIn("top_menu", response.trimmed_data)
+
+
+@unittest.skipIf(taein_schema is None, "crawler.taein_schema is required")
+class TrimRoundTripTest(unittest.TestCase):
+    """trim 한 페이지를 store 의 파서로 읽어도 원본과 같아야 합니다."""
+
+    def test_statistics_page(self) -> None:
+        from taein_crawler.crawler.sidecar import statistics_to_json
+
+        data = read_fixture("statistics_page.html")
+        trimmed_data = TaeinStatisticsResponse.from_html(
+            data, trim=True
+        ).trimmed_data
+        self.assertEqual(
+            statistics_to_json(
+                taein_schema.TaeinStatisticsResponse.from_html(data)
+            ),
+            statistics_to_json(
+                taein_schema.TaeinStatisticsResponse.from_html(trimmed_data)
+            ),
+        )
+
+    def test_bid_page(self) -> None:
+        from taein_crawler.crawler.sidecar import bid_to_json
+
+        data = read_fixture("bid_page.html")
+        trimmed_data = TaeinBidResponse.from_html(data, trim=True).trimmed_data
+        self.assertEqual(
+            [
+                bid_to_json(x)
+                for x in taein_schema.TaeinBidResponse.from_html(
+                    data
+                ).taein_bid_list
+            ],
+            [
+                bid_to_json(x)
+                for x in taein_schema.TaeinBidResponse.from_html(
+                    trimmed_data
+                ).taein_bid_list
+            ],
+        )
+
+    def test_falls_back_to_raw_page_when_values_differ(self) -> None:
+        from taein_crawler.crawler.trim import _verified
+
+        self.assertEqual(
+            ("raw", True), _verified(lambda x: x == "raw", "raw", "trimmed")
+        )
+        self.assertEqual(
+            ("trimmed", 1), _verified(lambda x: 1, "raw", "trimmed")
+        )
@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+
+from taein_crawler.crawler.exc import TaeinCrawlerUploadError
+from taein_crawler.crawler.uploader import TaeinUploader
+
+
+def create_uploader(s3_client: mock.Mock) -> TaeinUploader:
+    uploader = TaeinUploader(
+        s3_client, max_workers=2, max_pending=4, max_trials=1
+    )
+    # 재시도 간격을 기다리지 않도록 한 번만 호출합니다
+    uploader.retryer = mock.Mock(run=lambda f: f())
+    return uploader
+
+
+class TaeinUploaderTest(unittest.TestCase):
+    def test_upload_calls_callback(self) -> None:
+        s3_client = mock.Mock()
+        uploaded = list()
+        uploader = create_uploader(s3_client)
+        try:
+            uploader.submit(
+                "folder",
+                "a_bid_1.html",
+                b"<html></html>",
+                "text/html",
+                on_uploaded=lambda key, body: uploaded.append((key, body)),
+            )
+            uploader.flush()
+        finally:
+            uploader.shutdown()
+
+        self.assertEqual([("folder/a_bid_1.html", b"<html></html>")], uploaded)
+        kwargs = s3_client.upload_any_file.call_args[1]
+        self.assertEqual("folder", kwargs["folder_name"])
+        self.assertEqual("a_bid_1.html", kwargs["file_name"])
+        self.assertEqual("text/html", kwargs["mime_type"])
+
+    def test_flush_reports_failed_keys(self) -> None:
+        s3_client = mock.Mock()
+        s3_client.upload_any_file.side_effect = OSError("denied")
+        uploaded = list()
+        uploader = create_uploader(s3_client)
+        try:
+            uploader.submit(
+                "folder",
+                "a_bid_1.html",
+                b"<html></html>",
+                "text/html",
+                on_uploaded=lambda key, body: uploaded.append(key),
+            )
+            with self.assertRaises(TaeinCrawlerUploadError) as ctx:
+                uploader.flush()
+        finally:
+            uploader.shutdown()
+
+        self.assertEqual(["folder/a_bid_1.html"], ctx.exception.args[1])
+        self.assertEqual([], uploaded)
+
+    def test_flush_clears_pending(self) -> None:
+        uploader = create_uploader(mock.Mock())
+        try:
+            uploader.submit("folder", "a.html", b"a", "text/html")
+            uploader.flush()
+            self.assertEqual([], uploader.pending)
+            uploader.flush()
+        finally:
+            uploader.shutdown()
+
+    def test_submit_raises_after_failure(self) -> None:
+        s3_client = mock.Mock()
+        s3_client.upload_any_file.side_effect = OSError("denied")
+        uploader = create_uploader(s3_client)
+        try:
+            future = uploader.submit("folder", "a.html", b"a", "text/html")
+            with self.assertRaises(OSError):
+                future.result()
+
+            # 실패한 뒤의 페이지는 업로드하지 않고 크롤링을 멈춥니다
+            with self.assertRaises(TaeinCrawlerUploadError) as ctx:
+                uploader.submit("folder", "b.html", b"b", "text/html")
+        finally:
+            uploader.shutdown()
+
+        self.assertEqual(["folder/a.html"], ctx.exception.args[1])
+        self.assertEqual(1, s3_client.upload_any_file.call_count)
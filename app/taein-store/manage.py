@@ -1,4 +1,6 @@
 import code
+import contextlib
+import datetime
 import os
 import typing
 
@@ -12,10 +14,17 @@ from crawler.aws_client import CloudWatchClient
 from dotenv import load_dotenv, find_dotenv
 from tanker.utils.logging import setup_logging
 import taein_store.config
-from taein_store.store import TaeinStore
+from taein_store.store import (
+    TaeinCompactor,
+    TaeinStore,
+    TaeinStoreWorker,
+    TaeinStreamStore,
+)
 
 logger = structlog.get_logger(__name__)
 
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
 
 try:
     if not os.path.exists("./.env"):
@@ -36,8 +45,8 @@ def init_runner(context: Context, run_by: str) -> typing.Callable:
     sentry_sdk.init(dsn=context.config.get("SENTRY_DSN"))
 
     def runner() -> None:
-        store = TaeinStore(context.config)
-        store.run(run_by)
+        with contextlib.closing(TaeinStore(context.config)) as store:
+            store.run(run_by)
 
     return runner
 
@@ -84,15 +93,131 @@ def shell(ctx: typing.Any, no_ipython: typing.Any) -> None:
 
 
 @cli.command()
+@click.option(
+    "--force",
+    "force",
+    default=False,
+    is_flag=True,
+    help="이미 적재한 객체도 다시 적재",
+)
 @click.pass_context
-def run(ctx: typing.Any) -> None:
+def run(ctx: typing.Any, force: bool) -> None:
     context: Context = ctx.obj["context"]
+    if force:
+        context.config["FORCE_LOAD"] = True
 
     runner = init_runner(context, "DEVELOPER")
 
     runner()
 
 
+@cli.command()
+@click.option(
+    "--month",
+    "month",
+    default=None,
+    help="압축할 달(YYYY-MM), 없으면 지난 달까지 남은 실행을 모두 압축",
+)
+@click.pass_context
+def compact(ctx: typing.Any, month: typing.Optional[str]) -> None:
+    context: Context = ctx.obj["context"]
+
+    setup_logging(context.config["DEBUG"])
+
+    compactor = TaeinCompactor(context.config)
+    compactor.run(month)
+
+
+@cli.command()
+@click.option(
+    "--force",
+    "force",
+    default=False,
+    is_flag=True,
+    help="이미 적재한 객체도 다시 적재",
+)
+@click.pass_context
+def worker(ctx: typing.Any, force: bool) -> None:
+    """
+    여러 host 에서 실행하면 lease 로 (시도, 구군) 단위 작업을 나눠서
+    같은 크롤링 결과를 적재합니다.
+    """
+    context: Context = ctx.obj["context"]
+    if force:
+        context.config["FORCE_LOAD"] = True
+
+    setup_logging(context.config["DEBUG"])
+
+    sentry_sdk.init(dsn=context.config.get("SENTRY_DSN"))
+
+    with contextlib.closing(TaeinStoreWorker(context.config)) as store_worker:
+        store_worker.run("WORKER")
+
+
+@cli.command()
+@click.option("--from", "from_date", default=None, help="YYYY-MM-DD")
+@click.option("--to", "to_date", default=None, help="YYYY-MM-DD")
+@click.option(
+    "--log-id", "log_ids", multiple=True, help="crawler log id (여러 개 가능)"
+)
+@click.pass_context
+def load(
+    ctx: typing.Any,
+    from_date: typing.Optional[str],
+    to_date: typing.Optional[str],
+    log_ids: typing.Tuple[str, ...],
+) -> None:
+    """
+    여러 크롤링 결과를 한 번에 적재합니다. --from/--to 는 run catalog 에서
+    완료된 실행을 찾습니다.
+    """
+    context: Context = ctx.obj["context"]
+
+    setup_logging(context.config["DEBUG"])
+
+    sentry_sdk.init(dsn=context.config.get("SENTRY_DSN"))
+
+    store = TaeinStore(context.config)
+    log_id_prefixes = [store.fetch_log_prefix(x) for x in log_ids]
+    if from_date or to_date:
+        log_id_prefixes.extend(
+            x.prefix
+            for x in store.fetch_catalog_runs(
+                _date_time_stamp(from_date or "1970-01-01"),
+                _date_time_stamp(to_date or "9999-12-30", days=1),
+            )
+        )
+    if not log_id_prefixes:
+        raise click.UsageError("--from/--to 또는 --log-id 가 필요합니다")
+
+    with contextlib.closing(store):
+        store.run_backfill("BACKFILL", sorted(set(log_id_prefixes)))
+
+
+def _date_time_stamp(date: str, days: int = 0) -> float:
+    """crawler 의 폴더 날짜와 같은 한국 시간 기준 timestamp"""
+    value = datetime.datetime.strptime(date, "%Y-%m-%d").replace(
+        tzinfo=KST
+    ) + datetime.timedelta(days=days)
+    return value.timestamp()
+
+
+@cli.command()
+@click.pass_context
+def follow(ctx: typing.Any) -> None:
+    """
+    진행 중인 크롤링을 따라가며 동이 완료될 때마다 적재합니다.
+    """
+    context: Context = ctx.obj["context"]
+
+    setup_logging(context.config["DEBUG"])
+
+    sentry_sdk.init(dsn=context.config.get("SENTRY_DSN"))
+
+    with contextlib.closing(TaeinStreamStore(context.config)) as stream_store:
+        stream_store.run("STREAM")
+
+
 # scheduled tasks로 돌릴 때 사용하는 함수이고, cloudwatch 로그를 찍습니다.
 @cli.command()
 @click.pass_context
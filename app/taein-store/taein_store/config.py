@@ -3,6 +3,7 @@ config
 ======
 
 """
+import os
 import typing
 
 import tanker.config
@@ -20,6 +21,17 @@ SCHEMA = {
     'DEBUG': fields.BooleanField(optional=True),
     #: SQLAlchemy URI
     'SQLALCHEMY_DATABASE_URI': fields.StringField(optional=True),
+    #: PostgreSQL 연결 pool 크기
+    'DB_POOL_SIZE': fields.IntegerField(optional=True, default=5),
+    'DB_MAX_OVERFLOW': fields.IntegerField(optional=True, default=10),
+    #: pool 에서 꺼낸 연결이 살아있는지 먼저 확인합니다
+    'DB_POOL_PRE_PING': fields.BooleanField(optional=True, default=True),
+    #: psycopg2 executemany 방식
+    'DB_EXECUTEMANY_MODE': fields.OneOfField({
+        'default',
+        'batch',
+        'values',
+    }, default='values'),
     #: AWS sepecific access key id value
     "AWS_ACCESS_KEY_ID": fields.StringField(optional=True),
     #: AWS sepecific secret access key value
@@ -43,11 +55,50 @@ SCHEMA = {
     'REGION_REGEX_LEVEL_2': fields.StringField(optional=True, default="강남구"),
     # 동, 읍, 면 지역
     'REGION_REGEX_LEVEL_3': fields.StringField(optional=True, default="개포동"),
+    # S3 본문을 미리 내려받는 thread 수, 0 이면 순서대로 내려받습니다
+    'PREFETCH_WORKERS': fields.IntegerField(optional=True, default=8),
+    # 미리 내려받아 두는 본문의 최대 크기(MB)
+    'PREFETCH_MAX_MB': fields.IntegerField(optional=True, default=256),
+    # html 을 파싱하는 process 수, 1 이하이면 store process 에서 파싱합니다
+    'PARSE_WORKERS': fields.IntegerField(optional=True),
+    # 동 단위로 DB 에 저장하는 worker thread 수
+    'LOAD_WORKERS': fields.IntegerField(optional=True, default=4),
+    # worker 의 lease 유효 시간(초), 연장되지 않으면 다른 worker 가 가져갑니다
+    'LEASE_TTL_SECONDS': fields.IntegerField(optional=True, default=300),
+    # 다른 worker 의 작업이 끝나기를 기다리는 간격(초)
+    'LEASE_POLL_SECONDS': fields.IntegerField(optional=True, default=30),
+    # 작업을 가져갈 수 있는 최대 횟수, 넘으면 실패한 작업으로 남깁니다
+    'LEASE_MAX_ATTEMPTS': fields.IntegerField(optional=True, default=3),
+    # 스트리밍 적재에서 새 manifest 를 확인하는 간격(초)
+    'STREAM_POLL_SECONDS': fields.IntegerField(optional=True, default=30),
+    # 새 manifest 가 이 시간(분) 동안 없으면 crawler 가 멈춘 것으로 봅니다
+    'STREAM_STALE_MINUTES': fields.IntegerField(optional=True, default=60),
+    # S3 manifest 대신 읽을 crawler 의 NOTIFY_FILE
+    'STREAM_QUEUE_FILE': fields.StringField(optional=True, default=None),
+    # 파싱된 레코드를 캐싱할 로컬 폴더, 없으면 캐싱하지 않습니다
+    'RECORD_CACHE_DIR': fields.StringField(optional=True, default=None),
+    # 레코드 캐시의 최대 크기(MB)
+    'RECORD_CACHE_MAX_MB': fields.IntegerField(optional=True, default=1024),
+    # 메모리에 들고 있는 압축 보관본의 최대 크기(MB)
+    'ARCHIVE_CACHE_MAX_MB': fields.IntegerField(optional=True, default=512),
+    # 적재 기록(ledger)에 있는 객체도 다시 적재합니다
+    'FORCE_LOAD': fields.BooleanField(optional=True, default=False),
+    # 저장된 낙찰사례 bloom filter 파일, 없으면 사용하지 않습니다
+    'BID_FILTER_FILE': fields.StringField(optional=True, default=None),
+    # bloom filter 에 넣는 최근 낙찰사례 기간(일)
+    'BID_FILTER_DAYS': fields.IntegerField(optional=True, default=31),
+    # bloom filter 에 넣을 최대 낙찰사례 수
+    'BID_FILTER_CAPACITY': fields.IntegerField(
+        optional=True, default=2000000
+    ),
+    # 낙찰사례를 한 번에 저장(upsert)할 행 수
+    'BID_BATCH_SIZE': fields.IntegerField(optional=True, default=500),
 }
 
 
 def load() -> typing.Dict[str, typing.Any]:
     config = tanker.config.load_from_env(prefix='STORE_', schema=SCHEMA)
     config.setdefault('DEBUG', config['ENVIRONMENT'] in {'local', 'test'})
+    config.setdefault('PARSE_WORKERS', os.cpu_count() or 1)
 
     return config
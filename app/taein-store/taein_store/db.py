@@ -1,19 +1,186 @@
+import contextlib
 import typing
 
 import sqlalchemy as sa
 from loan_model.models.base import Model as LoanModel
 from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine.url import make_url
+
+from taein_store.models import metadata as store_metadata
 
 
 def create_session_factory(
     config: typing.Dict[str, typing.Any]
 ) -> orm.session:
     db_uri = config["SQLALCHEMY_DATABASE_URI"]
-    db_engine = sa.create_engine(db_uri)
+    engine_options: typing.Dict[str, typing.Any] = dict()
+    if make_url(db_uri).get_backend_name() == "postgresql":
+        engine_options.update(
+            pool_size=config["DB_POOL_SIZE"],
+            max_overflow=config["DB_MAX_OVERFLOW"],
+            pool_pre_ping=config["DB_POOL_PRE_PING"],
+            executemany_mode=config["DB_EXECUTEMANY_MODE"],
+        )
+    db_engine = sa.create_engine(db_uri, **engine_options)
     session_factory = orm.sessionmaker(bind=db_engine)
     return session_factory
 
 
+@contextlib.contextmanager
+def session_scope(
+    session_factory: orm.sessionmaker,
+) -> typing.Iterator[orm.Session]:
+    """하나의 session 과 transaction 으로 묶어서 끝나면 commit 합니다."""
+    session = session_factory()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
 def init_loan_db_schema(session: orm.Session):
     LoanModel.metadata.drop_all(session.bind)
     LoanModel.metadata.create_all(session.bind)
+
+
+def init_store_db_schema(session_factory: orm.sessionmaker) -> None:
+    """store 가 관리하는 테이블을 없으면 만듭니다."""
+    store_metadata.create_all(session_factory.kw["bind"], checkfirst=True)
+
+
+def foreign_key_column(table: sa.Table, referred_table: sa.Table) -> str:
+    """table 에서 referred_table 을 참조하는 컬럼 이름"""
+    for column in table.columns:
+        if any(x.column.table is referred_table for x in column.foreign_keys):
+            return column.name
+    raise ValueError(f"{table.name} does not refer {referred_table.name}")
+
+
+def has_unique_key(table: sa.Table, columns: typing.List[str]) -> bool:
+    """columns 와 같은 컬럼들의 unique 제약이나 unique index 가 있는지"""
+    key_sets = [
+        {x.name for x in constraint.columns}
+        for constraint in table.constraints
+        if isinstance(constraint, sa.UniqueConstraint)
+    ]
+    key_sets.extend(
+        {x.name for x in index.columns}
+        for index in table.indexes
+        if index.unique
+    )
+    return set(columns) in key_sets
+
+
+class BulkUpserter(object):
+    """
+    행들을 임시 staging 테이블에 넣고 INSERT ... SELECT ... ON CONFLICT 한
+    문장으로 table 에 반영합니다. 충돌 기준은 key_columns 이고 table 에
+    같은 컬럼의 unique 제약이 있어야 합니다. staging 테이블은 DB 연결마다
+    한 번만 만들고 batch 사이에는 행만 지웁니다.
+    """
+
+    def __init__(self, table: sa.Table, key_columns: typing.List[str]) -> None:
+        super().__init__()
+        self.table = table
+        self.key_columns = key_columns
+        self.staging = self.staging_table()
+
+    @classmethod
+    def create(
+        cls, table: sa.Table, key_columns: typing.List[str]
+    ) -> "BulkUpserter":
+        if not has_unique_key(table, key_columns):
+            raise ValueError(
+                f"{table.name} has no unique key({', '.join(key_columns)})"
+            )
+        return cls(table, key_columns)
+
+    def staging_table(self) -> sa.Table:
+        columns: typing.List[sa.Column] = list()
+        for column in self.table.columns:
+            if column.primary_key:
+                continue
+            # 갱신될 때 값이 바뀌는 컬럼은 staging 에서 갱신 값을 받습니다
+            default = column.onupdate or column.default
+            server_default = column.server_default
+            columns.append(
+                sa.Column(
+                    column.name,
+                    column.type,
+                    default=default.arg if default is not None else None,
+                    server_default=(
+                        server_default.arg
+                        if isinstance(server_default, sa.DefaultClause)
+                        else None
+                    ),
+                )
+            )
+        return sa.Table(
+            f"{self.table.name}_staging",
+            sa.MetaData(),
+            *columns,
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DELETE ROWS",
+        )
+
+    def prepare_staging(self, session: orm.Session) -> sa.Table:
+        connection = session.connection()
+        # 임시 테이블은 pool 로 돌아간 DB 연결에 남아 있습니다
+        info_key = f"bulk_upserter_staging:{self.staging.name}"
+        if not connection.info.get(info_key):
+            self.staging.create(connection, checkfirst=True)
+            connection.info[info_key] = True
+            # 만든 transaction 이 rollback 되면 테이블도 사라집니다
+            sa.event.listen(
+                session,
+                "after_rollback",
+                lambda _: connection.info.pop(info_key, None),
+                once=True,
+            )
+        return self.staging
+
+    def upsert(
+        self,
+        session: orm.Session,
+        rows: typing.List[typing.Dict[str, typing.Any]],
+    ) -> None:
+        """commit 은 호출하는 쪽의 transaction 에서 합니다."""
+        # 한 문장에서 같은 행을 두 번 갱신할 수 없으므로 마지막 값만 남깁니다
+        unique_rows = {
+            tuple(x.get(key) for key in self.key_columns): x for x in rows
+        }
+        if not unique_rows:
+            return
+
+        staging = self.prepare_staging(session)
+        connection = session.connection()
+        connection.execute(staging.insert(), list(unique_rows.values()))
+
+        # worker 들이 같은 순서로 행을 잠그도록 key 순서로 반영합니다
+        column_names = [x.name for x in staging.columns]
+        statement = postgresql.insert(self.table).from_select(
+            column_names,
+            sa.select([staging.c[x] for x in column_names]).order_by(
+                *[staging.c[x] for x in self.key_columns]
+            ),
+        )
+        update_columns = set(rows[0]) | {
+            x.name for x in self.table.columns if x.onupdate is not None
+        }
+        statement = statement.on_conflict_do_update(
+            index_elements=self.key_columns,
+            set_={
+                x: statement.excluded[x]
+                for x in column_names
+                if x in update_columns and x not in self.key_columns
+            },
+        )
+        connection.execute(statement)
+        # commit 할 때도 비워지지만 같은 transaction 의 다음 batch 를 위해
+        # 바로 비웁니다
+        connection.execute(staging.delete())
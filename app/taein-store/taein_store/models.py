@@ -0,0 +1,55 @@
+"""
+store 가 스스로 관리하는 테이블입니다. loan_model 의 테이블과 달리
+store 가 처음 사용할 때 만듭니다.
+"""
+import sqlalchemy as sa
+
+metadata = sa.MetaData()
+
+#: 여러 store worker 가 (실행, 시도, 구군) 단위로 나눠 갖는 작업
+store_lease_table = sa.Table(
+    "taein_store_lease",
+    metadata,
+    sa.Column("run_prefix", sa.String, primary_key=True),
+    sa.Column("sido_name", sa.String, primary_key=True),
+    sa.Column("gugun_name", sa.String, primary_key=True),
+    #: pending, leased, done, failed
+    sa.Column("status", sa.String, nullable=False, default="pending"),
+    sa.Column("owner", sa.String, nullable=True),
+    sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("attempts", sa.Integer, nullable=False, default=0),
+)
+
+#: 적재를 마친 S3 객체. 같은 버전이면 다시 적재하지 않습니다
+store_load_ledger_table = sa.Table(
+    "taein_store_load_ledger",
+    metadata,
+    sa.Column("object_key", sa.String, primary_key=True),
+    #: 따옴표를 뺀 ETag
+    sa.Column("version", sa.String, nullable=True),
+    sa.Column(
+        "loaded_at",
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+    ),
+)
+
+#: 마지막으로 저장한 통계 값의 fingerprint. 같으면 다시 쓰지 않습니다
+store_statistics_fingerprint_table = sa.Table(
+    "taein_store_statistics_fingerprint",
+    metadata,
+    #: sido, gugun, dong
+    sa.Column("level", sa.String, primary_key=True),
+    sa.Column("region_id", sa.Integer, primary_key=True),
+    sa.Column("area_range_id", sa.Integer, primary_key=True),
+    sa.Column("start_date_str", sa.String, primary_key=True),
+    sa.Column("end_date_str", sa.String, primary_key=True),
+    sa.Column("fingerprint", sa.String, nullable=False),
+    sa.Column(
+        "updated_at",
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+    ),
+)
@@ -1,6 +1,12 @@
 from .store import TaeinStore
+from .compact import TaeinCompactor
+from .worker import TaeinStoreWorker
+from .stream import TaeinStreamStore
 
 
 __all__ = [
     'TaeinStore',
+    'TaeinCompactor',
+    'TaeinStoreWorker',
+    'TaeinStreamStore',
 ]
@@ -0,0 +1,289 @@
+import datetime
+import decimal
+import hashlib
+import json
+import math
+import os
+import secrets
+import struct
+import threading
+import typing
+
+import sqlalchemy as sa
+import structlog
+from sqlalchemy import orm
+
+from taein_store.db import session_scope
+
+logger = structlog.get_logger(__name__)
+
+#: 저장되지 않은 낙찰사례를 DB 에서 다시 확인하게 되는 확률
+BID_FILTER_ERROR_RATE = 1e-6
+
+BidRow = typing.Dict[str, typing.Any]
+
+
+class BloomFilter(object):
+    """bytearray 위의 bloom filter 입니다. salt 가 다르면 다른 hash 를 씁니다."""
+
+    def __init__(
+        self,
+        bit_count: int,
+        hash_count: int,
+        salt: bytes,
+        bits: typing.Optional[bytearray] = None,
+        item_count: int = 0,
+    ) -> None:
+        super().__init__()
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.salt = salt
+        self.bits = bits if bits is not None else bytearray(
+            (bit_count + 7) // 8
+        )
+        self.item_count = item_count
+
+    @classmethod
+    def create(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        bit_count = max(
+            8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        hash_count = max(1, round(bit_count / capacity * math.log(2)))
+        return cls(bit_count, hash_count, secrets.token_bytes(16))
+
+    def indexes(self, item: bytes) -> typing.Iterator[int]:
+        # 두 hash 를 섞어 hash_count 개의 위치를 만듭니다
+        digest = hashlib.sha256(self.salt + item).digest()
+        h1, h2 = struct.unpack_from("<QQ", digest)
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, item: bytes) -> None:
+        for index in self.indexes(item):
+            self.bits[index >> 3] |= 1 << (index & 7)
+        self.item_count += 1
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(
+            self.bits[index >> 3] & (1 << (index & 7))
+            for index in self.indexes(item)
+        )
+
+
+def bid_value(value: typing.Any) -> str:
+    """파싱한 값과 DB 에서 읽은 값을 같은 문자열로 만듭니다."""
+    if isinstance(value, datetime.datetime):
+        if value.time() == datetime.time():
+            value = value.date()
+    if isinstance(value, (int, float, decimal.Decimal)) and not isinstance(
+        value, bool
+    ):
+        return repr(float(value))
+    return str(value)
+
+
+def bid_item(row: BidRow) -> bytes:
+    """컬럼 이름 순서로 낙찰사례의 모든 값을 이어붙입니다."""
+    return json.dumps(
+        [[key, bid_value(row[key])] for key in sorted(row)],
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+class TaeinBidFilter(object):
+    """
+    최근 days 일 동안 저장된 낙찰사례(모든 컬럼 값)의 bloom filter 입니다.
+    filter 에 없는 낙찰사례는 저장되지 않았거나 값이 바뀐 것이므로 바로
+    저장하고, filter 에 있는 낙찰사례는 DB 에서 같은 값인지 확인한 뒤에만
+    건너뜁니다. 하루에 한 번 DB 에서 새로 만들고 그 사이에는 파일로
+    저장해서 다음 실행이 이어서 사용합니다. capacity 를 넘으면 더 넣지
+    않으므로 그 뒤의 낙찰사례는 다음 날 새로 만들 때까지 DB 에 씁니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: orm.sessionmaker,
+        table: sa.Table,
+        columns: typing.List[str],
+        key_columns: typing.List[str],
+        file_path: str,
+        *,
+        days: int,
+        capacity: int,
+    ) -> None:
+        super().__init__()
+        self.session_factory = session_factory
+        self.table = table
+        #: bid_row 가 만드는 컬럼들
+        self.columns = columns
+        #: 낙찰사례를 구분하는 컬럼들
+        self.key_columns = key_columns
+        self.file_path = file_path
+        self.days = days
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.bloom: typing.Optional[BloomFilter] = None
+        self.window_start: typing.Optional[datetime.date] = None
+        self.full = False
+        self.suppressed_count = 0
+        self.false_positive_count = 0
+
+    def stored(
+        self, session: orm.Session, rows: typing.List[BidRow]
+    ) -> typing.List[bool]:
+        """rows 마다 같은 값으로 이미 저장되어 있는지 반환합니다."""
+        items = [bid_item(x) for x in rows]
+        with self.lock:
+            bloom = self.ensure_bloom()
+            # filter 에 없으면 확실히 저장되지 않은 낙찰사례입니다
+            candidates = [
+                i
+                for i, row in enumerate(rows)
+                if self.in_window(row.get("bid_date")) and items[i] in bloom
+            ]
+        if not candidates:
+            return [False] * len(rows)
+
+        stored_items = self.fetch_stored_items(
+            session, [rows[x] for x in candidates]
+        )
+        stored = [False] * len(rows)
+        for i in candidates:
+            stored[i] = items[i] in stored_items
+        with self.lock:
+            self.suppressed_count += sum(stored)
+            self.false_positive_count += len(candidates) - sum(stored)
+        return stored
+
+    def fetch_stored_items(
+        self, session: orm.Session, rows: typing.List[BidRow]
+    ) -> typing.Set[bytes]:
+        """같은 key 로 저장된 낙찰사례를 읽어 bid_item 으로 반환합니다."""
+        table = self.table
+        key_columns = [table.c[x] for x in self.key_columns]
+        result = session.execute(
+            sa.select([table.c[x] for x in self.columns]).where(
+                sa.tuple_(*key_columns).in_(
+                    [tuple(row[x] for x in self.key_columns) for row in rows]
+                )
+            )
+        )
+        return {bid_item(dict(x)) for x in result}
+
+    def in_window(self, bid_date: typing.Any) -> bool:
+        if isinstance(bid_date, datetime.datetime):
+            bid_date = bid_date.date()
+        if not isinstance(bid_date, datetime.date):
+            return False
+        return self.window_start is not None and bid_date >= self.window_start
+
+    def add(self, rows: typing.Iterable[BidRow]) -> None:
+        """transaction 이 commit 된 뒤에 저장한 낙찰사례를 더합니다."""
+        with self.lock:
+            bloom = self.ensure_bloom()
+            for row in rows:
+                if not self.add_item(bloom, bid_item(row)):
+                    break
+
+    def add_item(self, bloom: BloomFilter, item: bytes) -> bool:
+        """
+        capacity 를 넘겨 넣으면 오판 확률이 커지므로 더 넣지 않고 False 를
+        반환합니다.
+        """
+        if bloom.item_count >= self.capacity:
+            if not self.full:
+                self.full = True
+                logger.info("Bid filter is full", capacity=self.capacity)
+            return False
+        bloom.add(item)
+        return True
+
+    def ensure_bloom(self) -> BloomFilter:
+        window_start = datetime.date.today() - datetime.timedelta(
+            days=self.days
+        )
+        if self.bloom is None or self.window_start != window_start:
+            self.full = False
+            self.bloom = self.load(window_start)
+            if self.bloom is None:
+                self.bloom = self.build(window_start)
+            self.window_start = window_start
+        return self.bloom
+
+    def load(
+        self, window_start: datetime.date
+    ) -> typing.Optional[BloomFilter]:
+        try:
+            with open(self.file_path, "rb") as f:
+                header = json.loads(f.readline())
+                bits = bytearray(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if (
+            header.get("window_start") != window_start.isoformat()
+            or header.get("capacity") != self.capacity
+            or header["item_count"] > self.capacity
+        ):
+            return None
+        logger.info(
+            "Load bid filter",
+            file_path=self.file_path,
+            item_count=header["item_count"],
+        )
+        return BloomFilter(
+            header["bit_count"],
+            header["hash_count"],
+            bytes.fromhex(header["salt"]),
+            bits,
+            header["item_count"],
+        )
+
+    def build(self, window_start: datetime.date) -> BloomFilter:
+        bloom = BloomFilter.create(self.capacity, BID_FILTER_ERROR_RATE)
+        table = self.table
+        with session_scope(self.session_factory) as session:
+            result = session.execute(
+                sa.select([table.c[x] for x in self.columns]).where(
+                    table.c.bid_date >= window_start
+                )
+            )
+            for row in result:
+                if not self.add_item(bloom, bid_item(dict(row))):
+                    break
+        logger.info(
+            "Build bid filter",
+            window_start=window_start.isoformat(),
+            item_count=bloom.item_count,
+        )
+        return bloom
+
+    def save(self) -> None:
+        with self.lock:
+            bloom = self.bloom
+            if bloom is None or self.window_start is None:
+                return
+            header = dict(
+                window_start=self.window_start.isoformat(),
+                capacity=self.capacity,
+                bit_count=bloom.bit_count,
+                hash_count=bloom.hash_count,
+                salt=bloom.salt.hex(),
+                item_count=bloom.item_count,
+            )
+            temp_path = f"{self.file_path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                f.write(bloom.bits)
+            os.replace(temp_path, self.file_path)
+
+    def report(self) -> None:
+        with self.lock:
+            suppressed_count, self.suppressed_count = self.suppressed_count, 0
+            false_positive_count = self.false_positive_count
+            self.false_positive_count = 0
+        logger.info(
+            "Skip stored bids",
+            suppressed_count=suppressed_count,
+            false_positive_count=false_positive_count,
+        )
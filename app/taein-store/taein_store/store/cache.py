@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pickle
+import threading
+import typing
+import zlib
+
+import structlog
+
+from taein_store.store.data import MulgunRecords
+from taein_store.store.ledger import node_object_versions
+from taein_store.store.tree import MulgunNode
+
+logger = structlog.get_logger(__name__)
+
+#: 파싱 결과가 바뀌면 올려서 이전 캐시를 쓰지 않게 합니다
+RECORD_PARSER_VERSION = 1
+CACHE_FILE_SUFFIX = ".records"
+
+
+def node_cache_key(node: MulgunNode) -> typing.Optional[str]:
+    """버전(ETag)을 모르는 객체가 있으면 캐싱하지 않습니다."""
+    versions = node_object_versions(node)
+    if not versions or not all(versions.values()):
+        return None
+    data = "\n".join(
+        [str(RECORD_PARSER_VERSION)]
+        + [f"{key}\t{version}" for key, version in sorted(versions.items())]
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class TaeinRecordCache(object):
+    """
+    동(물건종류)의 파싱된 레코드를 로컬 디스크에 저장합니다. key 는 동의
+    객체 key 와 ETag, 파서 버전으로 만들고, 캐시에 있으면 S3 GET 과 html
+    파싱을 모두 건너뜁니다. 압축 보관본의 동은 보관본의 ETag 와 member
+    이름으로 key 를 만들어서 보관본을 다시 쓰면 캐시를 쓰지 않습니다.
+    전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 파일부터
+    지웁니다.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(
+            os.path.getsize(x) for x in self.cache_files()
+        )
+
+    def cache_files(self) -> typing.List[str]:
+        return [
+            os.path.join(self.directory, x)
+            for x in os.listdir(self.directory)
+            if x.endswith(CACHE_FILE_SUFFIX)
+        ]
+
+    def path(self, cache_key: str) -> str:
+        return os.path.join(self.directory, cache_key + CACHE_FILE_SUFFIX)
+
+    def get(
+        self, node: MulgunNode
+    ) -> typing.Optional[typing.Tuple[MulgunRecords, int]]:
+        """(레코드, 파일 크기)"""
+        cache_key = node_cache_key(node)
+        if cache_key is None:
+            return None
+        path = self.path(cache_key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # 최근 사용 시간으로 mtime 을 씁니다
+            os.utime(path)
+        except OSError:
+            return None
+        return pickle.loads(zlib.decompress(data)), len(data)
+
+    def put(self, node: MulgunNode, records: MulgunRecords) -> None:
+        cache_key = node_cache_key(node)
+        if cache_key is None:
+            return
+        path = self.path(cache_key)
+        if os.path.exists(path):
+            return
+
+        data = zlib.compress(
+            pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self.lock:
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self) -> None:
+        files = sorted(self.cache_files(), key=os.path.getmtime)
+        # 매번 지우지 않도록 최대 크기의 90% 까지 줄입니다
+        target_bytes = self.max_bytes * 0.9
+        evicted_count = 0
+        for path in files:
+            if self.total_bytes <= target_bytes:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            self.total_bytes -= size
+            evicted_count += 1
+        logger.info(
+            "Evict record cache",
+            evicted_count=evicted_count,
+            total_bytes=self.total_bytes,
+        )
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import threading
+import typing
+
+import attr
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from taein_store.store.data import BidRecord, MulgunRecords, StatisticsRecord
+from taein_store.store.tree import MulgunNode
+
+#: (단계, 시도, 구군, 면적 id, 시작일, 종료일). 시도 통계의 구군은 빈
+#: 문자열입니다
+StatisticsClaim = typing.Tuple[str, str, str, int, str, str]
+
+
+def claim_lock_id(key: StatisticsClaim) -> int:
+    """PostgreSQL advisory lock 의 64bit key"""
+    digest = hashlib.sha256(
+        json.dumps(key, ensure_ascii=False).encode("utf-8")
+    ).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class TaeinStatisticsClaims(object):
+    """
+    시도/구군 통계는 그 지역의 모든 동 페이지에 들어있으므로 실행마다
+    (지역, 면적, 기간) 하나당 한 번만 저장합니다. 적재 worker 끼리 공유하며,
+    먼저 claim 한 worker 만 저장하고 transaction 이 실패하면 돌려줍니다.
+
+    PostgreSQL 에서는 동의 transaction 안에서 advisory lock 도 잡아서 다른
+    host 의 worker 가 같은 통계를 저장하는 중이면 넘어갑니다. lock 은
+    transaction 이 끝나면 함께 풀립니다.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock = threading.Lock()
+        self.run_prefix: typing.Optional[str] = None
+        self.claimed: typing.Set[StatisticsClaim] = set()
+
+    def start_run(self, run_prefix: str) -> None:
+        with self.lock:
+            if run_prefix != self.run_prefix:
+                self.run_prefix = run_prefix
+                self.claimed = set()
+
+    def claim(self, session: orm.Session, key: StatisticsClaim) -> bool:
+        with self.lock:
+            if key in self.claimed:
+                return False
+            self.claimed.add(key)
+
+        if session.bind.dialect.name != "postgresql":
+            return True
+        locked = session.execute(
+            sa.select([sa.func.pg_try_advisory_xact_lock(claim_lock_id(key))])
+        ).scalar()
+        if not locked:
+            # 다른 host 의 transaction 이 실패할 수 있으므로 이 process 의
+            # 다음 동이 다시 claim 합니다
+            self.release([key])
+        return bool(locked)
+
+    def release(self, keys: typing.Iterable[StatisticsClaim]) -> None:
+        with self.lock:
+            self.claimed.difference_update(keys)
+
+
+class TaeinNewestRunFilter(object):
+    """
+    여러 실행을 최신 실행부터 하나씩 적재할 때 더 최신 실행이 이미 저장한
+    (지역, 면적, 기간) 통계와 낙찰사례를 버려서 오래된 값으로 덮어쓰지
+    않게 합니다.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock = threading.Lock()
+        #: 이전(더 최신) 실행들이 저장한 key
+        self.loaded: typing.Set[typing.Tuple[typing.Any, ...]] = set()
+        #: 지금 적재 중인 실행이 저장한 key
+        self.current: typing.Set[typing.Tuple[typing.Any, ...]] = set()
+
+    def filter(
+        self, node: MulgunNode, records: MulgunRecords
+    ) -> MulgunRecords:
+        region = (
+            node.sido_name,
+            node.gugun_name,
+            node.dong_name,
+            node.mulgun_text,
+        )
+        statistics_list = [
+            x
+            for x in records.statistics_list
+            if self.statistics_key(region, x) not in self.loaded
+        ]
+        bid_list = [
+            x
+            for x in records.bid_list
+            if self.bid_key(region, x) not in self.loaded
+        ]
+        with self.lock:
+            self.current.update(
+                self.statistics_key(region, x) for x in statistics_list
+            )
+            self.current.update(self.bid_key(region, x) for x in bid_list)
+        return attr.evolve(
+            records, statistics_list=statistics_list, bid_list=bid_list
+        )
+
+    @staticmethod
+    def statistics_key(
+        region: typing.Tuple[str, ...], statistics: StatisticsRecord
+    ) -> typing.Tuple[typing.Any, ...]:
+        return region + (
+            "statistics",
+            statistics.building_start_area,
+            statistics.building_end_area,
+            statistics.start_date_str,
+            statistics.end_date_str,
+        )
+
+    @staticmethod
+    def bid_key(
+        region: typing.Tuple[str, ...], bid: BidRecord
+    ) -> typing.Tuple[typing.Any, ...]:
+        return region + ("bid", bid.bid_event_number, bid.bid_date_str)
+
+    def finish_run(self) -> None:
+        with self.lock:
+            self.loaded.update(self.current)
+            self.current = set()
@@ -0,0 +1,63 @@
+import gzip
+import json
+import typing
+
+import attr
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from taein_store.store.exc import TaeinStoreError
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+REFERENCE_MAGIC = b'{"taein_ref"'
+
+
+@attr.s(frozen=True)
+class PageReference(object):
+    """이전 크롤링의 같은 페이지를 가리키는 reference"""
+
+    key: str = attr.ib()
+    sha256: str = attr.ib()
+    member: typing.Optional[str] = attr.ib(default=None)
+
+
+def parse_reference(body: bytes) -> typing.Optional[PageReference]:
+    if not body.startswith(REFERENCE_MAGIC):
+        return None
+    data = json.loads(body.decode("utf-8"))
+    return PageReference(
+        key=data["key"], sha256=data["sha256"], member=data.get("member")
+    )
+
+
+def detect_page_encoding(key: str, body: bytes) -> typing.Optional[str]:
+    if key.endswith(".gz") or body.startswith(GZIP_MAGIC):
+        return "gzip"
+    if key.endswith(".zst") or body.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def decode_page(key: str, body: bytes) -> str:
+    """
+    S3 에서 받은 페이지 본문을 문자열로 변환합니다. 압축되지 않은 예전
+    크롤링 결과는 그대로 utf-8 로 디코딩합니다.
+    """
+    return decompress_body(key, body).decode("utf-8")
+
+
+def decompress_body(key: str, body: bytes) -> bytes:
+    encoding = detect_page_encoding(key, body)
+
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "zstd":
+        if zstandard is None:
+            raise TaeinStoreError(f"zstandard is not installed ({key})")
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+
+    return body
@@ -0,0 +1,192 @@
+import datetime
+import os
+import typing
+
+import structlog
+from tanker.utils.tempfile import TempDir
+
+from taein_store.store.data import (
+    COMPACTED_CATALOG_FOLDER_NAME,
+    LATEST_FILE_NAME,
+    CrawlerRunEntry,
+)
+from taein_store.store.shard import ShardFileWriter, archive_index_key
+from taein_store.store.store import TaeinStore
+
+logger = structlog.get_logger(__name__)
+
+COMPACTED_FOLDER_NAME = "compacted"
+
+#: 압축한 실행과 그 실행의 시도 이름별 압축 보관본 key
+CompactedRun = typing.Tuple[CrawlerRunEntry, typing.Dict[str, str]]
+
+
+def run_month(entry: CrawlerRunEntry) -> str:
+    """{env}/{yyyy}/{mm}/{dd}/{time_stamp}/ 형식의 prefix 에서 YYYY-MM"""
+    _, year, month = entry.prefix.split("/")[:3]
+    return f"{year}-{month}"
+
+
+class TaeinCompactor(object):
+    """
+    지난 달의 크롤링 결과를 시도별 압축 보관본 하나로 묶습니다.
+
+    보관본은 store 의 shard 형식(gzip)이고, member 는
+    {time_stamp}/{시도}/{구군}/{읍면동}/{물건종류} 이름의 파싱된 레코드
+    (jsonl) 입니다. 보관본 옆에 member 이름 목록을 함께 올리고, 압축한
+    실행은 run catalog 의 월별 압축 항목에 "compacted" 로 기록하고, LATEST
+    가 가리키는 실행이면 LATEST 도 같은 항목으로 바꿉니다.
+    원본은 이후 크롤링의 reference 가 가리킬 수 있으므로 지우지 않습니다.
+    """
+
+    def __init__(self, config: typing.Dict[str, typing.Any]) -> None:
+        super().__init__()
+        self.config = config
+        self.store = TaeinStore(config)
+        self.s3_client = self.store.s3_client
+
+    def run(self, month: typing.Optional[str] = None) -> None:
+        """month(YYYY-MM) 가 없으면 지난 달까지 남은 실행을 모두 압축합니다."""
+        month_runs: typing.Dict[str, typing.List[CrawlerRunEntry]] = dict()
+        for entry in self.store.fetch_run_catalog():
+            if entry.status in ("completed", "compacted"):
+                month_runs.setdefault(run_month(entry), list()).append(entry)
+
+        if month:
+            months = [month] if month in month_runs else list()
+        else:
+            current_month = datetime.date.today().strftime("%Y-%m")
+            months = [
+                x
+                for x in sorted(month_runs)
+                if x < current_month
+                and any(y.status == "completed" for y in month_runs[x])
+            ]
+
+        if not months:
+            logger.info("Nothing to compact", month=month)
+            return
+
+        for x in months:
+            self.compact_month(x, month_runs[x])
+
+    def compact_month(
+        self, month: str, runs: typing.List[CrawlerRunEntry]
+    ) -> None:
+        trees = [(x, self.store.fetch_run_tree(x.prefix)) for x in runs]
+        sido_names = sorted({y for _, tree in trees for y in tree.regions})
+
+        year, month_number = month.split("-")
+        folder_name = (
+            f"{COMPACTED_FOLDER_NAME}/{self.config['ENVIRONMENT']}/"
+            f"{year}/{month_number}"
+        )
+        archive_keys: typing.Dict[str, str] = dict()
+        for sido_name in sido_names:
+            writer = ShardFileWriter()
+            try:
+                for entry, tree in trees:
+                    if sido_name not in tree.regions:
+                        continue
+                    for node in tree.nodes(sido_name):
+                        records = self.store.fetch_node_records(node)
+                        writer.add(
+                            f"{entry.time_stamp}/{node.sido_name}/"
+                            f"{node.gugun_name}/{node.dong_name}/"
+                            f"{node.mulgun_text}",
+                            records.to_jsonl().encode("utf-8"),
+                        )
+                archive_keys[sido_name] = self.upload_archive(
+                    folder_name, f"{sido_name}.shard.gz", writer
+                )
+            finally:
+                writer.close()
+
+            logger.info(
+                "Compact sido",
+                month=month,
+                sido_name=sido_name,
+                member_count=len(writer.index),
+            )
+
+        self.write_catalog_entries(
+            month,
+            [
+                (
+                    entry,
+                    {
+                        x: archive_keys[x]
+                        for x in sorted(tree.regions)
+                        if x in archive_keys
+                    },
+                )
+                for entry, tree in trees
+            ]
+        )
+
+    def upload_archive(
+        self, folder_name: str, file_name: str, writer: ShardFileWriter
+    ) -> str:
+        with TempDir() as temp_dir:
+            file_path = os.path.join(str(temp_dir), file_name)
+            writer.write(file_path)
+            self.s3_client.upload_any_file(
+                folder_name=folder_name,
+                file_name=file_name,
+                file_path=file_path,
+                mime_type="application/gzip",
+                mode="rb",
+            )
+
+        archive_key = f"{folder_name}/{file_name}"
+        self.s3_client.upload_json(
+            folder_name=folder_name,
+            file_name=archive_index_key(file_name),
+            data=[x["name"] for x in writer.index],
+        )
+        return archive_key
+
+    def write_catalog_entries(
+        self, month: str, runs: typing.List[CompactedRun]
+    ) -> None:
+        """
+        crawler 가 수정하는 runs.json 은 건드리지 않고 달마다 한 객체에
+        기록합니다. 같은 달을 다시 압축하면 그 달의 객체만 바뀝니다.
+        """
+        catalog = self.store.fetch_run_catalog_data()
+        # 같은 실행의 현재 항목을 복사해서 상태만 바꿉니다
+        entries = [
+            {
+                **catalog[entry.time_stamp],
+                "status": "compacted",
+                "compacted": archive_keys,
+            }
+            for entry, archive_keys in runs
+        ]
+
+        self.s3_client.upload_json(
+            folder_name=(
+                f"{self.store.catalog_prefix()}{COMPACTED_CATALOG_FOLDER_NAME}"
+            ),
+            file_name=f"{month}.json",
+            data=entries,
+        )
+        self.update_latest(entries)
+
+    def update_latest(self, entries: typing.List[typing.Dict]) -> None:
+        """
+        store 는 LATEST 하나만 읽고 최신 실행을 적재하므로 압축한 실행이
+        LATEST 이면 압축 항목으로 바꿉니다. 그 사이 crawler 가 새 실행을
+        기록했으면 그대로 둡니다.
+        """
+        latest = self.store.fetch_latest_entry_data()
+        if latest is None:
+            return
+        for entry in entries:
+            if entry["time_stamp"] == latest["time_stamp"]:
+                self.s3_client.upload_json(
+                    folder_name=self.store.catalog_prefix().rstrip("/"),
+                    file_name=LATEST_FILE_NAME,
+                    data=entry,
+                )
+                return
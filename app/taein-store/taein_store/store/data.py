@@ -1,5 +1,14 @@
+import datetime
+import decimal
+import json
 import typing
+
 import attr
+from crawler.taein_schema import (
+    TaeinBidData,
+    TaeinBidResponse,
+    TaeinStatisticsResponse,
+)
 
 
 @attr.s
@@ -38,6 +47,8 @@ class CrawlerLogResponse(object):
     finish_time_stamp: float = attr.ib()
     total_statistics: CrawlerStatistics = attr.ib()
     area_range_list: typing.List[CrawlerAreaRange] = attr.ib()
+    #: crawler 가 올린 manifest part 갯수 (manifest 가 없던 크롤링은 0)
+    manifest_parts: int = attr.ib(default=0)
 
     @classmethod
     def from_json(
@@ -53,4 +64,449 @@ class CrawlerLogResponse(object):
             area_range_list=[
                 CrawlerAreaRange.from_json(x) for x in data["area_range"]
             ],
+            manifest_parts=data.get("manifest_parts", 0),
+        )
+
+
+@attr.s(frozen=True)
+class CrawlerRunEntry(object):
+    """crawler 가 관리하는 실행 목록(run catalog)의 항목"""
+
+    time_stamp: str = attr.ib()
+    prefix: str = attr.ib()
+    status: str = attr.ib()
+    run_by: str = attr.ib()
+    scope: typing.Dict[str, typing.Any] = attr.ib()
+    total_statistics: CrawlerStatistics = attr.ib()
+    manifest_parts: int = attr.ib(default=0)
+    #: 압축된 실행이면 시도 이름별 압축 보관본 key
+    compacted: typing.Dict[str, str] = attr.ib(factory=dict)
+
+    @classmethod
+    def from_json(
+        cls, data: typing.Dict[str, typing.Any]
+    ) -> "CrawlerRunEntry":
+        return cls(
+            time_stamp=data["time_stamp"],
+            prefix=data["prefix"],
+            status=data["status"],
+            run_by=data["run_by"],
+            scope=data.get("scope", dict()),
+            total_statistics=CrawlerStatistics.from_json(
+                data["total_statistics"]
+            ),
+            manifest_parts=data.get("manifest_parts", 0),
+            compacted=data.get("compacted", dict()),
+        )
+
+
+CATALOG_FILE_NAME = "runs.json"
+#: compactor 가 월별로 압축한 실행 항목을 기록하는 catalog 하위 폴더.
+#: runs.json 은 crawler 만 수정합니다
+COMPACTED_CATALOG_FOLDER_NAME = "compacted"
+LATEST_FILE_NAME = "LATEST.json"
+
+#: crawler 의 sidecar 형식 버전과 같아야 sidecar 를 사용합니다
+SIDECAR_SCHEMA_VERSION = 1
+SIDECAR_FILE_NAME = "records.jsonl"
+
+
+def is_sidecar_key(key: str) -> bool:
+    return key.split("/")[-1].startswith(SIDECAR_FILE_NAME)
+
+
+def _json_default(value: typing.Any) -> typing.Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        # float 로 바꾸면 가격과 면적의 정밀도를 잃습니다
+        return str(value)
+    raise TypeError(f"{type(value)} is not JSON serializable")
+
+
+#: taein_schema 가 Decimal 로 만드는 값들. json 에는 문자열로 씁니다
+STATISTICS_DECIMAL_FIELDS = (
+    "year_avg_price_rate",
+    "year_avg_bid_rate",
+    "six_month_avg_price_rate",
+    "six_month_avg_bid_rate",
+)
+BID_DECIMAL_FIELDS = (
+    "bid_judged_price",
+    "bid_success_price",
+    "average_bid_rate",
+)
+
+
+def _parse_decimals(
+    data: typing.Dict[str, typing.Any], fields: typing.Iterable[str]
+) -> typing.Dict[str, typing.Any]:
+    """html 을 파싱한 레코드와 같도록 문자열로 쓴 Decimal 을 되돌립니다."""
+    values = dict(data)
+    for field in fields:
+        value = values.get(field)
+        if isinstance(value, str):
+            try:
+                values[field] = decimal.Decimal(value)
+            except decimal.InvalidOperation:
+                pass
+    return values
+
+
+def _parse_iso_date(
+    value: str,
+) -> typing.Union[datetime.date, datetime.datetime]:
+    if len(value) == 10:
+        return datetime.date.fromisoformat(value)
+    return datetime.datetime.fromisoformat(value)
+
+
+#: 통계 페이지의 지역 단계마다 있는 값, schema 에는 {단계}_{값} 으로 있습니다
+STATISTICS_SECTION_FIELDS = (
+    "year_avg_price_rate",
+    "year_avg_bid_rate",
+    "year_bid_count",
+    "six_month_avg_price_rate",
+    "six_month_avg_bid_rate",
+    "six_month_bid_count",
+)
+
+
+def schema_section_values(
+    data: TaeinStatisticsResponse, level: str
+) -> typing.Dict[str, typing.Any]:
+    return {
+        x: getattr(data, f"{level}_{x}") for x in STATISTICS_SECTION_FIELDS
+    }
+
+
+def _statistics_header_from_schema(
+    data: TaeinStatisticsResponse,
+) -> typing.Dict[str, typing.Any]:
+    """지역별 통계를 뺀 StatisticsRecord 의 값"""
+    return dict(
+        sido_name=data.sido_name,
+        gugun_name=data.gugun_name,
+        dong_name=data.dong_name,
+        building_start_area=data.building_start_area,
+        building_end_area=data.building_end_area,
+        start_date_str=data.start_date_str,
+        start_date=data.start_date,
+        end_date_str=data.end_date_str,
+        end_date=data.end_date,
+    )
+
+
+def _statistics_header_from_json(
+    data: typing.Dict[str, typing.Any]
+) -> typing.Dict[str, typing.Any]:
+    return dict(
+        sido_name=data["sido_name"],
+        gugun_name=data["gugun_name"],
+        dong_name=data["dong_name"],
+        building_start_area=data["building_start_area"],
+        building_end_area=data["building_end_area"],
+        start_date_str=data["start_date_str"],
+        start_date=_parse_iso_date(data["start_date"]),
+        end_date_str=data["end_date_str"],
+        end_date=_parse_iso_date(data["end_date"]),
+    )
+
+
+@attr.s(frozen=True)
+class StatisticsSection(object):
+    """시도, 구군, 읍면동 중 한 지역의 통계"""
+
+    year_avg_price_rate_str: str = attr.ib()
+    year_avg_price_rate: typing.Any = attr.ib()
+    year_avg_bid_rate_str: str = attr.ib()
+    year_avg_bid_rate: typing.Any = attr.ib()
+    year_bid_count: typing.Any = attr.ib()
+    six_month_avg_price_rate_str: str = attr.ib()
+    six_month_avg_price_rate: typing.Any = attr.ib()
+    six_month_avg_bid_rate_str: str = attr.ib()
+    six_month_avg_bid_rate: typing.Any = attr.ib()
+    six_month_bid_count: typing.Any = attr.ib()
+
+    @classmethod
+    def from_schema(
+        cls, data: TaeinStatisticsResponse, level: str
+    ) -> "StatisticsSection":
+        return cls.from_values(schema_section_values(data, level))
+
+    @classmethod
+    def from_values(
+        cls, values: typing.Dict[str, typing.Any]
+    ) -> "StatisticsSection":
+        """schema_section_values 로 꺼낸 한 지역의 값으로 만듭니다."""
+
+        def value(field: str) -> typing.Any:
+            return values[field]
+
+        return cls(
+            year_avg_price_rate_str=str(value("year_avg_price_rate")),
+            year_avg_price_rate=value("year_avg_price_rate"),
+            year_avg_bid_rate_str=str(value("year_avg_bid_rate")),
+            year_avg_bid_rate=value("year_avg_bid_rate"),
+            year_bid_count=value("year_bid_count"),
+            six_month_avg_price_rate_str=str(
+                value("six_month_avg_price_rate")
+            ),
+            six_month_avg_price_rate=value("six_month_avg_price_rate"),
+            six_month_avg_bid_rate_str=str(value("six_month_avg_bid_rate")),
+            six_month_avg_bid_rate=value("six_month_avg_bid_rate"),
+            six_month_bid_count=value("six_month_bid_count"),
+        )
+
+    @classmethod
+    def from_json(
+        cls, data: typing.Dict[str, typing.Any]
+    ) -> "StatisticsSection":
+        return cls(**_parse_decimals(data, STATISTICS_DECIMAL_FIELDS))
+
+
+@attr.s(frozen=True)
+class StatisticsRecord(object):
+    """통계 페이지 하나에서 추출한 값"""
+
+    sido_name: str = attr.ib()
+    gugun_name: str = attr.ib()
+    dong_name: str = attr.ib()
+    building_start_area: typing.Any = attr.ib()
+    building_end_area: typing.Any = attr.ib()
+    start_date_str: str = attr.ib()
+    start_date: typing.Any = attr.ib()
+    end_date_str: str = attr.ib()
+    end_date: typing.Any = attr.ib()
+    sido: StatisticsSection = attr.ib()
+    gugun: StatisticsSection = attr.ib()
+    dong: StatisticsSection = attr.ib()
+
+    @classmethod
+    def from_schema(
+        cls, data: TaeinStatisticsResponse
+    ) -> "StatisticsRecord":
+        return cls(
+            **_statistics_header_from_schema(data),
+            sido=StatisticsSection.from_schema(data, "sido"),
+            gugun=StatisticsSection.from_schema(data, "gugun"),
+            dong=StatisticsSection.from_schema(data, "dong"),
+        )
+
+    @classmethod
+    def from_html(cls, data: str) -> "StatisticsRecord":
+        return cls.from_schema(TaeinStatisticsResponse.from_html(data))
+
+    @classmethod
+    def from_json(
+        cls, data: typing.Dict[str, typing.Any]
+    ) -> "StatisticsRecord":
+        return cls(
+            **_statistics_header_from_json(data),
+            sido=StatisticsSection.from_json(data["sido"]),
+            gugun=StatisticsSection.from_json(data["gugun"]),
+            dong=StatisticsSection.from_json(data["dong"]),
+        )
+
+
+#: (통계를 만드는 함수, 원본 값)
+PendingSection = typing.Tuple[
+    typing.Callable[[typing.Dict[str, typing.Any]], StatisticsSection],
+    typing.Dict[str, typing.Any],
+]
+
+
+class LazyStatisticsRecord(StatisticsRecord):
+    """
+    html 이나 sidecar 에서 읽은 통계입니다. 읍면동 통계는 바로 만들고, 같은
+    구군의 모든 동 페이지에 반복되는 시도/구군 통계는 처음 읽을 때
+    만듭니다. store 는 (지역, 면적, 기간)마다 claim 을 얻은 동에서만
+    시도/구군 통계를 읽습니다.
+
+    pickle 할 때는 만들지 않은 통계를 원본 값으로 보내므로 파싱 process 와
+    레코드 캐시를 거쳐도 필요할 때만 만듭니다.
+    """
+
+    def __init__(
+        self,
+        values: typing.Dict[str, typing.Any],
+        pending: typing.Dict[str, PendingSection],
+    ) -> None:
+        # frozen 이므로 object.__setattr__ 으로 값을 넣습니다
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_pending", dict(pending))
+
+    @classmethod
+    def from_schema(
+        cls, data: TaeinStatisticsResponse
+    ) -> "LazyStatisticsRecord":
+        return cls(
+            dict(
+                _statistics_header_from_schema(data),
+                dong=StatisticsSection.from_schema(data, "dong"),
+            ),
+            {
+                x: (
+                    StatisticsSection.from_values,
+                    schema_section_values(data, x),
+                )
+                for x in ("sido", "gugun")
+            },
+        )
+
+    @classmethod
+    def from_json(
+        cls, data: typing.Dict[str, typing.Any]
+    ) -> "LazyStatisticsRecord":
+        return cls(
+            dict(
+                _statistics_header_from_json(data),
+                dong=StatisticsSection.from_json(data["dong"]),
+            ),
+            {
+                x: (StatisticsSection.from_json, data[x])
+                for x in ("sido", "gugun")
+            },
+        )
+
+    @property
+    def sido(self) -> StatisticsSection:
+        return self._section("sido")
+
+    @property
+    def gugun(self) -> StatisticsSection:
+        return self._section("gugun")
+
+    def _section(self, level: str) -> StatisticsSection:
+        name = f"_{level}"
+        # 여러 thread 가 동시에 만들어도 같은 값입니다
+        if name not in self.__dict__:
+            build, values = self._pending[level]
+            object.__setattr__(self, name, build(values))
+        return self.__dict__[name]
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, StatisticsRecord):
+            return NotImplemented
+        return all(
+            getattr(self, x.name) == getattr(other, x.name)
+            for x in attr.fields(StatisticsRecord)
+        )
+
+    def __ne__(self, other: typing.Any) -> bool:
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = StatisticsRecord.__hash__
+
+    def __reduce__(self) -> typing.Tuple[typing.Any, ...]:
+        # 이미 만든 통계는 그대로, 만들지 않은 통계는 원본 값으로 보냅니다
+        values = {
+            name: value
+            for name, value in self.__dict__.items()
+            if name != "_pending"
+        }
+        pending = {
+            level: x
+            for level, x in self._pending.items()
+            if f"_{level}" not in values
+        }
+        return LazyStatisticsRecord, (values, pending)
+
+
+@attr.s(frozen=True)
+class BidRecord(object):
+    """낙찰사례 한 건"""
+
+    bid_date_str: str = attr.ib()
+    bid_date: typing.Any = attr.ib()
+    bid_event_number: str = attr.ib()
+    address: str = attr.ib()
+    bid_judged_price: typing.Any = attr.ib()
+    bid_success_price: typing.Any = attr.ib()
+    average_bid_rate_str: str = attr.ib()
+    average_bid_rate: typing.Any = attr.ib()
+    bidder_count: typing.Any = attr.ib()
+    bid_kind: str = attr.ib()
+
+    @classmethod
+    def from_schema(cls, data: TaeinBidData) -> "BidRecord":
+        return cls(
+            bid_date_str=data.bid_date_str,
+            bid_date=data.bid_date,
+            bid_event_number=data.bid_event_number,
+            address=data.address,
+            bid_judged_price=data.bid_judged_price,
+            bid_success_price=data.bid_success_price,
+            average_bid_rate_str=data.average_bid_rate_str,
+            average_bid_rate=data.average_bid_rate,
+            bidder_count=data.bidder_count,
+            bid_kind=data.bid_kind,
+        )
+
+    @classmethod
+    def list_from_html(cls, data: str) -> typing.List["BidRecord"]:
+        bid = TaeinBidResponse.from_html(data)
+        return [cls.from_schema(x) for x in bid.taein_bid_list]
+
+    @classmethod
+    def from_json(cls, data: typing.Dict[str, typing.Any]) -> "BidRecord":
+        return cls(
+            **dict(
+                _parse_decimals(data, BID_DECIMAL_FIELDS),
+                bid_date=_parse_iso_date(data["bid_date"]),
+            )
+        )
+
+
+@attr.s(frozen=True)
+class MulgunRecords(object):
+    """
+    동(물건종류) 하나의 통계/낙찰사례입니다. crawler 의 sidecar 와 압축
+    보관본(compaction)이 같은 json lines 형식을 사용합니다.
+    """
+
+    statistics_list: typing.List[StatisticsRecord] = attr.ib()
+    bid_list: typing.List[BidRecord] = attr.ib()
+
+    @classmethod
+    def from_jsonl(cls, data: str) -> typing.Optional["MulgunRecords"]:
+        """
+        schema version 이 다르면 None 을 반환하고 html 을 파싱하게 합니다.
+        """
+        statistics_list: typing.List[StatisticsRecord] = list()
+        bid_list: typing.List[BidRecord] = list()
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("schema_version") != SIDECAR_SCHEMA_VERSION:
+                return None
+            if row["type"] == "statistics":
+                statistics_list.append(
+                    LazyStatisticsRecord.from_json(row["record"])
+                )
+            elif row["type"] == "bid":
+                bid_list.append(BidRecord.from_json(row["record"]))
+
+        return cls(statistics_list=statistics_list, bid_list=bid_list)
+
+    def to_jsonl(self) -> str:
+        rows = [("statistics", attr.asdict(x)) for x in self.statistics_list]
+        rows.extend(("bid", attr.asdict(x)) for x in self.bid_list)
+        return "".join(
+            json.dumps(
+                {
+                    "schema_version": SIDECAR_SCHEMA_VERSION,
+                    "type": data_type,
+                    "record": record,
+                },
+                ensure_ascii=False,
+                default=_json_default,
+            )
+            + "\n"
+            for data_type, record in rows
         )
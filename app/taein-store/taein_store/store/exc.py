@@ -1,3 +1,6 @@
+from botocore.exceptions import ClientError
+
+
 class TaeinStoreError(Exception):
     pass
 
@@ -10,5 +13,24 @@ class TaeinStoreCrawlerLogNotFound(TaeinStoreError):
     pass
 
 
+class TaeinStoreCrawlerFailed(TaeinStoreError):
+    pass
+
+
+class TaeinStoreLeaseLost(TaeinStoreError):
+    pass
+
+
 class TaeinStoreRegionNotFound(TaeinStoreError):
     pass
+
+
+class TaeinStoreAreaRangeNotFound(TaeinStoreError):
+    pass
+
+
+def is_s3_not_found(e: Exception) -> bool:
+    return isinstance(e, ClientError) and e.response["Error"]["Code"] in (
+        "NoSuchKey",
+        "404",
+    )
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import threading
+import typing
+
+import sqlalchemy as sa
+import structlog
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
+
+from taein_store.db import session_scope
+from taein_store.models import store_statistics_fingerprint_table
+
+logger = structlog.get_logger(__name__)
+
+#: (단계, 지역 id, 면적 id, 시작일, 종료일)
+FingerprintKey = typing.Tuple[str, int, int, str, str]
+
+
+def statistics_fingerprint(values: typing.Sequence[typing.Any]) -> str:
+    """create_or_update 에 넘기는 값들의 sha1"""
+    data = json.dumps([str(x) for x in values], ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class TaeinStatisticsFingerprints(object):
+    """
+    통계를 저장할 때 값의 fingerprint 를 함께 기록해두고, 다음 실행에서
+    같은 값이면 create_or_update 를 건너뜁니다. 기간(시작일, 종료일)마다
+    처음 사용할 때 저장된 fingerprint 를 한 번에 읽어옵니다.
+
+    fingerprint 는 통계 테이블과 따로 저장하므로, 통계 행을 store 밖에서
+    고쳤으면 rebuild 로 실행합니다. rebuild 이면 기간마다 기록된
+    fingerprint 를 지우고 모든 통계를 다시 써서 새로 기록합니다.
+    """
+
+    def __init__(
+        self, session_factory: orm.sessionmaker, rebuild: bool = False
+    ) -> None:
+        super().__init__()
+        self.session_factory = session_factory
+        self.rebuild = rebuild
+        self.lock = threading.Lock()
+        self.loaded_windows: typing.Set[typing.Tuple[str, str]] = set()
+        self.fingerprints: typing.Dict[FingerprintKey, str] = dict()
+        self.suppressed_count = 0
+        self.stored_count = 0
+
+    def unchanged(self, key: FingerprintKey, fingerprint: str) -> bool:
+        window = key[3:]
+        with self.lock:
+            if window not in self.loaded_windows:
+                if self.rebuild:
+                    self.clear_fingerprints(*window)
+                else:
+                    self.fingerprints.update(self.fetch_fingerprints(*window))
+                self.loaded_windows.add(window)
+            if self.rebuild:
+                return False
+            if self.fingerprints.get(key) == fingerprint:
+                self.suppressed_count += 1
+                return True
+            return False
+
+    def fetch_fingerprints(
+        self, start_date_str: str, end_date_str: str
+    ) -> typing.Dict[FingerprintKey, str]:
+        table = store_statistics_fingerprint_table
+        with session_scope(self.session_factory) as session:
+            return {
+                (
+                    row.level,
+                    row.region_id,
+                    row.area_range_id,
+                    row.start_date_str,
+                    row.end_date_str,
+                ): row.fingerprint
+                for row in session.execute(
+                    table.select().where(
+                        sa.and_(
+                            table.c.start_date_str == start_date_str,
+                            table.c.end_date_str == end_date_str,
+                        )
+                    )
+                )
+            }
+
+    def clear_fingerprints(
+        self, start_date_str: str, end_date_str: str
+    ) -> None:
+        table = store_statistics_fingerprint_table
+        with session_scope(self.session_factory) as session:
+            session.execute(
+                table.delete().where(
+                    sa.and_(
+                        table.c.start_date_str == start_date_str,
+                        table.c.end_date_str == end_date_str,
+                    )
+                )
+            )
+        logger.info(
+            "Clear statistics fingerprints",
+            start_date_str=start_date_str,
+            end_date_str=end_date_str,
+        )
+
+    def record(
+        self,
+        session: orm.Session,
+        key: FingerprintKey,
+        fingerprint: str,
+    ) -> None:
+        """통계와 같은 transaction 에서 기록합니다."""
+        table = store_statistics_fingerprint_table
+        level, region_id, area_range_id, start_date_str, end_date_str = key
+        values = dict(
+            level=level,
+            region_id=region_id,
+            area_range_id=area_range_id,
+            start_date_str=start_date_str,
+            end_date_str=end_date_str,
+            fingerprint=fingerprint,
+        )
+        if session.bind.dialect.name != "postgresql":
+            session.execute(
+                table.delete().where(
+                    sa.and_(*[x == values[x.name] for x in table.primary_key])
+                )
+            )
+            session.execute(table.insert(), values)
+            return
+
+        # 같은 key 를 동시에 기록해도 한 문장으로 덮어씁니다
+        statement = postgresql.insert(table).values(**values)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[x.name for x in table.primary_key],
+                set_=dict(
+                    fingerprint=statement.excluded.fingerprint,
+                    updated_at=sa.func.now(),
+                ),
+            )
+        )
+
+    def commit(
+        self, recorded: typing.Iterable[typing.Tuple[FingerprintKey, str]]
+    ) -> None:
+        """transaction 이 commit 된 뒤에 메모리의 fingerprint 를 바꿉니다."""
+        with self.lock:
+            for key, fingerprint in recorded:
+                self.fingerprints[key] = fingerprint
+                self.stored_count += 1
+
+    def report(self) -> None:
+        with self.lock:
+            suppressed_count, self.suppressed_count = self.suppressed_count, 0
+            stored_count, self.stored_count = self.stored_count, 0
+        logger.info(
+            "Suppress unchanged statistics",
+            suppressed_count=suppressed_count,
+            stored_count=stored_count,
+        )
@@ -0,0 +1,256 @@
+import threading
+import time
+import typing
+
+import sqlalchemy as sa
+import structlog
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
+
+from taein_store.db import session_scope
+from taein_store.models import store_lease_table
+from taein_store.store.exc import TaeinStoreLeaseLost
+
+logger = structlog.get_logger(__name__)
+
+#: (시도, 구군)
+LeaseUnit = typing.Tuple[str, str]
+
+
+class TaeinLeaseQueue(object):
+    """
+    PostgreSQL 의 taein_store_lease 테이블로 여러 host 의 store worker 가
+    작업을 나눠 갖습니다. lease 는 ttl 초 동안 유효하고 작업 중에는 계속
+    연장합니다. worker 가 죽어서 연장되지 않은 lease 는 다른 worker 가
+    다시 가져갑니다. max_attempts 번 가져가고도 끝나지 않은 작업은 더
+    가져가지 않고 실패한 작업으로 남깁니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: orm.sessionmaker,
+        *,
+        owner: str,
+        ttl_seconds: int,
+        max_attempts: int,
+    ) -> None:
+        super().__init__()
+        self.session_factory = session_factory
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max_attempts
+
+    def expires_at(self) -> typing.Any:
+        # host 마다 시계가 다를 수 있으므로 DB 시간을 기준으로 합니다
+        return sa.func.now() + sa.func.make_interval(
+            0, 0, 0, 0, 0, 0, self.ttl_seconds
+        )
+
+    def unit_filter(self, run_prefix: str, unit: LeaseUnit) -> typing.Any:
+        table = store_lease_table
+        return sa.and_(
+            table.c.run_prefix == run_prefix,
+            table.c.sido_name == unit[0],
+            table.c.gugun_name == unit[1],
+        )
+
+    def live_lease_filter(self) -> typing.Any:
+        table = store_lease_table
+        return sa.and_(
+            table.c.status == "leased", table.c.expires_at >= sa.func.now()
+        )
+
+    def exhausted_filter(self) -> typing.Any:
+        """더 가져갈 수 없는 끝나지 않은 작업"""
+        table = store_lease_table
+        return sa.and_(
+            table.c.attempts >= self.max_attempts,
+            table.c.status != "done",
+            sa.not_(self.live_lease_filter()),
+        )
+
+    def enqueue(
+        self,
+        run_prefix: str,
+        units: typing.Iterable[LeaseUnit],
+        force: bool = False,
+    ) -> None:
+        """
+        다른 worker 가 이미 넣은 작업은 그대로 둡니다. force 이면 끝났거나
+        실패한 작업도 다시 처음부터 가져갈 수 있게 합니다. 다른 worker 가
+        작업 중인 lease 는 그대로 둡니다.
+        """
+        rows = [
+            dict(
+                run_prefix=run_prefix,
+                sido_name=sido_name,
+                gugun_name=gugun_name,
+                status="pending",
+                attempts=0,
+            )
+            for sido_name, gugun_name in sorted(units)
+        ]
+        if not rows:
+            return
+        statement = postgresql.insert(store_lease_table).values(rows)
+        if force:
+            statement = statement.on_conflict_do_update(
+                index_elements=[
+                    store_lease_table.c.run_prefix,
+                    store_lease_table.c.sido_name,
+                    store_lease_table.c.gugun_name,
+                ],
+                set_=dict(
+                    status="pending", owner=None, expires_at=None, attempts=0
+                ),
+                where=sa.not_(self.live_lease_filter()),
+            )
+        else:
+            statement = statement.on_conflict_do_nothing()
+        with session_scope(self.session_factory) as session:
+            session.execute(statement)
+
+    def acquire(self, run_prefix: str) -> typing.Optional[LeaseUnit]:
+        table = store_lease_table
+        with session_scope(self.session_factory) as session:
+            row = session.execute(
+                sa.select([table.c.sido_name, table.c.gugun_name])
+                .where(table.c.run_prefix == run_prefix)
+                .where(table.c.attempts < self.max_attempts)
+                .where(
+                    sa.or_(
+                        table.c.status == "pending",
+                        sa.and_(
+                            table.c.status == "leased",
+                            table.c.expires_at < sa.func.now(),
+                        ),
+                    )
+                )
+                .order_by(table.c.sido_name, table.c.gugun_name)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).first()
+            if row is None:
+                return None
+
+            unit = (row.sido_name, row.gugun_name)
+            session.execute(
+                table.update()
+                .where(self.unit_filter(run_prefix, unit))
+                .values(
+                    status="leased",
+                    owner=self.owner,
+                    expires_at=self.expires_at(),
+                    attempts=table.c.attempts + 1,
+                )
+            )
+        logger.info("Acquire lease", run_prefix=run_prefix, unit=unit)
+        return unit
+
+    def renew(self, run_prefix: str, unit: LeaseUnit) -> bool:
+        """다른 worker 에게 넘어간 lease 면 False 를 반환합니다."""
+        with session_scope(self.session_factory) as session:
+            result = session.execute(
+                store_lease_table.update()
+                .where(self.unit_filter(run_prefix, unit))
+                .where(store_lease_table.c.owner == self.owner)
+                .where(store_lease_table.c.status == "leased")
+                .values(expires_at=self.expires_at())
+            )
+        return result.rowcount > 0
+
+    def complete(self, run_prefix: str, unit: LeaseUnit) -> None:
+        self.update_status(run_prefix, unit, "done")
+
+    def release(self, run_prefix: str, unit: LeaseUnit) -> None:
+        # 마지막 시도였으면 다시 가져가지 않도록 실패로 남깁니다
+        exhausted = store_lease_table.c.attempts >= self.max_attempts
+        self.update_status(
+            run_prefix,
+            unit,
+            sa.case([(exhausted, "failed")], else_="pending"),
+        )
+
+    def update_status(
+        self, run_prefix: str, unit: LeaseUnit, status: typing.Any
+    ) -> None:
+        with session_scope(self.session_factory) as session:
+            session.execute(
+                store_lease_table.update()
+                .where(self.unit_filter(run_prefix, unit))
+                .where(store_lease_table.c.owner == self.owner)
+                .values(status=status, expires_at=None)
+            )
+
+    def remaining(self, run_prefix: str) -> int:
+        table = store_lease_table
+        with session_scope(self.session_factory) as session:
+            return session.execute(
+                sa.select([sa.func.count()])
+                .select_from(table)
+                .where(table.c.run_prefix == run_prefix)
+                .where(table.c.status != "done")
+                .where(sa.not_(self.exhausted_filter()))
+            ).scalar()
+
+    def failed_units(self, run_prefix: str) -> typing.List[LeaseUnit]:
+        table = store_lease_table
+        with session_scope(self.session_factory) as session:
+            return [
+                (x.sido_name, x.gugun_name)
+                for x in session.execute(
+                    sa.select([table.c.sido_name, table.c.gugun_name])
+                    .where(table.c.run_prefix == run_prefix)
+                    .where(self.exhausted_filter())
+                    .order_by(table.c.sido_name, table.c.gugun_name)
+                )
+            ]
+
+
+class LeaseHeartbeat(threading.Thread):
+    """
+    작업하는 동안 ttl 의 1/3 마다 lease 를 연장합니다. 다른 worker 에게
+    넘어갔거나 ttl 동안 연장하지 못하면 lease 를 잃은 것으로 보고, check 가
+    예외를 내서 작업을 멈추게 합니다.
+    """
+
+    def __init__(
+        self, queue: TaeinLeaseQueue, run_prefix: str, unit: LeaseUnit
+    ) -> None:
+        super().__init__(name="taein-lease-heartbeat", daemon=True)
+        self.queue = queue
+        self.run_prefix = run_prefix
+        self.unit = unit
+        self.stopped = threading.Event()
+        self.lost = threading.Event()
+
+    def run(self) -> None:
+        interval = max(self.queue.ttl_seconds / 3, 1)
+        renewed_at = time.monotonic()
+        while not self.stopped.wait(interval):
+            try:
+                if not self.queue.renew(self.run_prefix, self.unit):
+                    logger.warning("Lost lease", unit=self.unit)
+                    self.lost.set()
+                    return
+                renewed_at = time.monotonic()
+            except Exception as e:
+                logger.error("Failed to renew lease", exc_info=e)
+                if time.monotonic() - renewed_at >= self.queue.ttl_seconds:
+                    logger.warning("Lease expired", unit=self.unit)
+                    self.lost.set()
+                    return
+
+    def check(self) -> None:
+        if self.lost.is_set():
+            raise TaeinStoreLeaseLost(
+                f"lost lease({self.run_prefix}, {' '.join(self.unit)})"
+            )
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self.start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.stopped.set()
+        self.join()
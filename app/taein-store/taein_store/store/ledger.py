@@ -0,0 +1,105 @@
+import typing
+
+import sqlalchemy as sa
+import structlog
+from sqlalchemy import orm
+
+from taein_store.db import session_scope
+from taein_store.models import store_load_ledger_table
+from taein_store.store.tree import MulgunNode
+
+logger = structlog.get_logger(__name__)
+
+#: IN 조건 하나에 넣는 key 수
+LEDGER_QUERY_CHUNK_SIZE = 1000
+
+
+def node_object_versions(
+    node: MulgunNode,
+) -> typing.Dict[str, typing.Optional[str]]:
+    """
+    동(물건종류) 하나를 적재할 때 읽는 객체와 그 버전. 압축 보관본은
+    member 마다 기록하고 보관본의 ETag 를 버전으로 씁니다.
+    """
+    if node.archive_key:
+        return {
+            f"{node.archive_key}#{node.archive_member}": node.versions.get(
+                node.archive_key
+            )
+        }
+
+    keys = [key for _, key in node.statistics_keys + node.bid_keys]
+    keys.extend(x for x in (node.sidecar_key, node.shard_key) if x)
+    return {key: node.versions.get(key) for key in keys}
+
+
+class TaeinLoadLedger(object):
+    """
+    적재를 마친 객체의 key, 버전(ETag), 적재 시간을 기록합니다. 동의
+    모든 객체가 같은 버전으로 기록되어 있으면 그 동은 다시 적재하지 않아서
+    중단된 실행을 다시 돌려도 남은 동만 적재합니다. 버전을 모르는 객체는
+    바뀌었는지 알 수 없으므로 항상 다시 적재합니다.
+    """
+
+    def __init__(self, session_factory: orm.sessionmaker) -> None:
+        super().__init__()
+        self.session_factory = session_factory
+
+    def pending_nodes(
+        self, nodes: typing.List[MulgunNode]
+    ) -> typing.List[MulgunNode]:
+        node_versions = [(x, node_object_versions(x)) for x in nodes]
+        loaded = self.fetch_loaded_versions(
+            [key for _, versions in node_versions for key in versions]
+        )
+
+        pending = [
+            node
+            for node, versions in node_versions
+            if not versions
+            or any(
+                version is None
+                or key not in loaded
+                or loaded[key] != version
+                for key, version in versions.items()
+            )
+        ]
+        logger.info(
+            "Skip loaded nodes",
+            node_count=len(nodes),
+            skipped_count=len(nodes) - len(pending),
+        )
+        return pending
+
+    def fetch_loaded_versions(
+        self, keys: typing.List[str]
+    ) -> typing.Dict[str, typing.Optional[str]]:
+        table = store_load_ledger_table
+        loaded: typing.Dict[str, typing.Optional[str]] = dict()
+        with session_scope(self.session_factory) as session:
+            for start in range(0, len(keys), LEDGER_QUERY_CHUNK_SIZE):
+                chunk = keys[start:start + LEDGER_QUERY_CHUNK_SIZE]
+                for row in session.execute(
+                    sa.select([table.c.object_key, table.c.version]).where(
+                        table.c.object_key.in_(chunk)
+                    )
+                ):
+                    loaded[row.object_key] = row.version
+        return loaded
+
+    def record(self, session: orm.Session, node: MulgunNode) -> None:
+        """적재와 같은 transaction 에서 기록해야 중간에 실패해도 맞습니다."""
+        table = store_load_ledger_table
+        versions = node_object_versions(node)
+        if not versions:
+            return
+        session.execute(
+            table.delete().where(table.c.object_key.in_(list(versions)))
+        )
+        session.execute(
+            table.insert(),
+            [
+                dict(object_key=key, version=version)
+                for key, version in versions.items()
+            ],
+        )
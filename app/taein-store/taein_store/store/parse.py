@@ -0,0 +1,106 @@
+import collections
+import multiprocessing
+import threading
+import typing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from taein_store.store.data import (
+    BidRecord,
+    LazyStatisticsRecord,
+    MulgunRecords,
+)
+from taein_store.store.prefetch import MulgunPages
+from taein_store.store.tree import MulgunNode
+
+
+def parse_html_pages(
+    statistics_pages: typing.List[str], bid_pages: typing.List[str]
+) -> MulgunRecords:
+    """html 파싱은 worker process 에서 실행되므로 module 함수로 둡니다."""
+    return MulgunRecords(
+        statistics_list=[
+            LazyStatisticsRecord.from_html(x) for x in statistics_pages
+        ],
+        bid_list=[
+            bid for x in bid_pages for bid in BidRecord.list_from_html(x)
+        ],
+    )
+
+
+class TaeinParser(object):
+    """
+    내려받은 html 을 process pool 에서 파싱해서 받은 순서대로 넘겨줍니다.
+    worker 는 BeautifulSoup 객체가 아닌 MulgunRecords 만 돌려줍니다.
+    max_workers 가 1 이하이면 현재 process 에서 파싱합니다.
+
+    process pool 은 처음 파싱할 때 만들어서 close 할 때까지 다시 씁니다.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        super().__init__()
+        self.max_workers = max_workers
+        self.max_pending = max_workers * 2
+        self.lock = threading.Lock()
+        self.executor: typing.Optional[ProcessPoolExecutor] = None
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                # prefetch thread 가 돌고 있으므로 fork 대신 spawn 합니다
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self.executor
+
+    def close(self) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def map(
+        self, pages_iterator: typing.Iterable[MulgunPages]
+    ) -> typing.Iterator[typing.Tuple[MulgunNode, MulgunRecords]]:
+        if self.max_workers <= 1:
+            yield from ((x.node, self.parse(x)) for x in pages_iterator)
+            return
+
+        executor = self.get_executor()
+        pending: typing.Deque[
+            typing.Tuple[MulgunNode, typing.Union[Future, MulgunRecords]]
+        ] = collections.deque()
+        try:
+            for pages in pages_iterator:
+                if pages.records is not None:
+                    pending.append((pages.node, pages.records))
+                else:
+                    future = executor.submit(
+                        parse_html_pages,
+                        pages.statistics_pages,
+                        pages.bid_pages,
+                    )
+                    pending.append((pages.node, future))
+                while len(pending) >= self.max_pending:
+                    yield self.result(*pending.popleft())
+
+            while pending:
+                yield self.result(*pending.popleft())
+        finally:
+            for _, x in pending:
+                if isinstance(x, Future):
+                    x.cancel()
+
+    @staticmethod
+    def parse(pages: MulgunPages) -> MulgunRecords:
+        if pages.records is not None:
+            return pages.records
+        return parse_html_pages(pages.statistics_pages, pages.bid_pages)
+
+    @staticmethod
+    def result(
+        node: MulgunNode, value: typing.Union[Future, MulgunRecords]
+    ) -> typing.Tuple[MulgunNode, MulgunRecords]:
+        if isinstance(value, Future):
+            return node, value.result()
+        return node, value
@@ -0,0 +1,96 @@
+import collections
+import threading
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import attr
+
+from taein_store.store.data import MulgunRecords
+from taein_store.store.tree import MulgunNode
+
+
+@attr.s
+class MulgunPages(object):
+    """동(물건종류) 하나에서 내려받은 본문. records 가 있으면 파싱이 필요 없습니다."""
+
+    node: MulgunNode = attr.ib()
+    statistics_pages: typing.List[str] = attr.ib(factory=list)
+    bid_pages: typing.List[str] = attr.ib(factory=list)
+    records: typing.Optional[MulgunRecords] = attr.ib(default=None)
+    #: 내려받은 본문 크기(byte)
+    size: int = attr.ib(default=0)
+
+
+class TaeinPrefetcher(object):
+    """
+    적재할 동의 본문을 thread pool 에서 미리 내려받아 순서대로 넘겨줍니다.
+    아직 넘겨주지 않은 본문이 max_bytes 를 넘거나 대기 중인 다운로드가
+    max_pending 개가 되면 더 내려받지 않고 적재가 따라오기를 기다립니다.
+    """
+
+    def __init__(
+        self,
+        fetch: typing.Callable[[MulgunNode], MulgunPages],
+        *,
+        max_workers: int,
+        max_bytes: int,
+    ) -> None:
+        super().__init__()
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.max_pending = max_workers * 2
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.buffered_bytes = 0
+
+    def map(
+        self, nodes: typing.Iterable[MulgunNode]
+    ) -> typing.Iterator[MulgunPages]:
+        if self.max_workers <= 0:
+            yield from (self.fetch(x) for x in nodes)
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="taein-prefetch"
+        )
+        pending: typing.Deque[Future] = collections.deque()
+        node_iterator = iter(nodes)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and self.can_submit(len(pending)):
+                    node = next(node_iterator, None)
+                    if node is None:
+                        exhausted = True
+                        break
+                    pending.append(executor.submit(self.fetch_buffered, node))
+
+                if not pending:
+                    return
+
+                pages = pending.popleft().result()
+                with self.lock:
+                    self.buffered_bytes -= pages.size
+                yield pages
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self.buffered_bytes = 0
+
+    def can_submit(self, pending_count: int) -> bool:
+        # 첫 다운로드는 크기와 관계없이 진행해야 적재가 멈추지 않습니다
+        if pending_count == 0:
+            return True
+        with self.lock:
+            buffered_bytes = self.buffered_bytes
+        return (
+            pending_count < self.max_pending
+            and buffered_bytes < self.max_bytes
+        )
+
+    def fetch_buffered(self, node: MulgunNode) -> MulgunPages:
+        pages = self.fetch(node)
+        with self.lock:
+            self.buffered_bytes += pages.size
+        return pages
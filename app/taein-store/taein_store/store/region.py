@@ -0,0 +1,192 @@
+import threading
+import typing
+
+import attr
+import sqlalchemy as sa
+import structlog
+from crawler.taein_schema import SIDO_REGION_DICT
+from loan_model.models.taein.taein_dong import TaeinDong
+from loan_model.models.taein.taein_gugun import TaeinGugun
+from loan_model.models.taein.taein_sido import TaeinSido
+from sqlalchemy import orm
+
+from taein_store.db import foreign_key_column, session_scope
+
+logger = structlog.get_logger(__name__)
+
+#: (시도, 구군, 읍면동)
+Region = typing.Tuple[str, str, str]
+#: (시도, 구군)
+GugunKey = typing.Tuple[str, str]
+
+
+@attr.s
+class RegionIds(object):
+    """commit 전까지 모아두는 지역 이름별 DB id"""
+
+    sido_ids: typing.Dict[str, int] = attr.ib()
+    gugun_ids: typing.Dict[GugunKey, int] = attr.ib()
+    dong_ids: typing.Dict[Region, int] = attr.ib()
+
+
+class TaeinRegionResolver(object):
+    """
+    시도/구군/읍면동 이름을 DB id 로 바꿉니다. prefetch 하면 적재할
+    지역의 id 를 단계마다 한 번의 query 로 읽고 없는 구군과 읍면동은
+    단계마다 한 문장으로 만들어두므로, 적재 중에는 메모리에서 id 를
+    찾습니다.
+
+    적재 worker 끼리 공유하므로 지역은 lock 안에서 별도의 transaction 으로
+    만들고, commit 된 뒤에만 id 를 캐시에 넣습니다.
+    """
+
+    def __init__(self, session_factory: orm.sessionmaker) -> None:
+        super().__init__()
+        self.session_factory = session_factory
+        self.lock = threading.RLock()
+        self.sido_ids: typing.Dict[str, int] = dict()
+        self.gugun_ids: typing.Dict[GugunKey, int] = dict()
+        self.dong_ids: typing.Dict[Region, int] = dict()
+
+        self.gugun_sido_column = TaeinGugun.__table__.c[
+            foreign_key_column(TaeinGugun.__table__, TaeinSido.__table__)
+        ]
+        self.dong_gugun_column = TaeinDong.__table__.c[
+            foreign_key_column(TaeinDong.__table__, TaeinGugun.__table__)
+        ]
+
+    def prefetch(self, regions: typing.Iterable[Region]) -> None:
+        regions = set(regions)
+        self.resolve(regions=regions)
+        logger.info(
+            "Prefetch regions",
+            sido_count=len(self.sido_ids),
+            gugun_count=len(self.gugun_ids),
+            dong_count=len(self.dong_ids),
+        )
+
+    def resolve(
+        self,
+        sido_names: typing.Iterable[str] = (),
+        gugun_keys: typing.Iterable[GugunKey] = (),
+        regions: typing.Iterable[Region] = (),
+    ) -> None:
+        """지역들의 id 를 읽고 없는 지역은 만들어서 캐시에 넣습니다."""
+        regions = set(regions)
+        gugun_keys = set(gugun_keys) | {(x, y) for x, y, _ in regions}
+        sido_names = set(sido_names) | {x for x, _ in gugun_keys}
+
+        with self.lock:
+            ids = RegionIds(
+                dict(self.sido_ids), dict(self.gugun_ids), dict(self.dong_ids)
+            )
+            sido_names -= set(ids.sido_ids)
+            gugun_keys -= set(ids.gugun_ids)
+            regions -= set(ids.dong_ids)
+            if not (sido_names or gugun_keys or regions):
+                return
+
+            with session_scope(self.session_factory) as session:
+                self.fetch_sido_ids(session, ids, sido_names)
+                for (sido_name, gugun_name), db_id in self.fetch_child_ids(
+                    session,
+                    TaeinGugun.name,
+                    self.gugun_sido_column,
+                    ids.sido_ids,
+                    gugun_keys,
+                ).items():
+                    ids.gugun_ids[(sido_name, gugun_name)] = db_id
+                for (gugun_key, dong_name), db_id in self.fetch_child_ids(
+                    session,
+                    TaeinDong.name,
+                    self.dong_gugun_column,
+                    ids.gugun_ids,
+                    {((x, y), z) for x, y, z in regions},
+                ).items():
+                    ids.dong_ids[(*gugun_key, dong_name)] = db_id
+
+            # rollback 된 transaction 의 id 가 캐시에 남지 않도록 commit 된
+            # 뒤에 한 번에 바꿉니다
+            self.sido_ids = ids.sido_ids
+            self.gugun_ids = ids.gugun_ids
+            self.dong_ids = ids.dong_ids
+
+    def fetch_sido_ids(
+        self, session: orm.Session, ids: RegionIds, sido_names: typing.Set[str]
+    ) -> None:
+        if not sido_names:
+            return
+        for db_id, name in session.query(TaeinSido.id, TaeinSido.name).filter(
+            TaeinSido.name.in_(sido_names)
+        ):
+            ids.sido_ids[name] = db_id
+        # 시도는 몇 개뿐이고 표시 이름을 함께 넣어야 하므로 모델에 맡깁니다
+        for sido_name in sorted(sido_names - set(ids.sido_ids)):
+            db_sido = TaeinSido.create_or_update(
+                session, sido_name, SIDO_REGION_DICT[sido_name]
+            )
+            session.flush()
+            ids.sido_ids[sido_name] = db_sido.id
+
+    def fetch_child_ids(
+        self,
+        session: orm.Session,
+        name_column: typing.Any,
+        parent_column: sa.Column,
+        parent_ids: typing.Dict[typing.Any, int],
+        keys: typing.Set[typing.Tuple[typing.Any, str]],
+    ) -> typing.Dict[typing.Tuple[typing.Any, str], int]:
+        """
+        (상위 지역, 이름) 들의 id 를 한 번의 query 로 읽고, 없는 지역은 한
+        문장으로 만든 뒤 다시 읽습니다.
+        """
+        if not keys:
+            return dict()
+        table = parent_column.table
+        parent_keys = {parent_ids[x]: x for x, _ in keys}
+        query = sa.select([table.c.id, parent_column, name_column]).where(
+            sa.and_(
+                parent_column.in_(parent_keys),
+                name_column.in_({x for _, x in keys}),
+            )
+        )
+
+        def fetch() -> typing.Dict[typing.Tuple[typing.Any, str], int]:
+            return {
+                (parent_keys[parent_id], name): db_id
+                for db_id, parent_id, name in session.execute(query)
+            }
+
+        found = fetch()
+        missing = sorted(keys - set(found))
+        if missing:
+            session.execute(
+                table.insert().values(
+                    [
+                        {
+                            parent_column.key: parent_ids[x],
+                            name_column.key: name,
+                        }
+                        for x, name in missing
+                    ]
+                )
+            )
+            found = fetch()
+        return found
+
+    def sido_id(self, sido_name: str) -> int:
+        if sido_name not in self.sido_ids:
+            self.resolve(sido_names=[sido_name])
+        return self.sido_ids[sido_name]
+
+    def gugun_id(self, sido_name: str, gugun_name: str) -> int:
+        key = (sido_name, gugun_name)
+        if key not in self.gugun_ids:
+            self.resolve(gugun_keys=[key])
+        return self.gugun_ids[key]
+
+    def dong_id(self, sido_name: str, gugun_name: str, dong_name: str) -> int:
+        key = (sido_name, gugun_name, dong_name)
+        if key not in self.dong_ids:
+            self.resolve(regions=[key])
+        return self.dong_ids[key]
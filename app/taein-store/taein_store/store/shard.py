@@ -0,0 +1,131 @@
+import collections
+import gzip
+import json
+import shutil
+import struct
+import tempfile
+import threading
+import typing
+
+from taein_store.store.exc import TaeinStoreError
+
+SHARD_MAGIC = b"TSHD"
+SHARD_VERSION = 1
+SHARD_FILE_NAME = "pages.shard"
+#: 압축 보관본 옆에 올리는 member 이름 목록의 접미사
+ARCHIVE_INDEX_SUFFIX = ".index.json"
+
+_HEADER = struct.Struct(">BI")
+
+
+def is_shard_key(key: str) -> bool:
+    return key.split("/")[-1].startswith(SHARD_FILE_NAME)
+
+
+def archive_index_key(archive_key: str) -> str:
+    """{시도}.shard.gz 보관본의 member 목록은 {시도}.index.json 입니다."""
+    return archive_key.split(".shard")[0] + ARCHIVE_INDEX_SUFFIX
+
+
+def read_shard(body: bytes) -> typing.List[typing.Tuple[str, bytes]]:
+    """
+    crawler 의 TaeinShardWriter 가 만든 shard 를 (이름, 본문) 목록으로
+    풀어줍니다. 순서는 crawler 가 기록한 순서를 따릅니다.
+    """
+    if not body.startswith(SHARD_MAGIC):
+        raise TaeinStoreError("invalid shard")
+
+    offset = len(SHARD_MAGIC)
+    version, index_length = _HEADER.unpack_from(body, offset)
+    if version != SHARD_VERSION:
+        raise TaeinStoreError(f"unsupported shard version({version})")
+
+    offset += _HEADER.size
+    index = json.loads(body[offset:offset + index_length].decode("utf-8"))
+    data_offset = offset + index_length
+
+    members: typing.List[typing.Tuple[str, bytes]] = list()
+    for x in index:
+        start = data_offset + x["offset"]
+        members.append((x["name"], body[start:start + x["length"]]))
+
+    return members
+
+
+class ShardFileWriter(object):
+    """
+    read_shard 와 같은 형식의 shard 를 파일로 씁니다. 본문은 임시 파일에
+    모아두었다가 write 할 때 index 뒤에 이어 붙이므로 한 달 치 압축
+    보관본도 메모리에 올리지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.index: typing.List[typing.Dict[str, typing.Any]] = list()
+        self.bodies = tempfile.TemporaryFile()
+        self.size = 0
+
+    def add(self, name: str, body: bytes) -> None:
+        self.index.append(
+            {"name": name, "offset": self.size, "length": len(body)}
+        )
+        self.bodies.write(body)
+        self.size += len(body)
+
+    def write(self, file_path: str) -> None:
+        """gzip 으로 압축해서 file_path 에 씁니다."""
+        index = json.dumps(self.index, ensure_ascii=False).encode("utf-8")
+        self.bodies.seek(0)
+        with gzip.open(file_path, "wb") as f:
+            f.write(SHARD_MAGIC)
+            f.write(_HEADER.pack(SHARD_VERSION, len(index)))
+            f.write(index)
+            shutil.copyfileobj(self.bodies, f)
+
+    def close(self) -> None:
+        self.bodies.close()
+
+
+class ShardCache(object):
+    """
+    shard 의 member 를 shard key 별로 메모리에 들고 있습니다. member
+    크기의 합이 max_bytes 를 넘으면 가장 오래 사용하지 않은 shard 부터
+    버리고, 방금 읽은 shard 하나는 max_bytes 보다 커도 남겨둡니다.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.shards: typing.OrderedDict[
+            str, typing.Dict[str, bytes]
+        ] = collections.OrderedDict()
+        self.sizes: typing.Dict[str, int] = dict()
+        self.total_bytes = 0
+
+    def get(
+        self,
+        shard_key: str,
+        fetch: typing.Callable[[str], typing.Dict[str, bytes]],
+    ) -> typing.Dict[str, bytes]:
+        with self.lock:
+            members = self.shards.get(shard_key)
+            if members is not None:
+                self.shards.move_to_end(shard_key)
+                return members
+
+        # 내려받는 동안 lock 을 잡지 않으므로 같은 shard 를 두 thread 가
+        # 함께 받을 수 있지만 결과는 같습니다
+        members = fetch(shard_key)
+        with self.lock:
+            if shard_key not in self.shards:
+                self.shards[shard_key] = members
+                self.sizes[shard_key] = sum(len(x) for x in members.values())
+                self.total_bytes += self.sizes[shard_key]
+                self.evict()
+        return members
+
+    def evict(self) -> None:
+        while self.total_bytes > self.max_bytes and len(self.shards) > 1:
+            shard_key, _ = self.shards.popitem(last=False)
+            self.total_bytes -= self.sizes.pop(shard_key)
@@ -1,32 +1,120 @@
 import typing
 import re
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 import json
+import sqlalchemy as sa
 import structlog
+from sqlalchemy import orm
 from crawler.aws_client import S3Client
 from tanker.slack import SlackClient
 from tanker.utils.datetime import tzfromtimestamp
 from loan_model.models.taein.taein_statistics import TaeinStatistics
 from loan_model.models.taein.taein_bid import TaeinBid
 from loan_model.models.taein.taein_area_range import TaeinAreaRange
-from loan_model.models.taein.taein_gugun import TaeinGugun
 from loan_model.models.taein.taein_dong import TaeinDong
-from loan_model.models.taein.taein_sido import TaeinSido
-from crawler.taein_schema import (
-    TaeinStatisticsResponse,
-    TaeinBidResponse,
-    TaeinBidData,
-    SIDO_REGION_DICT,
+from taein_store.db import (
+    BulkUpserter,
+    create_session_factory,
+    foreign_key_column,
+    init_store_db_schema,
+    session_scope,
+)
+from taein_store.store.codec import (
+    decode_page,
+    decompress_body,
+    parse_reference,
+)
+from taein_store.store.data import (
+    CATALOG_FILE_NAME,
+    COMPACTED_CATALOG_FOLDER_NAME,
+    LATEST_FILE_NAME,
+    BidRecord,
+    CrawlerLogResponse,
+    CrawlerRunEntry,
+    MulgunRecords,
+    StatisticsRecord,
+)
+from taein_store.store.bloom import TaeinBidFilter
+from taein_store.store.cache import TaeinRecordCache
+from taein_store.store.claim import (
+    StatisticsClaim,
+    TaeinNewestRunFilter,
+    TaeinStatisticsClaims,
 )
-from taein_store.db import create_session_factory
-from taein_store.store.data import CrawlerLogResponse
+from taein_store.store.fingerprint import (
+    FingerprintKey,
+    TaeinStatisticsFingerprints,
+    statistics_fingerprint,
+)
+from taein_store.store.ledger import TaeinLoadLedger
+from taein_store.store.parse import TaeinParser
+from taein_store.store.prefetch import MulgunPages, TaeinPrefetcher
+from taein_store.store.region import TaeinRegionResolver
+from taein_store.store.shard import (
+    ShardCache,
+    archive_index_key,
+    read_shard,
+)
+from taein_store.store.tree import MulgunNode, RunTree, etag_version
 from taein_store.store.exc import (
+    TaeinStoreAreaRangeNotFound,
+    TaeinStoreError,
+    TaeinStoreCrawlerLogNotFound,
     TaeinStoreS3NotFound,
     TaeinStoreRegionNotFound,
+    is_s3_not_found,
 )
 
 logger = structlog.get_logger(__name__)
 
 
+def area_range_key(
+    start_area: typing.Any, end_area: typing.Any
+) -> typing.Tuple[int, int]:
+    """통계 페이지의 최소/최대 면적은 taein_area_range 의 0/1000 입니다."""
+    if start_area == "최소":
+        start_area = 0
+    if end_area == "최대":
+        end_area = 1000
+    return int(start_area), int(end_area)
+
+
+#: BidRecord 필드별 TaeinBid 컬럼. TaeinBid.create_or_update 에 넘기는 값과
+#: 같고, 모든 필드를 저장합니다
+BID_FIELD_COLUMNS: typing.Dict[str, str] = {
+    "bid_date_str": "bid_date_str",
+    "bid_date": "bid_date",
+    "bid_event_number": "bid_event_number",
+    "address": "address",
+    "bid_judged_price": "bid_judged_price",
+    "bid_success_price": "bid_success_price",
+    "average_bid_rate_str": "average_bid_rate_str",
+    "average_bid_rate": "average_bid_rate",
+    "bidder_count": "bidder_count",
+    "bid_kind": "bid_kind",
+}
+#: 같은 낙찰사례를 찾는 BidRecord 필드. 동 컬럼과 함께 TaeinBid 의 unique
+#: 제약과 같아야 합니다
+BID_KEY_FIELDS = ("bid_event_number", "bid_date")
+
+
+def bid_dong_column(table: sa.Table) -> str:
+    """BID_FIELD_COLUMNS 의 컬럼이 모두 있는지 확인하고 동 컬럼을 찾습니다."""
+    missing_columns = sorted(
+        set(BID_FIELD_COLUMNS.values()) - set(table.columns.keys())
+    )
+    if missing_columns:
+        raise TaeinStoreError(
+            f"not found {table.name} column({', '.join(missing_columns)})"
+        )
+    return foreign_key_column(table, TaeinDong.__table__)
+
+
 class TaeinStore(object):
     def __init__(self, config: typing.Dict[str, typing.Any]) -> None:
         super().__init__()
@@ -39,14 +127,41 @@ class TaeinStore(object):
         self.region_level_1 = self.config["REGION_REGEX_LEVEL_1"]
         self.region_level_2 = self.config["REGION_REGEX_LEVEL_2"]
         self.region_level_3 = self.config["REGION_REGEX_LEVEL_3"]
-        self.completed_sido_statistics: typing.Dict[
-            str, typing.List[int]
-        ] = dict()
-        self.completed_gugun_statistics: typing.Dict[
-            str, typing.List[int]
+        self.region_resolver = TaeinRegionResolver(self.session_factory)
+        self.statistics_claims = TaeinStatisticsClaims()
+        self.newest_run_filter: typing.Optional[TaeinNewestRunFilter] = None
+        self.load_ledger = TaeinLoadLedger(self.session_factory)
+        self.statistics_fingerprints = TaeinStatisticsFingerprints(
+            self.session_factory, rebuild=self.config["FORCE_LOAD"]
+        )
+        self.reference_shards: typing.Dict[
+            str, typing.Dict[str, bytes]
         ] = dict()
-        self.completed_sido_ids: typing.Dict[str, int] = dict()
-        self.completed_gugun_ids: typing.Dict[str, int] = dict()
+        self.archive_cache = ShardCache(
+            self.config["ARCHIVE_CACHE_MAX_MB"] * 1024 * 1024
+        )
+        self.bid_dong_column = bid_dong_column(TaeinBid.__table__)
+        self.bid_upserter = self.create_bid_upserter()
+        self.bid_filter = self.create_bid_filter()
+        self.area_ranges: typing.Dict[typing.Tuple[int, int], int] = dict()
+        #: LATEST 로 찾은 실행의 항목, 이 실행은 catalog 를 다시 읽지 않습니다
+        self.run_entries: typing.Dict[str, CrawlerRunEntry] = dict()
+        self.prefetcher = TaeinPrefetcher(
+            self.fetch_node_pages,
+            max_workers=self.config["PREFETCH_WORKERS"],
+            max_bytes=self.config["PREFETCH_MAX_MB"] * 1024 * 1024,
+        )
+        self.parser = TaeinParser(self.config["PARSE_WORKERS"])
+        self.record_cache: typing.Optional[TaeinRecordCache] = None
+        if self.config["RECORD_CACHE_DIR"]:
+            self.record_cache = TaeinRecordCache(
+                self.config["RECORD_CACHE_DIR"],
+                self.config["RECORD_CACHE_MAX_MB"] * 1024 * 1024,
+            )
+
+    def close(self) -> None:
+        """파싱 process pool 을 정리합니다."""
+        self.parser.close()
 
     def run(self, run_by: str) -> None:
         """
@@ -57,53 +172,180 @@ class TaeinStore(object):
             f"Store 시작합니다. ({self.config['ENVIRONMENT']}, {run_by})"
         )
 
-        crawler_log_id = self.config["CRAWLER_LOG_ID"]
+        init_store_db_schema(self.session_factory)
 
-        self.check_area_range_valid_or_not()  # 크롤링한 area_range 맞는지 체크
+        log_id_prefix = self.fetch_log_id_prefix()
 
-        if crawler_log_id:
-            self.fetch_received_log_folder()  # 수동 log id 폴더 저장
-        else:
-            self.fetch_latest_log_folder()  # 최신 log id 폴더 저장
+        # 크롤링한 area_range 맞는지 체크
+        self.check_area_range_valid_or_not(log_id_prefix)
+
+        self.fetch_run(log_id_prefix)
 
         self.slack_client.send_info_slack(
             f"Store 종료합니다. ({self.config['ENVIRONMENT']}, {run_by})"
         )
 
-    def check_area_range_valid_or_not(self) -> None:
-        crawler_log = self.fetch_crawler_log()
-        area_range_list = crawler_log.area_range_list
-        session = self.session_factory()
+    def fetch_log_id_prefix(self) -> str:
+        if self.config["CRAWLER_LOG_ID"]:
+            return self.fetch_received_log_prefix()  # 수동 log id
+        return self.fetch_latest_log_prefix()  # 최신 log id
+
+    def run_backfill(
+        self, run_by: str, log_id_prefixes: typing.List[str]
+    ) -> None:
+        """
+        여러 실행을 한 process 에서 적재합니다. 지역/면적 캐시를 실행끼리
+        공유하고, 최신 실행부터 적재해서 같은 (지역, 면적, 기간) 은 최신
+        실행의 값만 저장합니다.
+        """
+        self.slack_client.send_info_slack(
+            f"Store backfill 시작합니다. ({self.config['ENVIRONMENT']}, "
+            f"{run_by}, {len(log_id_prefixes)} 회)"
+        )
+
+        init_store_db_schema(self.session_factory)
+
+        log_id_prefixes = sorted(
+            log_id_prefixes,
+            key=lambda x: float(x.rstrip("/").split("/")[-1]),
+            reverse=True,
+        )
+        for log_id_prefix in log_id_prefixes:
+            self.check_area_range_valid_or_not(log_id_prefix)
+
+        self.newest_run_filter = TaeinNewestRunFilter()
         try:
-            for area_range in area_range_list:
-                session.query(TaeinAreaRange).filter(
-                    TaeinAreaRange.start_area == area_range.start_area,
-                    TaeinAreaRange.end_area == area_range.end_area,
-                ).one()
-        except Exception:
-            raise
+            for log_id_prefix in log_id_prefixes:
+                logger.info("Backfill run", log_id_prefix=log_id_prefix)
+                # 실행 하나를 끝까지 저장해야 더 오래된 실행을 거를 수 있습니다
+                self.fetch_run(log_id_prefix)
+                self.newest_run_filter.finish_run()
         finally:
-            session.close()
+            self.newest_run_filter = None
 
-    def fetch_received_log_folder(self) -> None:
-        crawler_log_id = self.config["CRAWLER_LOG_ID"]
+        self.slack_client.send_info_slack(
+            f"Store backfill 종료합니다. ({self.config['ENVIRONMENT']}, "
+            f"{run_by}, {len(log_id_prefixes)} 회)"
+        )
+
+    def check_area_range_valid_or_not(self, log_id_prefix: str) -> None:
+        crawler_log = self.fetch_run_crawler_log(log_id_prefix)
+        if crawler_log is None:
+            raise TaeinStoreCrawlerLogNotFound(
+                f"not found crawler log({log_id_prefix})"
+            )
+        missing_area_ranges = {
+            area_range_key(x.start_area, x.end_area)
+            for x in crawler_log.area_range_list
+        } - set(self.fetch_area_ranges())
+        if missing_area_ranges:
+            raise TaeinStoreAreaRangeNotFound(
+                f"not found area range({sorted(missing_area_ranges)})"
+            )
+
+    def fetch_area_ranges(self) -> typing.Dict[typing.Tuple[int, int], int]:
+        """taein_area_range 는 작고 바뀌지 않으므로 한 번만 읽습니다."""
+        if not self.area_ranges:
+            with session_scope(self.session_factory) as session:
+                self.area_ranges = {
+                    area_range_key(x.start_area, x.end_area): x.id
+                    for x in session.query(TaeinAreaRange)
+                }
+        return self.area_ranges
+
+    def fetch_received_log_prefix(self) -> str:
+        return self.fetch_log_prefix(self.config["CRAWLER_LOG_ID"])
+
+    def fetch_log_prefix(self, crawler_log_id: str) -> str:
+        for entry in self.fetch_run_catalog():
+            if entry.time_stamp == crawler_log_id:
+                return entry.prefix
+
+        # catalog 가 없던 크롤링은 crawler 와 같은 규칙으로 경로를 만듭니다
         crawler_date = tzfromtimestamp(float(crawler_log_id))
-        log_id_prefix = (
+        return (
             f"{self.config['ENVIRONMENT']}/"
             f"{crawler_date.year}/"
-            f"{crawler_date.month}/"
-            f"{crawler_date.day}/"
+            f"{crawler_date.month:02}/"
+            f"{crawler_date.day:02}/"
             f"{crawler_log_id}/"
         )
-        self.fetch_sido_region_folder(log_id_prefix)
 
-    def fetch_latest_log_folder(self) -> None:
+    def fetch_latest_log_prefix(self) -> str:
+        latest = self.fetch_latest_entry_data()
+        if latest is not None:
+            # LATEST 는 compactor 도 갱신하므로 압축 여부까지 믿고 씁니다
+            entry = CrawlerRunEntry.from_json(latest)
+            self.run_entries[entry.prefix] = entry
+            return entry.prefix
+
         env_prefix = f"{self.config['ENVIRONMENT']}/"
         year_prefix = self.fetch_latest_folder(env_prefix)
         month_prefix = self.fetch_latest_folder(year_prefix)
         day_prefix = self.fetch_latest_folder(month_prefix)
-        log_id_prefix = self.fetch_latest_folder(day_prefix)
-        self.fetch_sido_region_folder(log_id_prefix)
+        return self.fetch_latest_folder(day_prefix)
+
+    def fetch_latest_entry_data(
+        self,
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        latest_key = f"{self.catalog_prefix()}{LATEST_FILE_NAME}"
+        try:
+            response = self.s3_client.get_object(latest_key)
+        except Exception as e:
+            if not is_s3_not_found(e):
+                raise
+            return None
+        return json.loads(response.body.read())
+
+    def catalog_prefix(self) -> str:
+        return f"meta/{self.config['ENVIRONMENT']}/catalog/"
+
+    def fetch_run_catalog(self) -> typing.List[CrawlerRunEntry]:
+        entries = [
+            CrawlerRunEntry.from_json(x)
+            for x in self.fetch_run_catalog_data().values()
+        ]
+        return sorted(entries, key=lambda x: float(x.time_stamp))
+
+    def fetch_run_catalog_data(
+        self,
+    ) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        crawler 의 실행 목록을 time_stamp 별 현재 항목으로 가져옵니다. 같은
+        실행의 항목이 여러 개면 마지막 항목이 현재 상태이고, compactor 가
+        월별로 따로 기록한 압축 항목이 그 위에 덮입니다.
+        """
+        entries: typing.Dict[str, typing.Dict[str, typing.Any]] = dict()
+        catalog_key = f"{self.catalog_prefix()}{CATALOG_FILE_NAME}"
+        try:
+            response = self.s3_client.get_object(catalog_key)
+        except Exception as e:
+            if not is_s3_not_found(e):
+                raise
+        else:
+            for data in json.loads(response.body.read()):
+                entries[data["time_stamp"]] = data
+
+        compacted_prefix = (
+            f"{self.catalog_prefix()}{COMPACTED_CATALOG_FOLDER_NAME}/"
+        )
+        for response in self.s3_client.get_objects(compacted_prefix):
+            for x in response.contents or list():
+                s3_response = self.s3_client.get_object(x["Key"])
+                for data in json.loads(s3_response.body.read()):
+                    entries[data["time_stamp"]] = data
+
+        return entries
+
+    def fetch_catalog_runs(
+        self, start_time_stamp: float, end_time_stamp: float
+    ) -> typing.List[CrawlerRunEntry]:
+        return [
+            entry
+            for entry in self.fetch_run_catalog()
+            if entry.status in ("completed", "compacted")
+            and start_time_stamp <= float(entry.time_stamp) <= end_time_stamp
+        ]
 
     def fetch_latest_folder(self, base_prefix: str) -> str:
         date_list: typing.List[str] = list()
@@ -124,486 +366,624 @@ class TaeinStore(object):
 
         return base_prefix
 
-    def fetch_sido_region_folder(self, log_id_prefix: str) -> None:
-        data_prefix = log_id_prefix + "data/"
-        sido_check: bool = False
-        for response in self.s3_client.get_objects(data_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise TaeinStoreS3NotFound("not found sido region list")
-            for sido_prefix in prefixes:
-                sido_name = (
-                    sido_prefix["Prefix"]
-                    .replace(data_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                if re.search(self.region_level_1, sido_name):
-                    sido_check = True
-                    self.fetch_gugun_region_folder(sido_prefix["Prefix"])
-
-        if not sido_check:
-            raise TaeinStoreRegionNotFound(
-                f"not found sido({self.region_level_1})"
-            )
+    def fetch_run(self, log_id_prefix: str) -> None:
+        tree = self.fetch_load_tree(log_id_prefix)
+        self.load_selected_nodes(
+            log_id_prefix,
+            tree.select(
+                self.region_level_1, self.region_level_2, self.region_level_3
+            ),
+        )
 
-    def fetch_gugun_region_folder(self, sido_prefix: str) -> None:
-        """
-        인천 남구와 인천 미추홀구는 같은 지역입니다. 태인경매 홈페이지에서는 해당 두 지역에 대한
-        데이터를 모두 가지고 있는데 남구의 경우 데이터가 부정확하며 미추홀구로 검색해야 데이터가
-        정확합니다. 따라서 인천 남구는 스킵시켜줍니다.
-        """
-        gugun_check: bool = False
-        for response in self.s3_client.get_objects(sido_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise TaeinStoreS3NotFound("not found gugun region list")
-            for gugun_prefix in prefixes:
-                gugun_name = (
-                    gugun_prefix["Prefix"]
-                    .replace(sido_prefix, "")
-                    .replace("/", "")
-                    .strip()
+    def load_selected_nodes(
+        self,
+        log_id_prefix: str,
+        nodes: typing.List[MulgunNode],
+        check: typing.Optional[typing.Callable[[], None]] = None,
+    ) -> None:
+        """check 는 동을 저장하기 전마다 호출하며, 예외를 내면 멈춥니다."""
+        self.statistics_claims.start_run(log_id_prefix)
+        # backfill 은 건너뛴 동의 레코드를 알 수 없으면 오래된 실행을 거를 수
+        # 없으므로 적재 기록과 관계없이 모두 적재합니다
+        if not self.config["FORCE_LOAD"] and self.newest_run_filter is None:
+            nodes = self.load_ledger.pending_nodes(nodes)
+        self.region_resolver.prefetch(
+            [(x.sido_name, x.gugun_name, x.dong_name) for x in nodes]
+        )
+        self.load_mulgun_nodes(nodes, check)
+
+    def fetch_load_tree(self, log_id_prefix: str) -> RunTree:
+        """압축 보관본, manifest, data 폴더 목록 순서로 트리를 만듭니다."""
+        tree = self.fetch_compacted_tree(log_id_prefix)
+        if tree is not None:
+            return tree
+        return self.fetch_run_tree(log_id_prefix)
+
+    def fetch_run_tree(self, log_id_prefix: str) -> RunTree:
+        """manifest 가 없는 실행은 data 폴더 전체 목록으로 트리를 만듭니다."""
+        tree = self.fetch_manifest_tree(log_id_prefix)
+        if tree is not None:
+            return tree
+
+        # 폴더마다 조회하지 않고 한 번의 목록 조회(1000 개씩)로 트리를 만들고
+        # 지역 필터는 메모리에서 적용합니다
+        data_prefix = f"{log_id_prefix}data/"
+        tree = RunTree()
+        page_count = key_count = 0
+        for response in self.s3_client.get_objects(data_prefix):
+            page_count += 1
+            for x in response.contents or list():
+                tree.add_object(
+                    x["Key"], data_prefix, etag_version(x.get("ETag"))
                 )
-                if "인천" in sido_prefix and gugun_name == "남구":
-                    continue
-                if re.search(self.region_level_2, gugun_name):
-                    gugun_check = True
-                    self.fetch_dong_region_folder(gugun_prefix["Prefix"])
-
-        if not gugun_check:
-            raise TaeinStoreRegionNotFound(
-                f"not found gugun({self.region_level_2})"
+                key_count += 1
+        if not key_count:
+            raise TaeinStoreS3NotFound(f"not found data({data_prefix})")
+
+        logger.info(
+            "List run objects",
+            log_id_prefix=log_id_prefix,
+            page_count=page_count,
+            key_count=key_count,
+        )
+        return tree
+
+    def fetch_compacted_tree(
+        self, log_id_prefix: str
+    ) -> typing.Optional[RunTree]:
+        entry = self.run_entries.get(log_id_prefix)
+        if entry is None:
+            entry = next(
+                (
+                    x
+                    for x in self.fetch_run_catalog()
+                    if x.prefix == log_id_prefix
+                ),
+                None,
+            )
+        if entry is None or not entry.compacted:
+            return None
+
+        tree = RunTree()
+        for sido_name, archive_key in sorted(entry.compacted.items()):
+            # 대상이 아닌 시도의 압축 보관본은 받지 않고, 트리는 보관본 대신
+            # 옆에 올린 member 목록으로 만듭니다
+            if not re.search(self.region_level_1, sido_name):
+                continue
+            version = self.fetch_object_version(archive_key)
+            index_key = archive_index_key(archive_key)
+            s3_response = self.s3_client.get_object(index_key)
+            for member in json.loads(s3_response.body.read()):
+                if member.startswith(f"{entry.time_stamp}/"):
+                    tree.add_archive_member(archive_key, member, version)
+
+        logger.info(
+            "Load compacted run",
+            log_id_prefix=log_id_prefix,
+            archive_count=len(entry.compacted),
+        )
+        return tree
+
+    def fetch_object_version(self, key: str) -> typing.Optional[str]:
+        """본문을 받지 않고 목록 조회로 ETag 를 가져옵니다."""
+        for response in self.s3_client.get_objects(key):
+            for x in response.contents or list():
+                if x["Key"] == key:
+                    return etag_version(x.get("ETag"))
+        return None
+
+    def fetch_archive_members(
+        self, archive_key: str
+    ) -> typing.Dict[str, bytes]:
+        # 여러 시도의 동을 함께 적재해도 보관본을 다시 받지 않도록 크기
+        # 제한 안에서 보관본별로 캐싱합니다
+        return self.archive_cache.get(archive_key, self.fetch_shard_members)
+
+    def fetch_manifest_tree(
+        self, log_id_prefix: str
+    ) -> typing.Optional[RunTree]:
+        crawler_log = self.fetch_run_crawler_log(log_id_prefix)
+        if crawler_log is None or not crawler_log.manifest_parts:
+            return None
+
+        time_stamp = log_id_prefix.rstrip("/").split("/")[-1]
+        tree = RunTree()
+        for part_number in range(1, crawler_log.manifest_parts + 1):
+            part_key = (
+                f"{log_id_prefix}manifest/{time_stamp}-{part_number:05}.jsonl"
             )
+            s3_response = self.s3_client.get_object(part_key)
+            for line in decode_page(
+                part_key, s3_response.body.read()
+            ).splitlines():
+                if line.strip():
+                    tree.add_manifest_entry(json.loads(line))
+
+        logger.info(
+            "Load manifest",
+            log_id_prefix=log_id_prefix,
+            part_count=crawler_log.manifest_parts,
+        )
+        return tree
 
-    def fetch_dong_region_folder(self, gugun_prefix: str) -> None:
-        dong_check: bool = False
-        for response in self.s3_client.get_objects(
-            gugun_prefix, Delimiter="/"
-        ):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise TaeinStoreS3NotFound("not found dong region list")
-            for dong_prefix in prefixes:
-                dong_name = (
-                    dong_prefix["Prefix"]
-                    .replace(gugun_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                if re.search(self.region_level_3, dong_name):
-                    dong_check = True
-                    self.fetch_mulgun_kind_folder(dong_prefix["Prefix"])
+    def fetch_run_crawler_log(
+        self, log_id_prefix: str
+    ) -> typing.Optional[CrawlerLogResponse]:
+        time_stamp = log_id_prefix.rstrip("/").split("/")[-1]
+        log_key = f"{log_id_prefix}crawler-log/{time_stamp}.json"
+        try:
+            response = self.s3_client.get_object(log_key)
+        except Exception as e:
+            if is_s3_not_found(e):
+                return None
+            raise
+        return CrawlerLogResponse.from_json(json.loads(response.body.read()))
 
-        if not dong_check:
-            raise TaeinStoreRegionNotFound(
-                f"not found dong({self.region_level_3})"
-            )
+    def load_mulgun_nodes(
+        self,
+        nodes: typing.Iterable[MulgunNode],
+        check: typing.Optional[typing.Callable[[], None]] = None,
+    ) -> None:
+        # 다음 동의 본문을 내려받고 파싱하는 동안 현재 동을 저장합니다
+        records_iterator = self.parser.map(self.prefetcher.map(nodes))
 
-    def fetch_mulgun_kind_folder(self, dong_prefix: str) -> None:
-        for response in self.s3_client.get_objects(dong_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise TaeinStoreS3NotFound("not found main using list")
-            for mulgun_kind_prefix in prefixes:
-                self.fetch_statistics_folder(mulgun_kind_prefix["Prefix"])
-
-    def fetch_statistics_folder(self, mulgun_kind_prefix: str) -> None:
-        for response in self.s3_client.get_objects(
-            mulgun_kind_prefix, Delimiter="/"
-        ):
-            db_dong_id: typing.Optional[int] = None
-            contents = response.contents
-            prefixes = response.common_prefixes
-            if not contents:
-                raise TaeinStoreS3NotFound("not found statistics data")
-            for content in contents:
-                file_prefix = content["Key"]
-                s3_response = self.s3_client.get_object(file_prefix)
-                statistics_data = s3_response.body.read().decode("utf-8")
-                statistics = TaeinStatisticsResponse.from_html(statistics_data)
-
-                sido_name = statistics.sido_name
-                gugun_name = statistics.gugun_name
-                dong_name = statistics.dong_name
-
-                db_area_range_id = self.get_area_range(
-                    statistics.building_start_area,
-                    statistics.building_end_area,
-                )
+        if self.record_cache is not None:
+            records_iterator = self.cache_records(records_iterator)
 
-                try:
-                    self.completed_sido_statistics[sido_name]
-                except KeyError:
-                    self.completed_sido_statistics[sido_name] = list()
+        try:
+            self.store_records(records_iterator, check)
+        finally:
+            self.statistics_fingerprints.report()
+            if self.bid_filter is not None:
+                self.bid_filter.report()
+                self.bid_filter.save()
 
-                if (
-                    db_area_range_id
-                    not in self.completed_sido_statistics[sido_name]
-                ):
-                    db_sido_id = self.store_sido_region(sido_name)
-                    self.store_statistics_data(
-                        statistics, db_area_range_id, db_sido_id=db_sido_id
-                    )
-                    # sido id 캐싱
-                    self.completed_sido_ids.update({sido_name: db_sido_id})
-                    # 전용 면적에 대한 시도 데이터 저장완료 캐싱
-                    self.completed_sido_statistics[sido_name].append(
-                        db_area_range_id
+    def store_records(
+        self,
+        records_iterator: typing.Iterator[
+            typing.Tuple[MulgunNode, MulgunRecords]
+        ],
+        check: typing.Optional[typing.Callable[[], None]] = None,
+    ) -> None:
+        load_workers = self.config["LOAD_WORKERS"]
+        if load_workers <= 1:
+            for node, records in records_iterator:
+                self.store_node_records(node, records, check)
+            return
+
+        # 동 하나가 작업 단위이고 worker 마다 자기 session 을 사용합니다
+        with ThreadPoolExecutor(
+            max_workers=load_workers, thread_name_prefix="taein-loader"
+        ) as executor:
+            pending: typing.Set[Future] = set()
+            try:
+                for node, records in records_iterator:
+                    # 하나가 끝날 때마다 채워서 worker 들이 쉬지 않게 합니다
+                    while len(pending) >= load_workers * 2:
+                        done, pending = wait(
+                            pending, return_when=FIRST_COMPLETED
+                        )
+                        for future in done:
+                            future.result()
+                    pending.add(
+                        executor.submit(
+                            self.store_node_records, node, records, check
+                        )
                     )
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+            finally:
+                # 실패하면 아직 시작하지 않은 동은 저장하지 않습니다
+                for future in pending:
+                    future.cancel()
 
-                try:
-                    self.completed_gugun_statistics[sido_name + gugun_name]
-                except KeyError:
-                    self.completed_gugun_statistics[
-                        sido_name + gugun_name
-                    ] = list()
-
-                if (
-                    db_area_range_id
-                    not in self.completed_gugun_statistics[
-                        sido_name + gugun_name
-                    ]
+    def cache_records(
+        self,
+        records_iterator: typing.Iterator[
+            typing.Tuple[MulgunNode, MulgunRecords]
+        ],
+    ) -> typing.Iterator[typing.Tuple[MulgunNode, MulgunRecords]]:
+        for node, records in records_iterator:
+            self.record_cache.put(node, records)
+            yield node, records
+
+    def store_node_records(
+        self,
+        node: MulgunNode,
+        records: MulgunRecords,
+        check: typing.Optional[typing.Callable[[], None]] = None,
+    ) -> None:
+        if check is not None:
+            check()
+        if self.newest_run_filter is not None:
+            records = self.newest_run_filter.filter(node, records)
+
+        claims: typing.List[StatisticsClaim] = list()
+        fingerprints: typing.List[typing.Tuple[FingerprintKey, str]] = list()
+        stored_bids: typing.List[typing.Dict[str, typing.Any]] = list()
+        try:
+            # 동(물건종류) 하나의 통계/낙찰사례는 하나의 transaction 입니다
+            with session_scope(self.session_factory) as session:
+                for statistics in sorted(
+                    records.statistics_list,
+                    key=lambda x: area_range_key(
+                        x.building_start_area, x.building_end_area
+                    ),
                 ):
-                    db_sido_id = self.completed_sido_ids[sido_name]
-                    db_gugun_id = self.store_gugun_region(
-                        gugun_name, db_sido_id
+                    self.store_statistics_record(
+                        session, statistics, claims, fingerprints
                     )
-                    self.store_statistics_data(
-                        statistics, db_area_range_id, db_gugun_id=db_gugun_id
+                # 통계가 없는 동의 낙찰사례도 동에 연결해서 저장합니다
+                if records.bid_list:
+                    self.store_bid_data(
+                        session,
+                        records.bid_list,
+                        self.node_dong_id(node),
+                        stored_bids,
                     )
-                    # gugun id 캐싱
-                    self.completed_gugun_ids.update(
-                        {sido_name + gugun_name: db_gugun_id}
-                    )
-                    # 전용 면적에 대한 구군 데이터 저장완료 캐싱
-                    self.completed_gugun_statistics[
-                        sido_name + gugun_name
-                    ].append(db_area_range_id)
-
-                # 읍,면,동 통계 저장
-                db_gugun_id = self.completed_gugun_ids[sido_name + gugun_name]
-                db_dong_id = self.store_dong_region(dong_name, db_gugun_id)
-                self.store_statistics_data(
-                    statistics, db_area_range_id, db_dong_id=db_dong_id
-                )
-
-            if prefixes:
-                for bid_prefix in prefixes:
-                    self.fetch_bid_folder(bid_prefix["Prefix"], db_dong_id)
-
-    def fetch_bid_folder(self, data_type_prefix: str, db_dong_id: int) -> None:
-        for response in self.s3_client.get_objects(
-            data_type_prefix, Delimiter="/"
-        ):
-            contents = response.contents
-            if not contents:
-                raise TaeinStoreS3NotFound("not found bid data")
-            for content in contents:
-                file_prefix = content["Key"]
-                s3_response = self.s3_client.get_object(file_prefix)
-                bid_data = s3_response.body.read().decode("utf-8")
-                bid = TaeinBidResponse.from_html(bid_data)
-                self.store_bid_data(bid.taein_bid_list, db_dong_id)
-
-    def fetch_crawler_log(self) -> CrawlerLogResponse:
-        log_prefix = self.fetch_crawler_log_path()
-        response = self.s3_client.get_object(log_prefix)
-        json_log = json.loads(response.body.read())
-        return CrawlerLogResponse.from_json(json_log)
-
-    def fetch_crawler_log_path(self) -> str:  # 최신 로그 폴더 경로
-        env_prefix = f"{self.config['ENVIRONMENT']}/"
-        year_list: typing.List[str] = []
-        month_list: typing.List[str] = []
-        day_list: typing.List[str] = []
-        time_stamp_list: typing.List[str] = []
-        log_id_list: typing.List[str] = []
-
-        for response in self.s3_client.get_objects(env_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            for year_prefix in prefixes:
-                year = (
-                    year_prefix["Prefix"]
-                    .replace(env_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                year_list.append(year)
-            year_list.sort()
-        year_prefix = env_prefix + year_list[-1] + "/"
-
-        for response in self.s3_client.get_objects(year_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            for month_prefix in prefixes:
-                month = (
-                    month_prefix["Prefix"]
-                    .replace(year_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                month_list.append(month)
-            month_list.sort()
-        month_prefix = year_prefix + month_list[-1] + "/"
+                self.load_ledger.record(session, node)
+        except Exception:
+            # 다른 worker 가 다시 저장할 수 있도록 claim 을 돌려줍니다. DB 의
+            # lock 은 transaction 과 함께 풀립니다
+            self.statistics_claims.release(claims)
+            raise
+        self.statistics_fingerprints.commit(fingerprints)
+        if self.bid_filter is not None:
+            self.bid_filter.add(stored_bids)
 
-        for response in self.s3_client.get_objects(
-            month_prefix, Delimiter="/"
-        ):
-            prefixes = response.common_prefixes
+    def node_dong_id(self, node: MulgunNode) -> int:
+        try:
+            return self.region_resolver.dong_id(
+                node.sido_name, node.gugun_name, node.dong_name
+            )
+        except KeyError:
+            raise TaeinStoreRegionNotFound(
+                f"not found dong({node.sido_name} {node.gugun_name} "
+                f"{node.dong_name})"
+            )
 
-            for day_prefix in prefixes:
-                day = (
-                    day_prefix["Prefix"]
-                    .replace(month_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                day_list.append(day)
-            day_list.sort()
-        day_prefix = month_prefix + day_list[-1] + "/"
+    def fetch_node_records(self, node: MulgunNode) -> MulgunRecords:
+        return TaeinParser.parse(self.fetch_node_pages(node))
 
-        for response in self.s3_client.get_objects(day_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            for time_stamp_prefix in prefixes:
-                time_stamp = (
-                    time_stamp_prefix["Prefix"]
-                    .replace(day_prefix, "")
-                    .replace("/", "")
-                    .strip()
+    def fetch_node_pages(self, node: MulgunNode) -> MulgunPages:
+        """
+        동(물건종류) 하나의 본문을 저장 형식에 관계없이 내려받습니다.
+        sidecar 나 압축 보관본이 있으면 html 대신 파싱된 레코드를 받고,
+        shard 가 있으면 동의 모든 페이지를 한 번에 받습니다.
+        """
+        if self.record_cache is not None:
+            cached = self.record_cache.get(node)
+            if cached is not None:
+                records, size = cached
+                return MulgunPages(node=node, records=records, size=size)
+
+        if node.archive_key:
+            member = self.fetch_archive_members(node.archive_key)[
+                node.archive_member
+            ]
+            records = MulgunRecords.from_jsonl(member.decode("utf-8"))
+            if records is None:
+                raise TaeinStoreError(
+                    f"archive schema mismatch({node.archive_key})"
                 )
-                time_stamp_list.append(time_stamp)
-            time_stamp_list.sort()
-
-        time_stamp_prefix = day_prefix + time_stamp_list[-1] + "/"
+            return MulgunPages(node=node, records=records, size=len(member))
 
-        log_prefix = f"{time_stamp_prefix}crawler-log/"
+        if node.sidecar_key:
+            sidecar = self.fetch_sidecar(node)
+            if sidecar is not None:
+                return sidecar
 
-        for response in self.s3_client.get_objects(log_prefix):
-            for content in response.contents:
-                log_id = content["Key"].split("/")[-1].replace(".json", "")
-                log_id_list.append(log_id)
-            log_id_list.sort()
-
-        log_prefix += log_id_list[-1] + ".json"
+        if node.shard_key:
+            statistics_pages, bid_pages = self.fetch_shard(node.shard_key)
+        else:
+            statistics_pages = [
+                self.fetch_page(x) for x in node.sorted_statistics_keys()
+            ]
+            bid_pages = [self.fetch_page(x) for x in node.sorted_bid_keys()]
+
+        return MulgunPages(
+            node=node,
+            statistics_pages=statistics_pages,
+            bid_pages=bid_pages,
+            size=sum(len(x) for x in statistics_pages + bid_pages),
+        )
 
-        return log_prefix
+    def store_statistics_record(
+        self,
+        session: orm.Session,
+        statistics: StatisticsRecord,
+        claims: typing.List[StatisticsClaim],
+        fingerprints: typing.List[typing.Tuple[FingerprintKey, str]],
+    ) -> int:
+        """
+        면적 순서로 시도, 구군, 읍면동 통계를 저장합니다. worker 들이 같은
+        순서로 upsert 하므로 서로 lock 을 기다리며 교착되지 않습니다.
+        """
+        sido_name = statistics.sido_name
+        gugun_name = statistics.gugun_name
+        dong_name = statistics.dong_name
 
-    def get_area_range(self, start_area: str, end_area: str) -> int:
-        if start_area == "최소":
-            start_area = 0
-        if end_area == "최대":
-            end_area = 1000
+        db_area_range_id = self.get_area_range(
+            statistics.building_start_area,
+            statistics.building_end_area,
+        )
 
-        session = self.session_factory()
-        try:
-            db_area_range = (
-                session.query(TaeinAreaRange)
-                .filter(
-                    TaeinAreaRange.start_area == start_area,
-                    TaeinAreaRange.end_area == end_area,
-                )
-                .one()
+        # 시도/구군 통계는 전용 면적마다 한 번만 저장합니다
+        window = (statistics.start_date_str, statistics.end_date_str)
+        sido_claim = ("sido", sido_name, "", db_area_range_id, *window)
+        if self.statistics_claims.claim(session, sido_claim):
+            claims.append(sido_claim)
+            self.store_statistics_data(
+                session,
+                statistics,
+                db_area_range_id,
+                fingerprints,
+                db_sido_id=self.region_resolver.sido_id(sido_name),
             )
-            db_area_range_id = db_area_range.id
-            session.commit()
-        except Exception:
-            raise
-        finally:
-            session.close()
-
-        return db_area_range_id
 
-    def store_sido_region(self, sido_name: str) -> int:
-        session = self.session_factory()
-        beautified_name = SIDO_REGION_DICT[sido_name]
-        try:
-            db_sido = TaeinSido.create_or_update(
-                session, sido_name, beautified_name
+        gugun_claim = (
+            "gugun",
+            sido_name,
+            gugun_name,
+            db_area_range_id,
+            *window,
+        )
+        if self.statistics_claims.claim(session, gugun_claim):
+            claims.append(gugun_claim)
+            self.store_statistics_data(
+                session,
+                statistics,
+                db_area_range_id,
+                fingerprints,
+                db_gugun_id=self.region_resolver.gugun_id(
+                    sido_name, gugun_name
+                ),
             )
-            db_sido_id = db_sido.id
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
 
-        return db_sido_id
+        # 읍,면,동 통계 저장
+        db_dong_id = self.region_resolver.dong_id(
+            sido_name, gugun_name, dong_name
+        )
+        self.store_statistics_data(
+            session,
+            statistics,
+            db_area_range_id,
+            fingerprints,
+            db_dong_id=db_dong_id,
+        )
+
+        return db_dong_id
 
-    def store_gugun_region(self, gugun_name: str, db_sido_id: int) -> int:
-        session = self.session_factory()
-        try:
-            db_gugun = TaeinGugun.create_or_update(
-                session, gugun_name, db_sido_id
-            )
-            db_gugun_id = db_gugun.id
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+    def fetch_shard(
+        self, shard_key: str
+    ) -> typing.Tuple[typing.List[str], typing.List[str]]:
+        statistics_pages: typing.List[str] = list()
+        bid_pages: typing.List[str] = list()
+        for name, body in self.fetch_shard_members(shard_key).items():
+            page = self.resolve_reference(body).decode("utf-8")
+            if name.startswith("bid/"):
+                bid_pages.append(page)
+            else:
+                statistics_pages.append(page)
+        return statistics_pages, bid_pages
+
+    def fetch_shard_members(self, shard_key: str) -> typing.Dict[str, bytes]:
+        s3_response = self.s3_client.get_object(shard_key)
+        return dict(
+            read_shard(decompress_body(shard_key, s3_response.body.read()))
+        )
 
-        return db_gugun_id
+    def fetch_page(self, key: str) -> str:
+        s3_response = self.s3_client.get_object(key)
+        body = decompress_body(key, s3_response.body.read())
+        return self.resolve_reference(body).decode("utf-8")
 
-    def store_dong_region(self, dong_name: str, db_gugun_id: int) -> int:
-        session = self.session_factory()
+    def resolve_reference(self, body: bytes) -> bytes:
+        """
+        이전 크롤링과 같은 페이지는 원본 위치를 가리키는 reference 로
+        저장되어 있습니다. reference 가 아니면 그대로 반환합니다.
+        """
+        reference = parse_reference(body)
+        if reference is None:
+            return body
+
+        if reference.member is None:
+            s3_response = self.s3_client.get_object(reference.key)
+            return decompress_body(reference.key, s3_response.body.read())
+
+        # 같은 동의 reference 는 대부분 같은 shard 를 가리키므로 마지막
+        # shard 하나만 캐싱합니다. prefetch thread 끼리 공유하므로 캐시를
+        # 교체만 하고 수정하지 않습니다
+        members = self.reference_shards.get(reference.key)
+        if members is None:
+            members = self.fetch_shard_members(reference.key)
+            self.reference_shards = {reference.key: members}
+        return members[reference.member]
+
+    def fetch_sidecar(self, node: MulgunNode) -> typing.Optional[MulgunPages]:
+        s3_response = self.s3_client.get_object(node.sidecar_key)
+        body = s3_response.body.read()
+        records = MulgunRecords.from_jsonl(
+            decode_page(node.sidecar_key, body)
+        )
+        if records is None:
+            logger.info("Sidecar schema mismatch", key=node.sidecar_key)
+            return None
+        return MulgunPages(node=node, records=records, size=len(body))
+
+    def bid_key_columns(self) -> typing.List[str]:
+        return [BID_FIELD_COLUMNS[x] for x in BID_KEY_FIELDS] + [
+            self.bid_dong_column
+        ]
+
+    def create_bid_upserter(self) -> typing.Optional[BulkUpserter]:
+        # ON CONFLICT 는 PostgreSQL 에서만 사용합니다
+        if self.session_factory.kw["bind"].dialect.name != "postgresql":
+            return None
         try:
-            db_dong = TaeinDong.create_or_update(
-                session, dong_name, db_gugun_id
+            return BulkUpserter.create(
+                TaeinBid.__table__, self.bid_key_columns()
             )
-            db_dong_id = db_dong.id
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        except ValueError as e:
+            raise TaeinStoreError(str(e))
+
+    def create_bid_filter(self) -> typing.Optional[TaeinBidFilter]:
+        if not self.config["BID_FILTER_FILE"]:
+            return None
+        return TaeinBidFilter(
+            self.session_factory,
+            TaeinBid.__table__,
+            list(BID_FIELD_COLUMNS.values()) + [self.bid_dong_column],
+            self.bid_key_columns(),
+            self.config["BID_FILTER_FILE"],
+            days=self.config["BID_FILTER_DAYS"],
+            capacity=self.config["BID_FILTER_CAPACITY"],
+        )
 
-        return db_dong_id
+    def get_area_range(self, start_area: str, end_area: str) -> int:
+        key = area_range_key(start_area, end_area)
+        try:
+            return self.fetch_area_ranges()[key]
+        except KeyError:
+            raise TaeinStoreAreaRangeNotFound(f"not found area range({key})")
 
     def store_statistics_data(
         self,
-        data: TaeinStatisticsResponse,
+        session: orm.Session,
+        data: StatisticsRecord,
         db_area_range_id: int,
+        fingerprints: typing.List[typing.Tuple[FingerprintKey, str]],
         *,
         db_sido_id: typing.Optional[int] = None,
         db_gugun_id: typing.Optional[int] = None,
         db_dong_id: typing.Optional[int] = None,
     ) -> None:
-        session = self.session_factory()
-        # Store sido statistics
+        # 지역 단계별로 해당 지역의 통계를 저장합니다
         if db_sido_id:
-            try:
-                TaeinStatistics.create_or_update(
-                    session,
-                    data.start_date_str,
-                    data.start_date,
-                    data.end_date_str,
-                    data.end_date,
-                    str(data.sido_year_avg_price_rate),
-                    data.sido_year_avg_price_rate,
-                    str(data.sido_year_avg_bid_rate),
-                    data.sido_year_avg_bid_rate,
-                    data.sido_year_bid_count,
-                    str(data.sido_six_month_avg_price_rate),
-                    data.sido_six_month_avg_price_rate,
-                    str(data.sido_six_month_avg_bid_rate),
-                    data.sido_six_month_avg_bid_rate,
-                    data.sido_six_month_bid_count,
-                    db_sido_id,
-                    db_gugun_id,
-                    db_dong_id,
-                    db_area_range_id,
-                )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
-            logger.info("Store Sido Statistics", sido=data.sido_name)
-
-        # Store gugun statistics
+            level, db_region_id = "sido", db_sido_id
+            section = data.sido
+            log_values = dict(sido=data.sido_name)
+            event = "Store Sido Statistics"
         elif db_gugun_id:
-            try:
-                TaeinStatistics.create_or_update(
-                    session,
-                    data.start_date_str,
-                    data.start_date,
-                    data.end_date_str,
-                    data.end_date,
-                    str(data.gugun_year_avg_price_rate),
-                    data.gugun_year_avg_price_rate,
-                    str(data.gugun_year_avg_bid_rate),
-                    data.gugun_year_avg_bid_rate,
-                    data.gugun_year_bid_count,
-                    str(data.gugun_six_month_avg_price_rate),
-                    data.gugun_six_month_avg_price_rate,
-                    str(data.gugun_six_month_avg_bid_rate),
-                    data.gugun_six_month_avg_bid_rate,
-                    data.gugun_six_month_bid_count,
-                    db_sido_id,
-                    db_gugun_id,
-                    db_dong_id,
-                    db_area_range_id,
-                )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
-            logger.info(
-                "Store Gugun Statistics",
-                sido=data.sido_name,
-                gugun=data.gugun_name,
-            )
-
-        # Store dong statistics
+            level, db_region_id = "gugun", db_gugun_id
+            section = data.gugun
+            log_values = dict(sido=data.sido_name, gugun=data.gugun_name)
+            event = "Store Gugun Statistics"
         elif db_dong_id:
-            try:
-                TaeinStatistics.create_or_update(
-                    session,
-                    data.start_date_str,
-                    data.start_date,
-                    data.end_date_str,
-                    data.end_date,
-                    str(data.dong_year_avg_price_rate),
-                    data.dong_year_avg_price_rate,
-                    str(data.dong_year_avg_bid_rate),
-                    data.dong_year_avg_bid_rate,
-                    data.dong_year_bid_count,
-                    str(data.dong_six_month_avg_price_rate),
-                    data.dong_six_month_avg_price_rate,
-                    str(data.dong_six_month_avg_bid_rate),
-                    data.dong_six_month_avg_bid_rate,
-                    data.dong_six_month_bid_count,
-                    db_sido_id,
-                    db_gugun_id,
-                    db_dong_id,
-                    db_area_range_id,
-                )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
-            logger.info(
-                "Store Dong Statistics",
+            level, db_region_id = "dong", db_dong_id
+            section = data.dong
+            log_values = dict(
                 sido=data.sido_name,
                 gugun=data.gugun_name,
                 dong=data.dong_name,
             )
+            event = "Store Dong Statistics"
         else:
-            session.close()
-            raise
+            raise TaeinStoreRegionNotFound("not found statistics region id")
+
+        values = (
+            data.start_date_str,
+            data.start_date,
+            data.end_date_str,
+            data.end_date,
+            section.year_avg_price_rate_str,
+            section.year_avg_price_rate,
+            section.year_avg_bid_rate_str,
+            section.year_avg_bid_rate,
+            section.year_bid_count,
+            section.six_month_avg_price_rate_str,
+            section.six_month_avg_price_rate,
+            section.six_month_avg_bid_rate_str,
+            section.six_month_avg_bid_rate,
+            section.six_month_bid_count,
+            db_sido_id,
+            db_gugun_id,
+            db_dong_id,
+            db_area_range_id,
+        )
+        key = (
+            level,
+            db_region_id,
+            db_area_range_id,
+            data.start_date_str,
+            data.end_date_str,
+        )
+        fingerprint = statistics_fingerprint(values)
+        # 값이 바뀌지 않았으면 쓰지 않습니다. FORCE_LOAD 이면 fingerprint 를
+        # 새로 만들면서 모두 씁니다
+        if self.statistics_fingerprints.unchanged(key, fingerprint):
+            return
+
+        TaeinStatistics.create_or_update(session, *values)
+        self.statistics_fingerprints.record(session, key, fingerprint)
+        fingerprints.append((key, fingerprint))
+        logger.info(event, **log_values)
 
     def store_bid_data(
-        self, bid_list: typing.List[TaeinBidData], db_dong_id: int
+        self,
+        session: orm.Session,
+        bid_list: typing.List[BidRecord],
+        db_dong_id: int,
+        stored_bids: typing.List[typing.Dict[str, typing.Any]],
     ) -> None:
-        for bid in bid_list:
-            session = self.session_factory()
-            try:
-                TaeinBid.create_or_update(
-                    session,
-                    bid.bid_date_str,
-                    bid.bid_date,
-                    bid.bid_event_number,
-                    bid.address,
-                    bid.bid_judged_price,
-                    bid.bid_success_price,
-                    bid.average_bid_rate_str,
-                    bid.average_bid_rate,
-                    bid.bidder_count,
-                    bid.bid_kind,
-                    db_dong_id,
+        # key 가 없는 낙찰사례가 있으면 동을 저장하지 않습니다
+        bid_rows = [(x, self.bid_row(x, db_dong_id)) for x in bid_list]
+        if self.bid_filter is not None:
+            # 같은 값으로 이미 저장된 낙찰사례는 DB 에 보내지 않습니다
+            if not self.config["FORCE_LOAD"]:
+                stored = self.bid_filter.stored(
+                    session, [row for _, row in bid_rows]
                 )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
-            logger.info("Store Bid statistics", bid=bid.address)
+                bid_rows = [x for x, y in zip(bid_rows, stored) if not y]
+            stored_bids.extend(row for _, row in bid_rows)
+
+        batch_size = self.config["BID_BATCH_SIZE"]
+        for start in range(0, len(bid_rows), batch_size):
+            batch = bid_rows[start:start + batch_size]
+            if self.bid_upserter is None:
+                for bid, _ in batch:
+                    self.create_or_update_bid(session, bid, db_dong_id)
+            else:
+                self.bid_upserter.upsert(session, [row for _, row in batch])
+            logger.info(
+                "Store Bid statistics", dong_id=db_dong_id, count=len(batch)
+            )
+
+    def bid_row(
+        self, bid: BidRecord, db_dong_id: int
+    ) -> typing.Dict[str, typing.Any]:
+        """create_or_update 와 같은 값을 TaeinBid 컬럼 이름으로 만듭니다."""
+        missing_fields = [
+            x for x in BID_KEY_FIELDS if getattr(bid, x) in (None, "")
+        ]
+        if missing_fields:
+            raise TaeinStoreError(
+                f"not found bid key({', '.join(missing_fields)}, "
+                f"{bid.bid_event_number}, {bid.address})"
+            )
+        row = {
+            column: getattr(bid, field)
+            for field, column in BID_FIELD_COLUMNS.items()
+        }
+        row[self.bid_dong_column] = db_dong_id
+        return row
+
+    def create_or_update_bid(
+        self, session: orm.Session, bid: BidRecord, db_dong_id: int
+    ) -> None:
+        TaeinBid.create_or_update(
+            session,
+            bid.bid_date_str,
+            bid.bid_date,
+            bid.bid_event_number,
+            bid.address,
+            bid.bid_judged_price,
+            bid.bid_success_price,
+            bid.average_bid_rate_str,
+            bid.average_bid_rate,
+            bid.bidder_count,
+            bid.bid_kind,
+            db_dong_id,
+        )
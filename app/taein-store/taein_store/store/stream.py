@@ -0,0 +1,216 @@
+import json
+import os
+import time
+import typing
+
+import structlog
+
+from taein_store.db import init_store_db_schema
+from taein_store.store.codec import decode_page
+from taein_store.store.data import CrawlerRunEntry
+from taein_store.store.exc import (
+    TaeinStoreCrawlerFailed,
+    TaeinStoreCrawlerLogNotFound,
+    is_s3_not_found,
+)
+from taein_store.store.store import TaeinStore
+from taein_store.store.tree import MulgunNode, RunTree, region_matches
+
+logger = structlog.get_logger(__name__)
+
+ManifestEntry = typing.Dict[str, typing.Any]
+
+
+class ManifestPartPoller(object):
+    """crawler 가 올리는 manifest part 를 번호 순서대로 읽습니다."""
+
+    def __init__(self, store: TaeinStore, log_id_prefix: str) -> None:
+        super().__init__()
+        self.store = store
+        self.log_id_prefix = log_id_prefix
+        self.time_stamp = log_id_prefix.rstrip("/").split("/")[-1]
+        self.next_part_number = 1
+
+    def poll(self) -> typing.List[ManifestEntry]:
+        entries: typing.List[ManifestEntry] = list()
+        while True:
+            part_key = (
+                f"{self.log_id_prefix}manifest/"
+                f"{self.time_stamp}-{self.next_part_number:05}.jsonl"
+            )
+            try:
+                s3_response = self.store.s3_client.get_object(part_key)
+            except Exception as e:
+                # 다음 part 가 아직 올라오지 않았습니다
+                if is_s3_not_found(e):
+                    return entries
+                raise
+
+            for line in decode_page(
+                part_key, s3_response.body.read()
+            ).splitlines():
+                if line.strip():
+                    entries.append(json.loads(line))
+            self.next_part_number += 1
+
+
+class FileQueueReader(object):
+    """
+    crawler 의 NOTIFY_FILE 을 알림 큐 대신 읽습니다. 끝까지 쓰인 줄만
+    읽고 다음 poll 은 그 위치부터 읽습니다.
+    """
+
+    def __init__(self, path: str, time_stamp: str) -> None:
+        super().__init__()
+        self.path = path
+        self.time_stamp = time_stamp
+        self.offset = 0
+
+    def poll(self) -> typing.List[ManifestEntry]:
+        if not os.path.exists(self.path):
+            return list()
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        complete_length = data.rfind(b"\n") + 1
+        self.offset += complete_length
+
+        entries: typing.List[ManifestEntry] = list()
+        for line in data[:complete_length].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.pop("time_stamp", None) == self.time_stamp:
+                entries.append(entry)
+        return entries
+
+
+class TaeinStreamStore(object):
+    """
+    진행 중인 크롤링을 따라가며 적재합니다. manifest 에 dong_complete 가
+    나온 동은 바로 적재하고, crawler-log 가 올라오면 전체 실행을 한 번 더
+    적재해서 빠진 동을 채웁니다. 이미 적재한 동은 적재 기록(ledger)으로
+    건너뜁니다.
+    """
+
+    def __init__(self, config: typing.Dict[str, typing.Any]) -> None:
+        super().__init__()
+        self.config = config
+        self.store = TaeinStore(config)
+
+    def close(self) -> None:
+        self.store.close()
+
+    def run(self, run_by: str) -> None:
+        init_store_db_schema(self.store.session_factory)
+
+        entry = self.fetch_following_run()
+        log_id_prefix = entry.prefix
+        self.store.slack_client.send_info_slack(
+            f"Store 스트리밍 시작합니다. ({self.config['ENVIRONMENT']}, "
+            f"{run_by}, {entry.time_stamp})"
+        )
+
+        if self.config["STREAM_QUEUE_FILE"]:
+            source: typing.Union[ManifestPartPoller, FileQueueReader] = (
+                FileQueueReader(
+                    self.config["STREAM_QUEUE_FILE"], entry.time_stamp
+                )
+            )
+        else:
+            source = ManifestPartPoller(self.store, log_id_prefix)
+
+        loaded_count = self.follow(source, entry)
+
+        # crawler 가 끝났으면 동 완료 항목이 빠진 동까지 마저 적재합니다
+        logger.info(
+            "Reconcile streamed run",
+            log_id_prefix=log_id_prefix,
+            streamed_count=loaded_count,
+        )
+        self.store.check_area_range_valid_or_not(log_id_prefix)
+        self.store.fetch_run(log_id_prefix)
+
+        self.store.slack_client.send_info_slack(
+            f"Store 스트리밍 종료합니다. ({self.config['ENVIRONMENT']}, "
+            f"{run_by}, {entry.time_stamp})"
+        )
+
+    def follow(
+        self,
+        source: typing.Union[ManifestPartPoller, FileQueueReader],
+        entry: CrawlerRunEntry,
+    ) -> int:
+        """
+        crawler-log 가 올라올 때까지 완료된 동을 적재하고 적재한 동 수를
+        반환합니다. 실행이 실패했거나 STREAM_STALE_MINUTES 동안 새 항목이
+        없으면 TaeinStoreCrawlerFailed 를 냅니다.
+        """
+        log_id_prefix = entry.prefix
+        stale_seconds = self.config["STREAM_STALE_MINUTES"] * 60
+        tree = RunTree()
+        loaded_count = 0
+        last_entry_time = time.monotonic()
+        while True:
+            entries = source.poll()
+            if entries:
+                last_entry_time = time.monotonic()
+            nodes = self.add_entries(tree, entries)
+            if nodes:
+                self.store.load_selected_nodes(log_id_prefix, nodes)
+                loaded_count += len(nodes)
+                continue
+
+            if self.store.fetch_run_crawler_log(log_id_prefix) is not None:
+                return loaded_count
+            if self.fetch_run_status(entry.time_stamp) == "failed":
+                raise TaeinStoreCrawlerFailed(
+                    f"crawler failed({log_id_prefix})"
+                )
+            # crawler 가 죽으면 run catalog 에 running 으로 남으므로 새
+            # 항목이 없는 시간으로 판단합니다
+            if time.monotonic() - last_entry_time > stale_seconds:
+                raise TaeinStoreCrawlerFailed(
+                    f"crawler stale({log_id_prefix})"
+                )
+            time.sleep(self.config["STREAM_POLL_SECONDS"])
+
+    def fetch_following_run(self) -> CrawlerRunEntry:
+        """CRAWLER_LOG_ID 가 없으면 가장 최근에 시작한 실행을 따라갑니다."""
+        runs = self.store.fetch_run_catalog()
+        crawler_log_id = self.config["CRAWLER_LOG_ID"]
+        if crawler_log_id:
+            runs = [x for x in runs if x.time_stamp == crawler_log_id]
+        if not runs:
+            raise TaeinStoreCrawlerLogNotFound(
+                f"not found run in catalog({crawler_log_id or 'latest'})"
+            )
+        return runs[-1]
+
+    def fetch_run_status(self, time_stamp: str) -> typing.Optional[str]:
+        for entry in self.store.fetch_run_catalog():
+            if entry.time_stamp == time_stamp:
+                return entry.status
+        return None
+
+    def add_entries(
+        self, tree: RunTree, entries: typing.List[ManifestEntry]
+    ) -> typing.List[MulgunNode]:
+        """manifest 항목을 트리에 넣고 완료된 동 중에 적재할 동을 반환합니다."""
+        nodes: typing.List[MulgunNode] = list()
+        for entry in entries:
+            tree.add_manifest_entry(entry)
+            if entry.get("data_type") != "dong_complete":
+                continue
+            node = tree.node(
+                entry["sido"], entry["gugun"], entry["dong"], entry["mulgun"]
+            )
+            if region_matches(
+                node,
+                self.store.region_level_1,
+                self.store.region_level_2,
+                self.store.region_level_3,
+            ):
+                nodes.append(node)
+        return nodes
@@ -0,0 +1,218 @@
+import re
+import typing
+
+import attr
+
+from taein_store.store.exc import TaeinStoreRegionNotFound
+from taein_store.store.data import is_sidecar_key
+from taein_store.store.shard import is_shard_key
+
+
+STATISTICS_PAGE_REGEX = re.compile(r"_(\d+|최소)_(\d+|최대)_statistics\.html")
+BID_PAGE_REGEX = re.compile(r"_bid_(\d+)\.html")
+
+
+def parse_page_number(file_name: str) -> int:
+    """통계 페이지는 시작 면적, 낙찰사례 페이지는 페이지 번호를 반환합니다."""
+    match = STATISTICS_PAGE_REGEX.search(file_name)
+    if match:
+        return 0 if match.group(1) == "최소" else int(match.group(1))
+    match = BID_PAGE_REGEX.search(file_name)
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+def etag_version(etag: typing.Optional[str]) -> typing.Optional[str]:
+    """S3 목록 조회의 ETag 는 따옴표로 감싸져 있습니다."""
+    return etag.strip('"') if etag else None
+
+
+def region_matches(
+    node: "MulgunNode",
+    region_level_1: str,
+    region_level_2: str,
+    region_level_3: str,
+) -> bool:
+    """RunTree.select 와 같은 조건이지만 지역이 없어도 예외가 없습니다."""
+    if "인천" in node.sido_name and node.gugun_name == "남구":
+        return False
+    return bool(
+        re.search(region_level_1, node.sido_name)
+        and re.search(region_level_2, node.gugun_name)
+        and re.search(region_level_3, node.dong_name)
+    )
+
+
+@attr.s
+class MulgunNode(object):
+    """동의 물건종류 폴더 하나에 들어있는 객체"""
+
+    sido_name: str = attr.ib()
+    gugun_name: str = attr.ib()
+    dong_name: str = attr.ib()
+    mulgun_text: str = attr.ib()
+    #: (페이지 번호, key)
+    statistics_keys: typing.List[typing.Tuple[int, str]] = attr.ib(
+        factory=list
+    )
+    bid_keys: typing.List[typing.Tuple[int, str]] = attr.ib(factory=list)
+    sidecar_key: typing.Optional[str] = attr.ib(default=None)
+    shard_key: typing.Optional[str] = attr.ib(default=None)
+    #: 압축 보관본(compaction)의 객체 key 와 member 이름
+    archive_key: typing.Optional[str] = attr.ib(default=None)
+    archive_member: typing.Optional[str] = attr.ib(default=None)
+    #: key 별 버전(따옴표를 뺀 ETag). 압축 보관본은 보관본 key 의 ETag 입니다
+    versions: typing.Dict[str, str] = attr.ib(factory=dict)
+
+    def add_key(
+        self,
+        key: str,
+        data_type: str,
+        page: typing.Optional[int] = None,
+        version: typing.Optional[str] = None,
+    ) -> None:
+        if data_type == "sidecar" or is_sidecar_key(key):
+            self.sidecar_key = key
+        elif data_type == "shard" or is_shard_key(key):
+            self.shard_key = key
+        elif data_type == "bid":
+            self.bid_keys.append((page or 0, key))
+        else:
+            self.statistics_keys.append((page or 0, key))
+        if version:
+            self.versions[key] = version
+
+    def sorted_statistics_keys(self) -> typing.List[str]:
+        return [key for _, key in sorted(self.statistics_keys)]
+
+    def sorted_bid_keys(self) -> typing.List[str]:
+        return [key for _, key in sorted(self.bid_keys)]
+
+
+class RunTree(object):
+    """
+    크롤링 한 번의 결과를 시도 > 구군 > 읍면동 > 물건종류 순서로 메모리에
+    들고 있습니다. S3 를 폴더마다 조회하지 않고 지역 필터를 적용합니다.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.regions: typing.Dict[
+            str,
+            typing.Dict[str, typing.Dict[str, typing.Dict[str, MulgunNode]]],
+        ] = dict()
+
+    def node(
+        self,
+        sido_name: str,
+        gugun_name: str,
+        dong_name: str,
+        mulgun_text: str,
+    ) -> MulgunNode:
+        mulgun_nodes = (
+            self.regions.setdefault(sido_name, dict())
+            .setdefault(gugun_name, dict())
+            .setdefault(dong_name, dict())
+        )
+        if mulgun_text not in mulgun_nodes:
+            mulgun_nodes[mulgun_text] = MulgunNode(
+                sido_name=sido_name,
+                gugun_name=gugun_name,
+                dong_name=dong_name,
+                mulgun_text=mulgun_text,
+            )
+        return mulgun_nodes[mulgun_text]
+
+    def add_object(
+        self, key: str, data_prefix: str, version: typing.Optional[str] = None
+    ) -> None:
+        """
+        {data_prefix}{시도}/{구군}/{읍면동}/{물건종류}/[bid/]{파일} 형식의
+        key 를 트리에 추가합니다.
+        """
+        parts = key[len(data_prefix):].split("/")
+        if len(parts) < 5:
+            return
+        sido_name, gugun_name, dong_name, mulgun_text = parts[:4]
+        data_type = "bid" if len(parts) == 6 and parts[4] == "bid" else ""
+        self.node(sido_name, gugun_name, dong_name, mulgun_text).add_key(
+            key,
+            data_type or "statistics",
+            parse_page_number(parts[-1]),
+            version,
+        )
+
+    def add_archive_member(
+        self,
+        archive_key: str,
+        member: str,
+        version: typing.Optional[str] = None,
+    ) -> None:
+        """member 이름은 {time_stamp}/{시도}/{구군}/{읍면동}/{물건종류} 입니다."""
+        _, sido_name, gugun_name, dong_name, mulgun_text = member.split("/")
+        node = self.node(sido_name, gugun_name, dong_name, mulgun_text)
+        node.archive_key = archive_key
+        node.archive_member = member
+        if version:
+            node.versions[archive_key] = version
+
+    def nodes(self, sido_name: str) -> typing.List[MulgunNode]:
+        return [
+            mulgun_nodes[mulgun_text]
+            for gugun_name, dongs in sorted(self.regions[sido_name].items())
+            for dong_name, mulgun_nodes in sorted(dongs.items())
+            for mulgun_text in sorted(mulgun_nodes)
+        ]
+
+    def add_manifest_entry(self, entry: typing.Dict[str, typing.Any]) -> None:
+        if "key" not in entry:
+            return
+        self.node(
+            entry["sido"], entry["gugun"], entry["dong"], entry["mulgun"]
+        ).add_key(
+            entry["key"],
+            entry["data_type"],
+            entry.get("page"),
+            entry.get("etag"),
+        )
+
+    def select(
+        self, region_level_1: str, region_level_2: str, region_level_3: str
+    ) -> typing.List[MulgunNode]:
+        """
+        Store 설정의 지역 정규식을 적용합니다. 인천 남구는 미추홀구와 같은
+        지역이고 데이터가 부정확하므로 제외합니다.
+        """
+        sido_names = [
+            x for x in sorted(self.regions) if re.search(region_level_1, x)
+        ]
+        if not sido_names:
+            raise TaeinStoreRegionNotFound(f"not found sido({region_level_1})")
+
+        nodes: typing.List[MulgunNode] = list()
+        for sido_name in sido_names:
+            gugun_names = [
+                x
+                for x in sorted(self.regions[sido_name])
+                if re.search(region_level_2, x)
+                and not ("인천" in sido_name and x == "남구")
+            ]
+            if not gugun_names:
+                raise TaeinStoreRegionNotFound(
+                    f"not found gugun({region_level_2})"
+                )
+            for gugun_name in gugun_names:
+                dongs = self.regions[sido_name][gugun_name]
+                dong_names = [
+                    x for x in sorted(dongs) if re.search(region_level_3, x)
+                ]
+                if not dong_names:
+                    raise TaeinStoreRegionNotFound(
+                        f"not found dong({region_level_3})"
+                    )
+                for dong_name in dong_names:
+                    mulgun_nodes = dongs[dong_name]
+                    nodes.extend(mulgun_nodes[x] for x in sorted(mulgun_nodes))
+
+        return nodes
@@ -0,0 +1,119 @@
+import os
+import socket
+import time
+import typing
+
+import structlog
+
+from taein_store.db import init_store_db_schema
+from taein_store.store.exc import TaeinStoreError, TaeinStoreLeaseLost
+from taein_store.store.lease import LeaseHeartbeat, LeaseUnit, TaeinLeaseQueue
+from taein_store.store.store import TaeinStore
+from taein_store.store.tree import MulgunNode, RunTree
+
+logger = structlog.get_logger(__name__)
+
+
+class TaeinStoreWorker(object):
+    """
+    여러 host 에서 같은 실행을 나눠서 적재합니다. worker 마다 실행의
+    (시도, 구군) 목록을 lease 테이블에 넣고, lease 를 하나씩 가져와서
+    적재합니다. 모든 worker 는 같은 지역 설정으로 실행해야 합니다.
+    """
+
+    def __init__(self, config: typing.Dict[str, typing.Any]) -> None:
+        super().__init__()
+        self.config = config
+        self.store = TaeinStore(config)
+        self.queue = TaeinLeaseQueue(
+            self.store.session_factory,
+            owner=f"{socket.gethostname()}:{os.getpid()}",
+            ttl_seconds=config["LEASE_TTL_SECONDS"],
+            max_attempts=config["LEASE_MAX_ATTEMPTS"],
+        )
+
+    def close(self) -> None:
+        self.store.close()
+
+    def run(self, run_by: str) -> None:
+        self.store.slack_client.send_info_slack(
+            f"Store worker 시작합니다. ({self.config['ENVIRONMENT']}, "
+            f"{run_by}, {self.queue.owner})"
+        )
+
+        init_store_db_schema(self.store.session_factory)
+
+        log_id_prefix = self.store.fetch_log_id_prefix()
+        self.store.check_area_range_valid_or_not(log_id_prefix)
+
+        tree = self.store.fetch_load_tree(log_id_prefix)
+        units: typing.Dict[LeaseUnit, typing.List[MulgunNode]] = dict()
+        for node in tree.select(
+            self.store.region_level_1,
+            self.store.region_level_2,
+            self.store.region_level_3,
+        ):
+            units.setdefault((node.sido_name, node.gugun_name), list()).append(
+                node
+            )
+        # --force 이면 이전에 끝났거나 실패한 구군도 다시 적재합니다
+        self.queue.enqueue(
+            log_id_prefix, units, force=self.config["FORCE_LOAD"]
+        )
+
+        loaded_count = 0
+        while True:
+            unit = self.queue.acquire(log_id_prefix)
+            if unit is None:
+                # 남은 작업은 다른 worker 가 lease 를 갖고 있습니다. 그
+                # worker 가 죽으면 lease 가 만료되어 가져올 수 있습니다
+                if not self.queue.remaining(log_id_prefix):
+                    break
+                time.sleep(self.config["LEASE_POLL_SECONDS"])
+                continue
+
+            self.load_unit(log_id_prefix, unit, units, tree)
+            loaded_count += 1
+
+        self.store.slack_client.send_info_slack(
+            f"Store worker 종료합니다. ({self.config['ENVIRONMENT']}, "
+            f"{run_by}, {self.queue.owner}, {loaded_count} 구군)"
+        )
+
+        failed_units = self.queue.failed_units(log_id_prefix)
+        if failed_units:
+            raise TaeinStoreError(
+                f"failed lease units({log_id_prefix}, "
+                f"{', '.join(' '.join(x) for x in failed_units)})"
+            )
+
+    def load_unit(
+        self,
+        log_id_prefix: str,
+        unit: LeaseUnit,
+        units: typing.Dict[LeaseUnit, typing.List[MulgunNode]],
+        tree: RunTree,
+    ) -> None:
+        sido_name, gugun_name = unit
+        nodes = units.get(unit)
+        if nodes is None:
+            # 다른 worker 가 넣은 작업이면 트리에서 구군의 동을 찾습니다
+            nodes = [
+                x
+                for x in tree.nodes(sido_name)
+                if x.gugun_name == gugun_name
+            ]
+
+        try:
+            with LeaseHeartbeat(self.queue, log_id_prefix, unit) as heartbeat:
+                self.store.load_selected_nodes(
+                    log_id_prefix, nodes, heartbeat.check
+                )
+        except TaeinStoreLeaseLost:
+            # 다른 worker 가 구군을 다시 적재하므로 이 구군만 멈춥니다
+            logger.warning("Abort lease unit", unit=unit)
+            return
+        except Exception:
+            self.queue.release(log_id_prefix, unit)
+            raise
+        self.queue.complete(log_id_prefix, unit)
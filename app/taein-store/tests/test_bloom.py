@@ -0,0 +1,120 @@
+import datetime
+import decimal
+import unittest
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from taein_store.store.bloom import (
+    BloomFilter,
+    TaeinBidFilter,
+    bid_item,
+    bid_value,
+)
+from taein_store.store.data import MulgunRecords
+
+from .test_data import bid_record
+
+metadata = sa.MetaData()
+bid_table = sa.Table(
+    "taein_bid",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("bid_event_number", sa.String),
+    sa.Column("bid_date", sa.Date),
+    sa.Column("taein_dong_id", sa.Integer),
+    sa.Column("bid_success_price", sa.Integer),
+)
+KEY_COLUMNS = ["bid_event_number", "bid_date", "taein_dong_id"]
+COLUMNS = KEY_COLUMNS + ["bid_success_price"]
+
+
+def bid_row(event_number: str, price: int) -> dict:
+    return {
+        "bid_event_number": event_number,
+        "bid_date": datetime.date.today(),
+        "taein_dong_id": 1,
+        "bid_success_price": price,
+    }
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_contains(self) -> None:
+        bloom = BloomFilter.create(100, 1e-6)
+        bloom.add(b"a")
+        self.assertIn(b"a", bloom)
+        self.assertNotIn(b"b", bloom)
+        self.assertEqual(1, bloom.item_count)
+
+
+class BidValueTest(unittest.TestCase):
+    def test_sidecar_value_matches_db_value(self) -> None:
+        records = MulgunRecords(statistics_list=[], bid_list=[bid_record()])
+        [bid] = MulgunRecords.from_jsonl(records.to_jsonl()).bid_list
+        # DB 의 numeric 컬럼은 자릿수가 다른 Decimal 로 읽힙니다
+        self.assertEqual(
+            bid_value(decimal.Decimal("95.0")),
+            bid_value(bid.average_bid_rate),
+        )
+
+
+class TaeinBidFilterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        engine = sa.create_engine("sqlite://")
+        metadata.create_all(engine)
+        self.session_factory = orm.sessionmaker(bind=engine)
+        self.session = self.session_factory()
+        self.addCleanup(self.session.close)
+
+    def create_filter(self, capacity: int = 100) -> TaeinBidFilter:
+        bid_filter = TaeinBidFilter(
+            self.session_factory,
+            bid_table,
+            COLUMNS,
+            KEY_COLUMNS,
+            "",
+            days=31,
+            capacity=capacity,
+        )
+        bid_filter.bloom = BloomFilter.create(capacity, 1e-6)
+        bid_filter.window_start = datetime.date.today() - datetime.timedelta(
+            days=31
+        )
+        return bid_filter
+
+    def test_stored_is_confirmed_in_db(self) -> None:
+        bid_filter = self.create_filter()
+        stored_row = bid_row("2020타경1", 100)
+        changed_row = bid_row("2020타경2", 200)
+        self.session.execute(
+            bid_table.insert(),
+            [stored_row, dict(changed_row, bid_success_price=150)],
+        )
+        # 값이 바뀐 낙찰사례가 filter 에 있는 경우(오판)를 만듭니다
+        bid_filter.bloom.add(bid_item(stored_row))
+        bid_filter.bloom.add(bid_item(changed_row))
+
+        self.assertEqual(
+            [True, False, False],
+            bid_filter.stored(
+                self.session,
+                [stored_row, changed_row, bid_row("2020타경3", 300)],
+            ),
+        )
+        self.assertEqual(1, bid_filter.suppressed_count)
+        self.assertEqual(1, bid_filter.false_positive_count)
+
+    def test_miss_skips_db(self) -> None:
+        bid_filter = self.create_filter()
+        self.session.close()
+        self.session = None
+        # filter 에 없으면 DB 를 읽지 않습니다
+        self.assertEqual(
+            [False], bid_filter.stored(None, [bid_row("2020타경1", 100)])
+        )
+
+    def test_stop_adding_at_capacity(self) -> None:
+        bid_filter = self.create_filter(capacity=2)
+        bid_filter.add([bid_row(f"2020타경{x}", x) for x in range(3)])
+        self.assertEqual(2, bid_filter.bloom.item_count)
+        self.assertTrue(bid_filter.full)
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import typing
+import unittest
+
+from taein_store.store.cache import TaeinRecordCache, node_cache_key
+from taein_store.store.data import MulgunRecords
+from taein_store.store.tree import RunTree
+
+from .test_data import bid_record, statistics_record
+from .test_prefetch import mulgun_nodes
+
+
+def versioned_node(dong_number: int, version: str = "v1"):
+    [node] = mulgun_nodes(1)
+    node.dong_name = f"{dong_number}동"
+    node.add_key(f"taein/{dong_number}/a_bid_1.html", "bid", 1, version)
+    return node
+
+
+def archive_node(version: typing.Optional[str], dong_name: str = "개포동"):
+    tree = RunTree()
+    tree.add_archive_member(
+        "compacted/dev/2020/10/서울.shard.gz",
+        f"100/서울/강남구/{dong_name}/아파트",
+        version,
+    )
+    [node] = tree.nodes("서울")
+    return node
+
+
+class NodeCacheKeyTest(unittest.TestCase):
+    def test_key_follows_versions(self) -> None:
+        self.assertEqual(
+            node_cache_key(versioned_node(0)),
+            node_cache_key(versioned_node(0)),
+        )
+        self.assertNotEqual(
+            node_cache_key(versioned_node(0)),
+            node_cache_key(versioned_node(0, "v2")),
+        )
+
+    def test_unknown_version(self) -> None:
+        self.assertIsNone(node_cache_key(versioned_node(0, None)))
+        self.assertIsNone(node_cache_key(mulgun_nodes(1)[0]))
+
+
+class TaeinRecordCacheTest(unittest.TestCase):
+    def test_put_get(self) -> None:
+        records = MulgunRecords([statistics_record()], [bid_record()])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TaeinRecordCache(temp_dir, 1024 * 1024)
+            node = versioned_node(0)
+            self.assertIsNone(cache.get(node))
+
+            cache.put(node, records)
+            cached, size = cache.get(node)
+            self.assertEqual(records, cached)
+            self.assertEqual(cache.total_bytes, size)
+            # 버전이 바뀐 동은 캐시를 쓰지 않습니다
+            self.assertIsNone(cache.get(versioned_node(0, "v2")))
+
+    def test_archive_member_follows_archive_version(self) -> None:
+        records = MulgunRecords([statistics_record()], [bid_record()])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TaeinRecordCache(temp_dir, 1024 * 1024)
+            cache.put(archive_node("abc"), records)
+
+            cached, _ = cache.get(archive_node("abc"))
+            self.assertEqual(records, cached)
+            # 같은 보관본의 다른 member 는 따로 캐싱합니다
+            self.assertIsNone(cache.get(archive_node("abc", "대치동")))
+            # 보관본을 다시 쓰면 ETag 가 바뀌어 이전 캐시를 쓰지 않습니다
+            self.assertIsNone(cache.get(archive_node("def")))
+            # 보관본의 ETag 를 모르면 캐싱하지 않습니다
+            cache.put(archive_node(None), records)
+            self.assertIsNone(cache.get(archive_node(None)))
+
+    def test_evict_least_recently_used(self) -> None:
+        records = MulgunRecords([statistics_record()], [bid_record()])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TaeinRecordCache(temp_dir, 1024 * 1024)
+            cache.put(versioned_node(0), records)
+            size = cache.total_bytes
+            for x in range(3):
+                path = cache.path(node_cache_key(versioned_node(x)))
+                if x:
+                    cache.put(versioned_node(x), records)
+                os.utime(path, (x, x))
+
+            cache.max_bytes = size * 3
+            cache.put(versioned_node(3), records)
+
+            self.assertIsNone(cache.get(versioned_node(0)))
+            self.assertIsNotNone(cache.get(versioned_node(3)))
+            self.assertEqual(size * 2, cache.total_bytes)
@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+
+import attr
+
+from taein_store.store.claim import (
+    TaeinNewestRunFilter,
+    TaeinStatisticsClaims,
+    claim_lock_id,
+)
+from taein_store.store.data import MulgunRecords
+
+from .test_data import bid_record, statistics_record
+from .test_prefetch import mulgun_nodes
+
+CLAIM = ("sido", "서울", "", 1, "2020.10.01", "2020.10.31")
+
+
+def db_session(dialect_name: str, locked: bool = True) -> mock.Mock:
+    session = mock.Mock()
+    session.bind.dialect.name = dialect_name
+    session.execute.return_value.scalar.return_value = locked
+    return session
+
+
+class TaeinStatisticsClaimsTest(unittest.TestCase):
+    def test_claim_once(self) -> None:
+        claims = TaeinStatisticsClaims()
+        claims.start_run("dev/2020/10/12/100/")
+        session = db_session("sqlite")
+        self.assertTrue(claims.claim(session, CLAIM))
+        self.assertFalse(claims.claim(session, CLAIM))
+        session.execute.assert_not_called()
+
+    def test_release(self) -> None:
+        claims = TaeinStatisticsClaims()
+        session = db_session("sqlite")
+        claims.claim(session, CLAIM)
+        claims.release([CLAIM])
+        self.assertTrue(claims.claim(session, CLAIM))
+
+    def test_new_run(self) -> None:
+        claims = TaeinStatisticsClaims()
+        session = db_session("sqlite")
+        claims.start_run("dev/2020/10/12/100/")
+        claims.claim(session, CLAIM)
+        claims.start_run("dev/2020/10/12/100/")
+        self.assertFalse(claims.claim(session, CLAIM))
+        claims.start_run("dev/2020/10/13/200/")
+        self.assertTrue(claims.claim(session, CLAIM))
+
+    def test_claimed_by_other_host(self) -> None:
+        claims = TaeinStatisticsClaims()
+        self.assertFalse(claims.claim(db_session("postgresql", False), CLAIM))
+        # 다른 host 의 transaction 이 끝나면 다시 claim 할 수 있습니다
+        self.assertTrue(claims.claim(db_session("postgresql"), CLAIM))
+
+    def test_claim_lock_id(self) -> None:
+        self.assertEqual(claim_lock_id(CLAIM), claim_lock_id(tuple(CLAIM)))
+        self.assertNotEqual(
+            claim_lock_id(CLAIM), claim_lock_id(CLAIM[:-1] + ("2020.11.30",))
+        )
+        self.assertLess(abs(claim_lock_id(CLAIM)), 2 ** 63)
+
+
+class TaeinNewestRunFilterTest(unittest.TestCase):
+    def test_skip_values_of_newer_run(self) -> None:
+        [node] = mulgun_nodes(1)
+        newest_run_filter = TaeinNewestRunFilter()
+        records = MulgunRecords(
+            statistics_list=[statistics_record()], bid_list=[bid_record()]
+        )
+        self.assertEqual(records, newest_run_filter.filter(node, records))
+        # 같은 실행 안에서는 거르지 않습니다
+        self.assertEqual(records, newest_run_filter.filter(node, records))
+        newest_run_filter.finish_run()
+
+        older_records = attr.evolve(
+            records,
+            bid_list=records.bid_list
+            + [bid_record(bid_event_number="2018타경1")],
+        )
+        self.assertEqual(
+            MulgunRecords(
+                statistics_list=[],
+                bid_list=[bid_record(bid_event_number="2018타경1")],
+            ),
+            newest_run_filter.filter(node, older_records),
+        )
@@ -0,0 +1,62 @@
+import gzip
+import json
+import unittest
+
+from taein_store.store.codec import (
+    PageReference,
+    decode_page,
+    detect_page_encoding,
+    parse_reference,
+    zstandard,
+)
+from taein_store.store.exc import TaeinStoreError
+
+PAGE = "<html><body>서울 강남구</body></html>"
+
+
+class DecodePageTest(unittest.TestCase):
+    def test_plain(self) -> None:
+        body = PAGE.encode("utf-8")
+        self.assertIsNone(detect_page_encoding("a_bid_1.html", body))
+        self.assertEqual(PAGE, decode_page("a_bid_1.html", body))
+
+    def test_gzip_by_suffix_and_magic(self) -> None:
+        body = gzip.compress(PAGE.encode("utf-8"))
+        self.assertEqual("gzip", detect_page_encoding("a_bid_1.html.gz", body))
+        # 접미사가 없는 예전 키도 매직 바이트로 판단합니다
+        self.assertEqual("gzip", detect_page_encoding("a_bid_1.html", body))
+        self.assertEqual(PAGE, decode_page("a_bid_1.html", body))
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self) -> None:
+        body = zstandard.ZstdCompressor().compress(PAGE.encode("utf-8"))
+        self.assertEqual("zstd", detect_page_encoding("a_bid_1.html", body))
+        self.assertEqual(PAGE, decode_page("a_bid_1.html.zst", body))
+
+    @unittest.skipIf(zstandard is not None, "zstandard is installed")
+    def test_zstd_not_installed(self) -> None:
+        with self.assertRaises(TaeinStoreError):
+            decode_page("a_bid_1.html.zst", b"\x28\xb5\x2f\xfd")
+
+
+class ParseReferenceTest(unittest.TestCase):
+    def test_page(self) -> None:
+        self.assertIsNone(parse_reference(PAGE.encode("utf-8")))
+
+    def test_reference(self) -> None:
+        body = json.dumps(
+            {
+                "taein_ref": 1,
+                "sha256": "abc",
+                "key": "taein/2020/pages.shard",
+                "member": "a_bid_1.html",
+            }
+        ).encode("utf-8")
+        self.assertEqual(
+            PageReference(
+                key="taein/2020/pages.shard",
+                sha256="abc",
+                member="a_bid_1.html",
+            ),
+            parse_reference(body),
+        )
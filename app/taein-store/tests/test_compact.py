@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+
+from taein_store.store.compact import TaeinCompactor, run_month
+from taein_store.store.data import CrawlerRunEntry
+from taein_store.store.shard import ShardFileWriter
+
+from .test_store import bare_store, run_entry
+
+
+def create_compactor() -> TaeinCompactor:
+    compactor = TaeinCompactor.__new__(TaeinCompactor)
+    compactor.config = {"ENVIRONMENT": "dev"}
+    compactor.store = bare_store()
+    compactor.s3_client = compactor.store.s3_client
+    return compactor
+
+
+class TaeinCompactorTest(unittest.TestCase):
+    def test_run_month(self) -> None:
+        entry = CrawlerRunEntry.from_json(run_entry("100", "completed"))
+        self.assertEqual("2020-10", run_month(entry))
+
+    def test_upload_archive_with_index(self) -> None:
+        compactor = create_compactor()
+        writer = ShardFileWriter()
+        try:
+            writer.add("100/서울/강남구/개포동/아파트", b"{}")
+            archive_key = compactor.upload_archive(
+                "compacted/dev/2020/10", "서울.shard.gz", writer
+            )
+        finally:
+            writer.close()
+
+        self.assertEqual("compacted/dev/2020/10/서울.shard.gz", archive_key)
+        compactor.s3_client.upload_json.assert_called_once_with(
+            folder_name="compacted/dev/2020/10",
+            file_name="서울.index.json",
+            data=["100/서울/강남구/개포동/아파트"],
+        )
+
+    def test_write_catalog_entries(self) -> None:
+        compactor = create_compactor()
+        catalog = {"100": run_entry("100", "completed")}
+        compactor.store.fetch_run_catalog_data = mock.Mock(
+            return_value=catalog
+        )
+        compactor.store.fetch_latest_entry_data = mock.Mock(
+            return_value=run_entry("200", "completed")
+        )
+        entry = CrawlerRunEntry.from_json(catalog["100"])
+        archive_keys = {"서울": "compacted/dev/2020/10/서울.shard.gz"}
+
+        compactor.write_catalog_entries("2020-10", [(entry, archive_keys)])
+
+        # crawler 가 수정하는 runs.json 은 다시 쓰지 않습니다
+        compactor.s3_client.upload_json.assert_called_once_with(
+            folder_name="meta/dev/catalog/compacted",
+            file_name="2020-10.json",
+            data=[
+                dict(
+                    catalog["100"], status="compacted", compacted=archive_keys
+                )
+            ],
+        )
+
+    def test_write_catalog_entries_updates_latest(self) -> None:
+        compactor = create_compactor()
+        catalog = {"100": run_entry("100", "completed")}
+        compactor.store.fetch_run_catalog_data = mock.Mock(
+            return_value=catalog
+        )
+        compactor.store.fetch_latest_entry_data = mock.Mock(
+            return_value=catalog["100"]
+        )
+        entry = CrawlerRunEntry.from_json(catalog["100"])
+        archive_keys = {"서울": "compacted/dev/2020/10/서울.shard.gz"}
+
+        compactor.write_catalog_entries("2020-10", [(entry, archive_keys)])
+
+        # store 가 LATEST 만 읽고도 보관본을 찾을 수 있습니다
+        compactor.s3_client.upload_json.assert_called_with(
+            folder_name="meta/dev/catalog",
+            file_name="LATEST.json",
+            data=dict(
+                catalog["100"], status="compacted", compacted=archive_keys
+            ),
+        )
@@ -0,0 +1,187 @@
+import datetime
+import decimal
+import json
+import pickle
+import types
+import unittest
+from unittest import mock
+
+import attr
+
+from taein_store.store.data import (
+    SIDECAR_SCHEMA_VERSION,
+    BidRecord,
+    LazyStatisticsRecord,
+    MulgunRecords,
+    StatisticsRecord,
+    StatisticsSection,
+)
+
+
+def statistics_section(rate: str = "95.0") -> StatisticsSection:
+    return StatisticsSection(
+        year_avg_price_rate_str=rate,
+        year_avg_price_rate=decimal.Decimal(rate),
+        year_avg_bid_rate_str="7.0",
+        year_avg_bid_rate=decimal.Decimal("7.0"),
+        year_bid_count=12,
+        six_month_avg_price_rate_str=rate,
+        six_month_avg_price_rate=decimal.Decimal(rate),
+        six_month_avg_bid_rate_str="7.5",
+        six_month_avg_bid_rate=decimal.Decimal("7.5"),
+        six_month_bid_count=6,
+    )
+
+
+def statistics_record() -> StatisticsRecord:
+    return StatisticsRecord(
+        sido_name="서울",
+        gugun_name="강남구",
+        dong_name="개포동",
+        building_start_area="최소",
+        building_end_area="40",
+        start_date_str="2020.10.01",
+        start_date=datetime.date(2020, 10, 1),
+        end_date_str="2020.10.31",
+        end_date=datetime.date(2020, 10, 31),
+        sido=statistics_section("90.1"),
+        gugun=statistics_section("92.3"),
+        dong=statistics_section(),
+    )
+
+
+def statistics_response() -> types.SimpleNamespace:
+    """taein_schema 가 만든 값과 같은 타입의 응답입니다."""
+    levels = {"sido": "90.10", "gugun": "92.30", "dong": "95.00"}
+    return types.SimpleNamespace(
+        sido_name="서울",
+        gugun_name="강남구",
+        dong_name="개포동",
+        building_start_area="최소",
+        building_end_area="40",
+        start_date_str="2020.10.01",
+        start_date=datetime.date(2020, 10, 1),
+        end_date_str="2020.10.31",
+        end_date=datetime.date(2020, 10, 31),
+        **{
+            f"{level}_{field}": value
+            for level, rate in levels.items()
+            for field, value in (
+                ("year_avg_price_rate", decimal.Decimal(rate)),
+                ("year_avg_bid_rate", decimal.Decimal("7.00")),
+                ("year_bid_count", 12),
+                ("six_month_avg_price_rate", decimal.Decimal(rate)),
+                ("six_month_avg_bid_rate", decimal.Decimal("7.50")),
+                ("six_month_bid_count", 6),
+            )
+        },
+    )
+
+
+def bid_record(**kwargs: object) -> BidRecord:
+    values = dict(
+        bid_date_str="2020.10.12",
+        bid_date=datetime.date(2020, 10, 12),
+        bid_event_number="2019타경12345",
+        address="서울 강남구 개포동 12",
+        bid_judged_price=1000000000,
+        bid_success_price=950000000,
+        average_bid_rate_str="95.0",
+        average_bid_rate=decimal.Decimal("95.00"),
+        bidder_count=7,
+        bid_kind="아파트",
+    )
+    values.update(kwargs)
+    return BidRecord(**values)
+
+
+class MulgunRecordsTest(unittest.TestCase):
+    def test_jsonl_round_trip(self) -> None:
+        records = MulgunRecords(
+            statistics_list=[statistics_record()], bid_list=[bid_record()]
+        )
+
+        self.assertEqual(
+            records, MulgunRecords.from_jsonl(records.to_jsonl())
+        )
+
+    def test_sidecar_matches_html_records(self) -> None:
+        response = statistics_response()
+        bid = types.SimpleNamespace(
+            **attr.asdict(
+                bid_record(bid_judged_price=decimal.Decimal("1000000000"))
+            )
+        )
+        records = MulgunRecords(
+            statistics_list=[StatisticsRecord.from_schema(response)],
+            bid_list=[BidRecord.from_schema(bid)],
+        )
+
+        from_sidecar = MulgunRecords.from_jsonl(records.to_jsonl())
+        self.assertEqual(records, from_sidecar)
+        self.assertEqual(
+            decimal.Decimal("95.00"),
+            from_sidecar.statistics_list[0].dong.year_avg_price_rate,
+        )
+        self.assertIsInstance(
+            from_sidecar.bid_list[0].average_bid_rate, decimal.Decimal
+        )
+
+    def test_decimal_is_written_as_string(self) -> None:
+        value = decimal.Decimal("1234567890.123456789")
+        records = MulgunRecords(
+            statistics_list=[], bid_list=[bid_record(bid_judged_price=value)]
+        )
+
+        row = json.loads(records.to_jsonl())
+        self.assertEqual(str(value), row["record"]["bid_judged_price"])
+
+    def test_schema_mismatch(self) -> None:
+        data = json.dumps(
+            {"schema_version": SIDECAR_SCHEMA_VERSION + 1, "type": "bid"}
+        )
+
+        self.assertIsNone(MulgunRecords.from_jsonl(data))
+
+
+class LazyStatisticsRecordTest(unittest.TestCase):
+    def test_sections_are_built_when_read(self) -> None:
+        response = statistics_response()
+        with mock.patch.object(
+            StatisticsSection,
+            "from_values",
+            wraps=StatisticsSection.from_values,
+        ) as from_values:
+            record = LazyStatisticsRecord.from_schema(response)
+            self.assertEqual(1, from_values.call_count)
+
+            self.assertEqual(
+                decimal.Decimal("92.30"), record.gugun.year_avg_price_rate
+            )
+            # 한 번 만든 통계는 다시 만들지 않습니다
+            record.gugun
+            self.assertEqual(2, from_values.call_count)
+
+        self.assertEqual(StatisticsRecord.from_schema(response), record)
+
+    def test_pickle_keeps_sections_pending(self) -> None:
+        record = LazyStatisticsRecord.from_schema(statistics_response())
+        record.gugun
+
+        restored = pickle.loads(pickle.dumps(record))
+        self.assertNotIn("_sido", restored.__dict__)
+        self.assertIn("_gugun", restored.__dict__)
+        self.assertEqual(record, restored)
+
+    def test_sidecar_sections_are_parsed_when_written(self) -> None:
+        data = MulgunRecords(
+            statistics_list=[statistics_record()], bid_list=[]
+        ).to_jsonl()
+        with mock.patch.object(
+            StatisticsSection, "from_json", wraps=StatisticsSection.from_json
+        ) as from_json:
+            records = MulgunRecords.from_jsonl(data)
+            self.assertEqual(1, from_json.call_count)
+
+            self.assertEqual(data, records.to_jsonl())
+            self.assertEqual(3, from_json.call_count)
@@ -0,0 +1,128 @@
+import typing
+import unittest
+
+import sqlalchemy as sa
+
+from taein_store.db import (
+    BulkUpserter,
+    create_session_factory,
+    has_unique_key,
+    session_scope,
+)
+
+
+def bid_table(*args: typing.Any) -> sa.Table:
+    return sa.Table(
+        "taein_bid",
+        sa.MetaData(),
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("bid_event_number", sa.String),
+        sa.Column("bid_date", sa.Date),
+        sa.Column("taein_dong_id", sa.Integer),
+        *args,
+    )
+
+
+class HasUniqueKeyTest(unittest.TestCase):
+    def test_unique_constraint(self) -> None:
+        table = bid_table(
+            sa.UniqueConstraint(
+                "bid_event_number", "bid_date", "taein_dong_id"
+            )
+        )
+        self.assertTrue(
+            has_unique_key(
+                table, ["taein_dong_id", "bid_event_number", "bid_date"]
+            )
+        )
+        self.assertFalse(has_unique_key(table, ["bid_event_number"]))
+
+    def test_unique_index(self) -> None:
+        table = bid_table()
+        sa.Index("ix_bid", table.c.bid_event_number, unique=True)
+        self.assertTrue(has_unique_key(table, ["bid_event_number"]))
+
+
+class BulkUpserterTest(unittest.TestCase):
+    def test_create_requires_unique_key(self) -> None:
+        with self.assertRaises(ValueError):
+            BulkUpserter.create(bid_table(), ["bid_event_number"])
+
+    def test_staging_table(self) -> None:
+        upserter = BulkUpserter.create(
+            bid_table(sa.UniqueConstraint("bid_event_number", "bid_date")),
+            ["bid_event_number", "bid_date"],
+        )
+        self.assertEqual(
+            ["bid_event_number", "bid_date", "taein_dong_id"],
+            [x.name for x in upserter.staging_table().columns],
+        )
+
+
+class BulkUpserterStagingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session_factory = create_session_factory(
+            {"SQLALCHEMY_DATABASE_URI": "sqlite://"}
+        )
+        self.statements: typing.List[str] = list()
+        sa.event.listen(
+            self.session_factory.kw["bind"],
+            "before_cursor_execute",
+            lambda *args: self.statements.append(args[2]),
+        )
+        self.upserter = BulkUpserter.create(
+            bid_table(sa.UniqueConstraint("bid_event_number", "bid_date")),
+            ["bid_event_number", "bid_date"],
+        )
+
+    def create_count(self) -> int:
+        return len([x for x in self.statements if "CREATE" in x])
+
+    def test_staging_is_created_once_per_connection(self) -> None:
+        for _ in range(2):
+            with session_scope(self.session_factory) as session:
+                self.upserter.prepare_staging(session)
+                self.upserter.prepare_staging(session)
+        self.assertEqual(1, self.create_count())
+
+    def test_rollback_forgets_staging(self) -> None:
+        with self.assertRaises(ValueError):
+            with session_scope(self.session_factory) as session:
+                self.upserter.prepare_staging(session)
+                raise ValueError()
+
+        # PostgreSQL 에서는 rollback 으로 테이블이 사라지므로 다시 확인합니다
+        with session_scope(self.session_factory) as session:
+            info = session.connection().info
+            self.assertNotIn("bulk_upserter_staging:taein_bid_staging", info)
+            staging = self.upserter.prepare_staging(session)
+            session.execute(staging.insert(), {"bid_event_number": "1"})
+            self.assertIn("bulk_upserter_staging:taein_bid_staging", info)
+
+
+class SessionScopeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # PostgreSQL 전용 pool 설정은 sqlite 에 넘기지 않습니다
+        self.session_factory = create_session_factory(
+            {"SQLALCHEMY_DATABASE_URI": "sqlite://"}
+        )
+        self.table = bid_table()
+        self.table.create(self.session_factory.kw["bind"])
+
+    def count(self) -> int:
+        with session_scope(self.session_factory) as session:
+            return session.execute(
+                sa.select([sa.func.count()]).select_from(self.table)
+            ).scalar()
+
+    def test_commit(self) -> None:
+        with session_scope(self.session_factory) as session:
+            session.execute(self.table.insert(), {"bid_event_number": "1"})
+        self.assertEqual(1, self.count())
+
+    def test_rollback(self) -> None:
+        with self.assertRaises(ValueError):
+            with session_scope(self.session_factory) as session:
+                session.execute(self.table.insert(), {"bid_event_number": "1"})
+                raise ValueError("dong failed")
+        self.assertEqual(0, self.count())
@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from taein_store.db import (
+    create_session_factory,
+    init_store_db_schema,
+    session_scope,
+)
+from taein_store.models import store_statistics_fingerprint_table
+from taein_store.store.fingerprint import (
+    TaeinStatisticsFingerprints,
+    statistics_fingerprint,
+)
+
+KEY = ("dong", 1, 2, "2020.10.01", "2020.10.31")
+
+
+class StatisticsFingerprintTest(unittest.TestCase):
+    def test_values(self) -> None:
+        self.assertEqual(
+            statistics_fingerprint([1, "95.0"]),
+            statistics_fingerprint([1, "95.0"]),
+        )
+        self.assertNotEqual(
+            statistics_fingerprint([1, "95.0"]),
+            statistics_fingerprint([1, "96.0"]),
+        )
+
+
+class TaeinStatisticsFingerprintsTest(unittest.TestCase):
+    def test_unchanged(self) -> None:
+        fingerprints = TaeinStatisticsFingerprints(mock.Mock())
+        with mock.patch.object(
+            fingerprints, "fetch_fingerprints", return_value={KEY: "a"}
+        ) as fetch_fingerprints:
+            self.assertTrue(fingerprints.unchanged(KEY, "a"))
+            self.assertFalse(fingerprints.unchanged(KEY, "b"))
+        # 기간마다 한 번만 읽어옵니다
+        fetch_fingerprints.assert_called_once_with("2020.10.01", "2020.10.31")
+
+        fingerprints.commit([(KEY, "b")])
+        self.assertTrue(fingerprints.unchanged(KEY, "b"))
+
+    def test_record_upserts(self) -> None:
+        fingerprints = TaeinStatisticsFingerprints(mock.Mock())
+        session = mock.Mock()
+        session.bind.dialect.name = "postgresql"
+        fingerprints.record(session, KEY, "a")
+
+        [(statement,), _] = session.execute.call_args
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.assertIn(
+            "ON CONFLICT (level, region_id, area_range_id, start_date_str, "
+            "end_date_str) DO UPDATE SET fingerprint = excluded.fingerprint",
+            sql,
+        )
+        self.assertEqual(1, session.execute.call_count)
+
+
+class FingerprintTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session_factory = create_session_factory(
+            {"SQLALCHEMY_DATABASE_URI": "sqlite://"}
+        )
+        init_store_db_schema(self.session_factory)
+
+    def stored(self) -> list:
+        table = store_statistics_fingerprint_table
+        with session_scope(self.session_factory) as session:
+            return [
+                x.fingerprint
+                for x in session.execute(sa.select([table.c.fingerprint]))
+            ]
+
+    def test_record_replaces_without_on_conflict(self) -> None:
+        fingerprints = TaeinStatisticsFingerprints(self.session_factory)
+        for fingerprint in ("a", "b"):
+            with session_scope(self.session_factory) as session:
+                fingerprints.record(session, KEY, fingerprint)
+
+        self.assertEqual(["b"], self.stored())
+
+    def test_rebuild_clears_window(self) -> None:
+        with session_scope(self.session_factory) as session:
+            TaeinStatisticsFingerprints(self.session_factory).record(
+                session, KEY, "a"
+            )
+
+        fingerprints = TaeinStatisticsFingerprints(
+            self.session_factory, rebuild=True
+        )
+        # 통계를 다시 쓰도록 같은 값도 바뀐 것으로 봅니다
+        self.assertFalse(fingerprints.unchanged(KEY, "a"))
+        self.assertEqual([], self.stored())
+
+        fingerprints.commit([(KEY, "a")])
+        self.assertFalse(fingerprints.unchanged(KEY, "a"))
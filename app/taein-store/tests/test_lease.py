@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from sqlalchemy.dialects import postgresql
+
+from taein_store.store.exc import TaeinStoreLeaseLost
+from taein_store.store.lease import LeaseHeartbeat, TaeinLeaseQueue
+
+RUN_PREFIX = "dev/2020/10/12/100/"
+
+
+def create_queue() -> TaeinLeaseQueue:
+    return TaeinLeaseQueue(
+        mock.Mock(), owner="host:1", ttl_seconds=300, max_attempts=3
+    )
+
+
+def executed_sql(queue: TaeinLeaseQueue) -> str:
+    """session 에 넘긴 첫 문장을 PostgreSQL 문법으로 바꿉니다."""
+    session = queue.session_factory.return_value
+    statement = session.execute.call_args_list[0][0][0]
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TaeinLeaseQueueTest(unittest.TestCase):
+    def test_enqueue_keeps_existing_units(self) -> None:
+        queue = create_queue()
+        queue.enqueue(RUN_PREFIX, [("서울", "강남구")])
+        self.assertIn("ON CONFLICT DO NOTHING", executed_sql(queue))
+
+    def test_force_enqueue_resets_units(self) -> None:
+        queue = create_queue()
+        queue.enqueue(RUN_PREFIX, [("서울", "강남구")], force=True)
+
+        sql = executed_sql(queue)
+        self.assertIn(
+            "ON CONFLICT (run_prefix, sido_name, gugun_name) DO UPDATE", sql
+        )
+        self.assertIn("attempts = %(param_4)s", sql)
+        # 다른 worker 가 작업 중인 lease 는 건드리지 않습니다
+        self.assertIn("WHERE NOT", sql)
+
+    def test_acquire_skips_exhausted_units(self) -> None:
+        queue = create_queue()
+        session = queue.session_factory.return_value
+        session.execute.return_value.first.return_value = None
+
+        self.assertIsNone(queue.acquire(RUN_PREFIX))
+        self.assertIn(
+            "taein_store_lease.attempts < %(attempts_1)s", executed_sql(queue)
+        )
+
+
+class LeaseHeartbeatTest(unittest.TestCase):
+    def test_check(self) -> None:
+        heartbeat = LeaseHeartbeat(
+            mock.Mock(ttl_seconds=300), "dev/2020/10/12/100/", ("서울", "강남구")
+        )
+        heartbeat.check()
+        heartbeat.lost.set()
+        with self.assertRaises(TaeinStoreLeaseLost):
+            heartbeat.check()
+
+    def test_lost_when_renew_fails(self) -> None:
+        queue = mock.Mock(ttl_seconds=3)
+        queue.renew.return_value = False
+        with LeaseHeartbeat(
+            queue, "dev/2020/10/12/100/", ("서울", "강남구")
+        ) as heartbeat:
+            self.assertTrue(heartbeat.lost.wait(5))
+        queue.renew.assert_called_once_with(
+            "dev/2020/10/12/100/", ("서울", "강남구")
+        )
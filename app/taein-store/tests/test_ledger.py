@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+from taein_store.store.ledger import TaeinLoadLedger, node_object_versions
+from taein_store.store.tree import MulgunNode
+
+
+def bid_node(dong_name: str, version: str = None) -> MulgunNode:
+    node = MulgunNode(
+        sido_name="서울",
+        gugun_name="강남구",
+        dong_name=dong_name,
+        mulgun_text="아파트",
+    )
+    node.add_key(f"taein/{dong_name}/a_bid_1.html", "bid", 1, version)
+    return node
+
+
+class NodeObjectVersionsTest(unittest.TestCase):
+    def test_pages(self) -> None:
+        node = bid_node("개포동", "abc")
+        node.add_key("taein/개포동/pages.shard", "shard")
+        self.assertEqual(
+            {
+                "taein/개포동/a_bid_1.html": "abc",
+                "taein/개포동/pages.shard": None,
+            },
+            node_object_versions(node),
+        )
+
+    def test_archive_member(self) -> None:
+        node = bid_node("개포동")
+        node.archive_key = "compacted/dev/2020/10/서울.shard.gz"
+        node.archive_member = "100/서울/강남구/개포동/아파트"
+        node.versions[node.archive_key] = "etag"
+        self.assertEqual(
+            {
+                "compacted/dev/2020/10/서울.shard.gz"
+                "#100/서울/강남구/개포동/아파트": "etag"
+            },
+            node_object_versions(node),
+        )
+
+
+class TaeinLoadLedgerTest(unittest.TestCase):
+    def test_pending_nodes(self) -> None:
+        ledger = TaeinLoadLedger(mock.Mock())
+        nodes = [
+            bid_node("loaded", "v1"),
+            bid_node("changed", "v2"),
+            bid_node("unknown"),
+            bid_node("new", "v1"),
+            bid_node("unknown_loaded", "v1"),
+        ]
+        loaded = {
+            "taein/loaded/a_bid_1.html": "v1",
+            "taein/changed/a_bid_1.html": "v1",
+            "taein/unknown/a_bid_1.html": None,
+            "taein/unknown_loaded/a_bid_1.html": None,
+        }
+        with mock.patch.object(
+            ledger, "fetch_loaded_versions", return_value=loaded
+        ):
+            pending = ledger.pending_nodes(nodes)
+
+        # 버전을 모르면 바뀌었는지 알 수 없으므로 다시 적재합니다
+        self.assertEqual(
+            ["changed", "unknown", "new", "unknown_loaded"],
+            [x.dong_name for x in pending],
+        )
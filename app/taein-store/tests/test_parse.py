@@ -0,0 +1,78 @@
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from taein_store.store.data import MulgunRecords
+from taein_store.store.parse import TaeinParser
+from taein_store.store.prefetch import MulgunPages
+
+from .test_prefetch import mulgun_nodes
+
+
+class TaeinParserTest(unittest.TestCase):
+    def test_records_are_not_parsed(self) -> None:
+        nodes = mulgun_nodes(3)
+        records = [
+            MulgunRecords(statistics_list=[], bid_list=[]) for _ in nodes
+        ]
+        parser = TaeinParser(4)
+        with mock.patch(
+            "taein_store.store.parse.parse_html_pages"
+        ) as parse_html_pages:
+            result = list(
+                parser.map(
+                    MulgunPages(node=node, records=x)
+                    for node, x in zip(nodes, records)
+                )
+            )
+
+        self.assertEqual(list(zip(nodes, records)), result)
+        parse_html_pages.assert_not_called()
+
+    def test_parse_in_process(self) -> None:
+        [node] = mulgun_nodes(1)
+        records = MulgunRecords(statistics_list=[], bid_list=[])
+        parser = TaeinParser(1)
+        with mock.patch(
+            "taein_store.store.parse.parse_html_pages", return_value=records
+        ) as parse_html_pages:
+            result = list(
+                parser.map(
+                    [
+                        MulgunPages(
+                            node=node,
+                            statistics_pages=["<statistics>"],
+                            bid_pages=["<bid>"],
+                        )
+                    ]
+                )
+            )
+
+        self.assertEqual([(node, records)], result)
+        parse_html_pages.assert_called_once_with(["<statistics>"], ["<bid>"])
+
+    def test_pool_is_reused_until_close(self) -> None:
+        nodes = mulgun_nodes(2)
+        records = MulgunRecords(statistics_list=[], bid_list=[])
+        parser = TaeinParser(2)
+        with mock.patch(
+            "taein_store.store.parse.ProcessPoolExecutor"
+        ) as executor_class:
+            executor = executor_class.return_value
+            future: Future = Future()
+            future.set_result(records)
+            executor.submit.return_value = future
+            for node in nodes:
+                result = list(
+                    parser.map(
+                        [MulgunPages(node=node, bid_pages=["<bid>"])]
+                    )
+                )
+                self.assertEqual([(node, records)], result)
+
+            executor_class.assert_called_once()
+            executor.shutdown.assert_not_called()
+            parser.close()
+
+        executor.shutdown.assert_called_once_with(wait=True)
+        self.assertIsNone(parser.executor)
@@ -0,0 +1,53 @@
+import threading
+import unittest
+
+from taein_store.store.prefetch import MulgunPages, TaeinPrefetcher
+from taein_store.store.tree import MulgunNode
+
+
+def mulgun_nodes(count: int) -> list:
+    return [
+        MulgunNode(
+            sido_name="서울",
+            gugun_name="강남구",
+            dong_name=f"{x}동",
+            mulgun_text="아파트",
+        )
+        for x in range(count)
+    ]
+
+
+class TaeinPrefetcherTest(unittest.TestCase):
+    def test_keeps_node_order(self) -> None:
+        nodes = mulgun_nodes(10)
+        prefetcher = TaeinPrefetcher(
+            lambda node: MulgunPages(node=node, size=10),
+            max_workers=4,
+            max_bytes=1024,
+        )
+        self.assertEqual(nodes, [x.node for x in prefetcher.map(nodes)])
+        self.assertEqual(0, prefetcher.buffered_bytes)
+
+    def test_sequential(self) -> None:
+        fetched = list()
+
+        def fetch(node: MulgunNode) -> MulgunPages:
+            fetched.append(threading.current_thread())
+            return MulgunPages(node=node)
+
+        prefetcher = TaeinPrefetcher(fetch, max_workers=0, max_bytes=0)
+        nodes = mulgun_nodes(3)
+        self.assertEqual(nodes, [x.node for x in prefetcher.map(nodes)])
+        self.assertEqual([threading.current_thread()] * 3, fetched)
+
+    def test_can_submit(self) -> None:
+        prefetcher = TaeinPrefetcher(
+            lambda node: MulgunPages(node=node), max_workers=2, max_bytes=100
+        )
+        self.assertTrue(prefetcher.can_submit(1))
+        self.assertFalse(prefetcher.can_submit(prefetcher.max_pending))
+
+        prefetcher.buffered_bytes = 100
+        self.assertFalse(prefetcher.can_submit(1))
+        # 첫 다운로드는 크기와 관계없이 진행합니다
+        self.assertTrue(prefetcher.can_submit(0))
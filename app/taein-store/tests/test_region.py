@@ -0,0 +1,130 @@
+import threading
+import typing
+import unittest
+from unittest import mock
+
+import sqlalchemy as sa
+from sqlalchemy.ext.declarative import declarative_base
+
+from taein_store.db import create_session_factory, session_scope
+from taein_store.store import region
+from taein_store.store.region import TaeinRegionResolver
+
+Base = declarative_base()
+
+
+class Sido(Base):
+    __tablename__ = "taein_sido"
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, nullable=False)
+
+    @classmethod
+    def create_or_update(cls, session, name, beautified_name) -> "Sido":
+        db_sido = cls(name=name)
+        session.add(db_sido)
+        return db_sido
+
+
+class Gugun(Base):
+    __tablename__ = "taein_gugun"
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, nullable=False)
+    taein_sido_id = sa.Column(sa.Integer, sa.ForeignKey(Sido.id))
+
+
+class Dong(Base):
+    __tablename__ = "taein_dong"
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, nullable=False)
+    taein_gugun_id = sa.Column(
+        sa.Integer, sa.ForeignKey(Gugun.id), nullable=False
+    )
+
+
+def create_resolver() -> TaeinRegionResolver:
+    """DB 테이블을 확인하지 않고 id 목록만 가진 resolver 를 만듭니다."""
+    resolver = TaeinRegionResolver.__new__(TaeinRegionResolver)
+    resolver.session_factory = mock.Mock()
+    resolver.lock = threading.RLock()
+    resolver.sido_ids = {"서울": 1}
+    resolver.gugun_ids = {("서울", "강남구"): 2}
+    resolver.dong_ids = {("서울", "강남구", "개포동"): 3}
+    return resolver
+
+
+class TaeinRegionResolverTest(unittest.TestCase):
+    def test_prefetched_ids(self) -> None:
+        resolver = create_resolver()
+        self.assertEqual(1, resolver.sido_id("서울"))
+        self.assertEqual(2, resolver.gugun_id("서울", "강남구"))
+        self.assertEqual(3, resolver.dong_id("서울", "강남구", "개포동"))
+        resolver.session_factory.assert_not_called()
+
+
+class RegionCreateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.multiple(
+            region,
+            TaeinSido=Sido,
+            TaeinGugun=Gugun,
+            TaeinDong=Dong,
+            SIDO_REGION_DICT={"서울": "서울특별시"},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.session_factory = create_session_factory(
+            {"SQLALCHEMY_DATABASE_URI": "sqlite://"}
+        )
+        engine = self.session_factory.kw["bind"]
+        Base.metadata.create_all(engine)
+        self.statements: typing.List[str] = list()
+        sa.event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda *args: self.statements.append(args[2]),
+        )
+        self.resolver = TaeinRegionResolver(self.session_factory)
+
+    def count(self, model: typing.Any) -> int:
+        with session_scope(self.session_factory) as session:
+            return session.query(model).count()
+
+    def test_create_missing_regions_in_one_statement(self) -> None:
+        self.resolver.prefetch(
+            [
+                ("서울", "강남구", "개포동"),
+                ("서울", "강남구", "대치동"),
+                ("서울", "서초구", "반포동"),
+            ]
+        )
+
+        inserts = [x for x in self.statements if x.startswith("INSERT")]
+        # 시도 하나와 구군, 읍면동 단계마다 한 문장입니다
+        self.assertEqual(3, len(inserts))
+        self.assertEqual(2, self.count(Gugun))
+        self.assertEqual(3, self.count(Dong))
+        dong_id = self.resolver.dong_id("서울", "서초구", "반포동")
+        with session_scope(self.session_factory) as session:
+            self.assertEqual("반포동", session.query(Dong).get(dong_id).name)
+
+    def test_rollback_keeps_cache_empty(self) -> None:
+        fetch_child_ids = self.resolver.fetch_child_ids
+        calls = iter([fetch_child_ids, mock.Mock(side_effect=ValueError())])
+
+        # 구군을 만든 뒤 읍면동에서 실패하면 transaction 이 rollback 됩니다
+        with mock.patch.object(
+            self.resolver,
+            "fetch_child_ids",
+            side_effect=lambda *args: next(calls)(*args),
+        ):
+            with self.assertRaises(ValueError):
+                self.resolver.prefetch([("서울", "강남구", "개포동")])
+
+        self.assertEqual(0, self.count(Gugun))
+        self.assertEqual(dict(), self.resolver.sido_ids)
+        self.assertEqual(dict(), self.resolver.gugun_ids)
+        self.assertEqual(dict(), self.resolver.dong_ids)
+
+        self.resolver.prefetch([("서울", "강남구", "개포동")])
+        self.assertEqual(1, self.count(Dong))
@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from taein_store.store.exc import TaeinStoreError
+from taein_store.store.shard import (
+    SHARD_MAGIC,
+    SHARD_VERSION,
+    ShardCache,
+    ShardFileWriter,
+    archive_index_key,
+    is_shard_key,
+    read_shard,
+)
+
+MEMBERS = [
+    ("a_statistics.html", b"statistics"),
+    ("a_bid_1.html", "입찰".encode("utf-8")),
+]
+
+
+def crawler_shard(members: list) -> bytes:
+    """crawler 의 TaeinShardWriter 와 같은 형식으로 만듭니다."""
+    index = list()
+    offset = 0
+    for name, body in members:
+        index.append({"name": name, "offset": offset, "length": len(body)})
+        offset += len(body)
+    index_bytes = json.dumps(index).encode("utf-8")
+    return b"".join(
+        [
+            SHARD_MAGIC,
+            struct.pack(">BI", SHARD_VERSION, len(index_bytes)),
+            index_bytes,
+            *[body for _, body in members],
+        ]
+    )
+
+
+class ReadShardTest(unittest.TestCase):
+    def test_crawler_shard(self) -> None:
+        self.assertEqual(MEMBERS, read_shard(crawler_shard(MEMBERS)))
+
+    def test_invalid_magic(self) -> None:
+        with self.assertRaises(TaeinStoreError):
+            read_shard(b"<html></html>")
+
+    def test_unsupported_version(self) -> None:
+        body = SHARD_MAGIC + struct.pack(">BI", SHARD_VERSION + 1, 2) + b"[]"
+        with self.assertRaises(TaeinStoreError):
+            read_shard(body)
+
+    def test_is_shard_key(self) -> None:
+        self.assertTrue(is_shard_key("taein/2020/서울/pages.shard"))
+        self.assertTrue(is_shard_key("taein/2020/서울/pages.shard.gz"))
+        self.assertFalse(is_shard_key("taein/2020/서울/a_bid_1.html"))
+
+    def test_archive_index_key(self) -> None:
+        self.assertEqual(
+            "compacted/dev/2020/10/서울.index.json",
+            archive_index_key("compacted/dev/2020/10/서울.shard.gz"),
+        )
+
+
+class ShardFileWriterTest(unittest.TestCase):
+    def test_write(self) -> None:
+        writer = ShardFileWriter()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "archive.shard.gz")
+            try:
+                for name, body in MEMBERS:
+                    writer.add(name, body)
+                writer.write(file_path)
+            finally:
+                writer.close()
+
+            with gzip.open(file_path, "rb") as f:
+                self.assertEqual(MEMBERS, read_shard(f.read()))
+
+
+class ShardCacheTest(unittest.TestCase):
+    def test_keeps_shards_within_max_bytes(self) -> None:
+        fetched = list()
+
+        def fetch(shard_key: str) -> dict:
+            fetched.append(shard_key)
+            return {"member": b"x" * 4}
+
+        cache = ShardCache(8)
+        cache.get("a", fetch)
+        cache.get("b", fetch)
+        cache.get("a", fetch)
+        self.assertEqual(["a", "b"], fetched)
+
+        # b 가 가장 오래 사용하지 않은 shard 이므로 버립니다
+        cache.get("c", fetch)
+        cache.get("a", fetch)
+        cache.get("b", fetch)
+        self.assertEqual(["a", "b", "c", "b"], fetched)
+        self.assertLessEqual(cache.total_bytes, 8)
+
+    def test_keeps_shard_larger_than_max_bytes(self) -> None:
+        cache = ShardCache(1)
+        members = cache.get("a", lambda key: {"member": b"large"})
+        self.assertEqual({"member": b"large"}, members)
+        self.assertEqual(["a"], list(cache.shards))
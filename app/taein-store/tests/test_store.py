@@ -0,0 +1,419 @@
+import gzip
+import json
+import threading
+import types
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from taein_store.store.exc import (
+    TaeinStoreAreaRangeNotFound,
+    TaeinStoreError,
+    TaeinStoreLeaseLost,
+    TaeinStoreS3NotFound,
+)
+from taein_store.store.data import (
+    LazyStatisticsRecord,
+    MulgunRecords,
+    StatisticsSection,
+)
+from taein_store.store.parse import TaeinParser
+from taein_store.store.prefetch import MulgunPages
+from taein_store.store.shard import ShardCache
+from taein_store.store.store import (
+    BID_FIELD_COLUMNS,
+    TaeinStore,
+    area_range_key,
+)
+
+from .test_data import bid_record, statistics_response
+from .test_prefetch import mulgun_nodes
+from .test_shard import crawler_shard
+
+
+def bare_store(**kwargs: object) -> TaeinStore:
+    """DB 와 S3 연결 없이 필요한 속성만 채운 TaeinStore 를 만듭니다."""
+    store = TaeinStore.__new__(TaeinStore)
+    store.config = {"ENVIRONMENT": "dev"}
+    store.s3_client = mock.Mock()
+    store.s3_client.get_objects.return_value = list()
+    store.region_level_1 = ""
+    store.reference_shards = dict()
+    store.archive_cache = ShardCache(1024)
+    store.run_entries = dict()
+    for name, value in kwargs.items():
+        setattr(store, name, value)
+    return store
+
+
+def s3_object(body: bytes) -> types.SimpleNamespace:
+    return types.SimpleNamespace(body=mock.Mock(read=lambda: body))
+
+
+def reference(key: str, member: str = None) -> bytes:
+    data = {"taein_ref": 1, "sha256": "abc", "key": key}
+    if member:
+        data["member"] = member
+    return json.dumps(data).encode("utf-8")
+
+
+class ResolveReferenceTest(unittest.TestCase):
+    def test_page(self) -> None:
+        store = bare_store()
+        self.assertEqual(b"<html>", store.resolve_reference(b"<html>"))
+        store.s3_client.get_object.assert_not_called()
+
+    def test_page_reference(self) -> None:
+        store = bare_store()
+        store.s3_client.get_object.return_value = s3_object(
+            gzip.compress(b"<html>")
+        )
+        body = store.resolve_reference(reference("taein/a_bid_1.html.gz"))
+        self.assertEqual(b"<html>", body)
+        store.s3_client.get_object.assert_called_once_with(
+            "taein/a_bid_1.html.gz"
+        )
+
+    def test_shard_reference_is_cached(self) -> None:
+        store = bare_store()
+        store.s3_client.get_object.return_value = s3_object(
+            crawler_shard(
+                [("a_bid_1.html", b"bid 1"), ("a_bid_2.html", b"bid 2")]
+            )
+        )
+        key = "taein/2020/pages.shard"
+        self.assertEqual(
+            b"bid 1", store.resolve_reference(reference(key, "a_bid_1.html"))
+        )
+        self.assertEqual(
+            b"bid 2", store.resolve_reference(reference(key, "a_bid_2.html"))
+        )
+        store.s3_client.get_object.assert_called_once_with(key)
+
+
+def run_entry(time_stamp: str, status: str) -> dict:
+    return {
+        "time_stamp": time_stamp,
+        "prefix": f"dev/2020/10/12/{time_stamp}/",
+        "status": status,
+        "run_by": "schedule",
+        "total_statistics": {"statistics_count": 1, "bids_count": 2},
+    }
+
+
+class RunCatalogTest(unittest.TestCase):
+    def create_store(self, entries: list) -> TaeinStore:
+        store = bare_store()
+        store.s3_client.get_object.return_value = s3_object(
+            json.dumps(entries).encode("utf-8")
+        )
+        return store
+
+    def test_last_entry_is_current_status(self) -> None:
+        store = self.create_store(
+            [
+                run_entry("200", "running"),
+                run_entry("100", "running"),
+                run_entry("100", "completed"),
+            ]
+        )
+        self.assertEqual(
+            [("100", "completed"), ("200", "running")],
+            [(x.time_stamp, x.status) for x in store.fetch_run_catalog()],
+        )
+        store.s3_client.get_object.assert_called_once_with(
+            "meta/dev/catalog/runs.json"
+        )
+
+    def test_without_catalog(self) -> None:
+        store = bare_store()
+        store.s3_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+        )
+        self.assertEqual([], store.fetch_run_catalog())
+
+    def test_fetch_catalog_runs(self) -> None:
+        store = self.create_store(
+            [
+                run_entry("100", "completed"),
+                run_entry("200", "failed"),
+                run_entry("300", "completed"),
+                run_entry("400", "completed"),
+            ]
+        )
+        self.assertEqual(
+            ["100", "300"],
+            [x.time_stamp for x in store.fetch_catalog_runs(100, 300)],
+        )
+
+    def test_compacted_entries_override_catalog(self) -> None:
+        store = bare_store()
+        compacted = dict(
+            run_entry("100", "compacted"),
+            compacted={"서울": "compacted/dev/2020/10/서울.shard.gz"},
+        )
+        objects = {
+            "meta/dev/catalog/runs.json": [
+                run_entry("100", "completed"),
+                run_entry("200", "completed"),
+            ],
+            "meta/dev/catalog/compacted/2020-10.json": [compacted],
+        }
+        store.s3_client.get_object.side_effect = lambda key: s3_object(
+            json.dumps(objects[key]).encode("utf-8")
+        )
+        store.s3_client.get_objects.return_value = [
+            types.SimpleNamespace(
+                contents=[{"Key": "meta/dev/catalog/compacted/2020-10.json"}]
+            )
+        ]
+
+        entries = store.fetch_run_catalog()
+        self.assertEqual(
+            [("100", "compacted"), ("200", "completed")],
+            [(x.time_stamp, x.status) for x in entries],
+        )
+        self.assertEqual(compacted["compacted"], entries[0].compacted)
+        store.s3_client.get_objects.assert_called_once_with(
+            "meta/dev/catalog/compacted/"
+        )
+
+    def test_fetch_log_prefix(self) -> None:
+        store = self.create_store([run_entry("100", "completed")])
+        self.assertEqual(
+            "dev/2020/10/12/100/", store.fetch_log_prefix("100")
+        )
+
+
+class CompactedTreeTest(unittest.TestCase):
+    def test_tree_from_archive_index(self) -> None:
+        store = bare_store()
+        archive_key = "compacted/dev/2020/10/서울.shard.gz"
+        entry = dict(run_entry("100", "compacted"))
+        entry["compacted"] = {"서울": archive_key}
+        objects = {
+            "meta/dev/catalog/runs.json": [entry],
+            "compacted/dev/2020/10/서울.index.json": [
+                "100/서울/강남구/개포동/아파트",
+                "200/서울/강남구/개포동/아파트",
+            ],
+        }
+        store.s3_client.get_object.side_effect = lambda key: s3_object(
+            json.dumps(objects[key]).encode("utf-8")
+        )
+
+        # 보관본의 버전은 목록 조회의 ETag 로 가져옵니다
+        store.s3_client.get_objects.side_effect = lambda prefix: (
+            [
+                types.SimpleNamespace(
+                    contents=[{"Key": archive_key, "ETag": '"abc"'}]
+                )
+            ]
+            if prefix == archive_key
+            else list()
+        )
+
+        tree = store.fetch_compacted_tree("dev/2020/10/12/100/")
+        [node] = tree.nodes("서울")
+        self.assertEqual(archive_key, node.archive_key)
+        self.assertEqual({archive_key: "abc"}, node.versions)
+        self.assertEqual("100/서울/강남구/개포동/아파트", node.archive_member)
+        # 트리를 만들 때는 보관본을 내려받지 않습니다
+        self.assertNotIn(
+            mock.call(archive_key), store.s3_client.get_object.call_args_list
+        )
+
+    def test_latest_compacted_run_skips_catalog(self) -> None:
+        store = bare_store()
+        archive_key = "compacted/dev/2020/10/서울.shard.gz"
+        entry = dict(run_entry("100", "compacted"))
+        entry["compacted"] = {"서울": archive_key}
+        objects = {
+            "meta/dev/catalog/LATEST.json": entry,
+            "compacted/dev/2020/10/서울.index.json": [
+                "100/서울/강남구/개포동/아파트"
+            ],
+        }
+        store.s3_client.get_object.side_effect = lambda key: s3_object(
+            json.dumps(objects[key]).encode("utf-8")
+        )
+
+        log_id_prefix = store.fetch_latest_log_prefix()
+        tree = store.fetch_compacted_tree(log_id_prefix)
+
+        [node] = tree.nodes("서울")
+        self.assertEqual(archive_key, node.archive_key)
+        # catalog 를 읽거나 목록을 조회하지 않습니다
+        self.assertEqual(
+            [mock.call(x) for x in objects],
+            store.s3_client.get_object.call_args_list,
+        )
+        store.s3_client.get_objects.assert_called_once_with(archive_key)
+
+
+class BidRowTest(unittest.TestCase):
+    def test_all_fields_are_stored(self) -> None:
+        store = bare_store(bid_dong_column="taein_dong_id")
+        row = store.bid_row(bid_record(), 10)
+        self.assertEqual(
+            set(BID_FIELD_COLUMNS.values()) | {"taein_dong_id"}, set(row)
+        )
+        self.assertEqual(10, row["taein_dong_id"])
+        self.assertEqual("2019타경12345", row["bid_event_number"])
+
+    def test_missing_key(self) -> None:
+        store = bare_store(bid_dong_column="taein_dong_id")
+        with self.assertRaises(TaeinStoreError):
+            store.bid_row(bid_record(bid_date=None), 10)
+        with self.assertRaises(TaeinStoreError):
+            store.bid_row(bid_record(bid_event_number=""), 10)
+
+    def test_key_columns(self) -> None:
+        store = bare_store(bid_dong_column="taein_dong_id")
+        self.assertEqual(
+            ["bid_event_number", "bid_date", "taein_dong_id"],
+            store.bid_key_columns(),
+        )
+
+
+class AreaRangeTest(unittest.TestCase):
+    def test_area_range_key(self) -> None:
+        self.assertEqual((0, 60), area_range_key("최소", "60"))
+        self.assertEqual((85, 1000), area_range_key(85, "최대"))
+        self.assertEqual((60, 85), area_range_key("60", 85))
+
+    def test_get_area_range(self) -> None:
+        store = bare_store(area_ranges={(0, 60): 1, (60, 85): 2})
+        self.assertEqual(1, store.get_area_range("최소", "60"))
+        with self.assertRaises(TaeinStoreAreaRangeNotFound):
+            store.get_area_range("85", "최대")
+
+
+class StoreStatisticsRecordTest(unittest.TestCase):
+    def test_sections_are_built_only_when_claimed(self) -> None:
+        store = bare_store(
+            config={"FORCE_LOAD": False},
+            area_ranges={(0, 40): 1},
+            statistics_claims=mock.Mock(),
+            region_resolver=mock.Mock(),
+            statistics_fingerprints=mock.Mock(),
+        )
+        # 시도 통계는 다른 동이 이미 저장했습니다
+        store.statistics_claims.claim.side_effect = lambda session, key: (
+            key[0] != "sido"
+        )
+        store.statistics_fingerprints.unchanged.return_value = False
+
+        with mock.patch.object(
+            StatisticsSection,
+            "from_values",
+            wraps=StatisticsSection.from_values,
+        ) as from_values, mock.patch(
+            "taein_store.store.store.TaeinStatistics"
+        ):
+            record = LazyStatisticsRecord.from_schema(statistics_response())
+            store.store_statistics_record(mock.Mock(), record, [], [])
+
+        # 읍면동과 구군 통계만 만듭니다
+        self.assertEqual(2, from_values.call_count)
+        self.assertNotIn("_sido", record.__dict__)
+        self.assertEqual(
+            ["gugun", "dong"],
+            [
+                x[0][1][0]
+                for x in store.statistics_fingerprints.record.call_args_list
+            ],
+        )
+
+
+class StoreRecordsTest(unittest.TestCase):
+    def test_check_before_each_dong(self) -> None:
+        store = bare_store(
+            config={"LOAD_WORKERS": 1}, session_factory=mock.Mock()
+        )
+        records = MulgunRecords(statistics_list=[], bid_list=[])
+        check = mock.Mock(side_effect=TaeinStoreLeaseLost("lost"))
+
+        with self.assertRaises(TaeinStoreLeaseLost):
+            store.store_records(
+                ((x, records) for x in mulgun_nodes(3)), check
+            )
+
+        check.assert_called_once_with()
+        store.session_factory.assert_not_called()
+
+    def test_refill_while_a_dong_is_slow(self) -> None:
+        store = bare_store(config={"LOAD_WORKERS": 2})
+        nodes = mulgun_nodes(6)
+        records = MulgunRecords(statistics_list=[], bid_list=[])
+        last_started = threading.Event()
+
+        def store_node_records(node, records, check) -> None:
+            # 첫 동은 마지막 동이 시작될 때까지 끝나지 않습니다
+            if node is nodes[0]:
+                self.assertTrue(last_started.wait(5))
+            if node is nodes[-1]:
+                last_started.set()
+
+        store.store_node_records = mock.Mock(side_effect=store_node_records)
+        store.store_records(((x, records) for x in nodes))
+
+        self.assertEqual(6, store.store_node_records.call_count)
+
+    def test_load_selected_nodes_stops_when_lease_is_lost(self) -> None:
+        nodes = mulgun_nodes(3)
+        records = MulgunRecords(statistics_list=[], bid_list=[])
+        prefetcher = mock.Mock()
+        prefetcher.map.side_effect = lambda nodes: (
+            MulgunPages(node=x, records=records) for x in nodes
+        )
+        store = bare_store(
+            config={"LOAD_WORKERS": 1, "FORCE_LOAD": True},
+            session_factory=mock.Mock(),
+            statistics_claims=mock.Mock(),
+            newest_run_filter=None,
+            region_resolver=mock.Mock(),
+            prefetcher=prefetcher,
+            parser=TaeinParser(1),
+            record_cache=None,
+            statistics_fingerprints=mock.Mock(),
+            bid_filter=None,
+        )
+        check = mock.Mock(side_effect=TaeinStoreLeaseLost("lost"))
+
+        with self.assertRaises(TaeinStoreLeaseLost):
+            store.load_selected_nodes("dev/2020/10/12/100/", nodes, check)
+
+        check.assert_called_once_with()
+        store.session_factory.assert_not_called()
+
+
+class RunTreeListingTest(unittest.TestCase):
+    def test_run_without_manifest(self) -> None:
+        store = bare_store()
+        store.fetch_manifest_tree = mock.Mock(return_value=None)
+        data_prefix = "dev/2020/10/12/100/data/"
+        store.s3_client.get_objects.return_value = [
+            types.SimpleNamespace(
+                contents=[
+                    {
+                        "Key": data_prefix + "서울/강남구/개포동/아파트/"
+                        "bid/a_bid_1.html",
+                        "ETag": '"abc"',
+                    }
+                ]
+            ),
+            types.SimpleNamespace(contents=None),
+        ]
+
+        tree = store.fetch_run_tree("dev/2020/10/12/100/")
+        [node] = tree.nodes("서울")
+        self.assertEqual(1, len(node.bid_keys))
+        store.s3_client.get_objects.assert_called_once_with(data_prefix)
+
+    def test_run_without_objects(self) -> None:
+        store = bare_store()
+        store.fetch_manifest_tree = mock.Mock(return_value=None)
+        with self.assertRaises(TaeinStoreS3NotFound):
+            store.fetch_run_tree("dev/2020/10/12/100/")
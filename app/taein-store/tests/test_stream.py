@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from taein_store.store.data import CrawlerRunEntry
+from taein_store.store.exc import TaeinStoreCrawlerFailed
+from taein_store.store.stream import FileQueueReader, TaeinStreamStore
+
+from .test_store import bare_store, run_entry
+
+
+def dong_complete(dong_name: str) -> dict:
+    return {
+        "sido": "서울",
+        "gugun": "강남구",
+        "dong": dong_name,
+        "mulgun": "아파트",
+        "data_type": "dong_complete",
+    }
+
+
+def bare_stream_store(**config) -> TaeinStreamStore:
+    stream_store = TaeinStreamStore.__new__(TaeinStreamStore)
+    stream_store.config = {
+        "STREAM_POLL_SECONDS": 30,
+        "STREAM_STALE_MINUTES": 60,
+        **config,
+    }
+    stream_store.store = bare_store(region_level_2="", region_level_3="")
+    stream_store.store.fetch_run_crawler_log = mock.Mock(return_value=None)
+    stream_store.store.load_selected_nodes = mock.Mock()
+    return stream_store
+
+
+class FileQueueReaderTest(unittest.TestCase):
+    def test_poll_complete_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "queue.jsonl")
+            reader = FileQueueReader(path, "100")
+            self.assertEqual([], reader.poll())
+
+            with open(path, "w") as f:
+                f.write('{"time_stamp": "100", "key": "a"}\n')
+                f.write('{"time_stamp": "200", "key": "b"}\n')
+                f.write('{"time_stamp": "100", "key": "c"')
+            self.assertEqual([{"key": "a"}], reader.poll())
+
+            # 끝까지 쓰인 줄은 다음 poll 에서 읽습니다
+            with open(path, "a") as f:
+                f.write("}\n")
+            self.assertEqual([{"key": "c"}], reader.poll())
+
+
+class FollowTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.entry = CrawlerRunEntry.from_json(run_entry("100", "running"))
+
+    def test_load_completed_dongs(self) -> None:
+        stream_store = bare_stream_store()
+        stream_store.fetch_run_status = mock.Mock(return_value="running")
+        source = mock.Mock()
+        source.poll.side_effect = [
+            [dong_complete("개포동"), dong_complete("역삼동")],
+            list(),
+        ]
+        # 동을 적재한 뒤 다시 확인했을 때 crawler-log 가 올라와 있습니다
+        stream_store.store.fetch_run_crawler_log.return_value = mock.Mock()
+
+        with mock.patch("time.sleep") as sleep:
+            self.assertEqual(2, stream_store.follow(source, self.entry))
+        sleep.assert_not_called()
+        [(_, nodes), _] = stream_store.store.load_selected_nodes.call_args
+        self.assertEqual(["개포동", "역삼동"], [x.dong_name for x in nodes])
+
+    def test_crawler_failed(self) -> None:
+        stream_store = bare_stream_store()
+        stream_store.fetch_run_status = mock.Mock(return_value="failed")
+        source = mock.Mock()
+        source.poll.return_value = list()
+
+        with self.assertRaises(TaeinStoreCrawlerFailed):
+            stream_store.follow(source, self.entry)
+
+    def test_stale_running_entry(self) -> None:
+        stream_store = bare_stream_store(STREAM_STALE_MINUTES=1)
+        # crawler 가 죽어서 running 으로 남은 실행입니다
+        stream_store.fetch_run_status = mock.Mock(return_value="running")
+        source = mock.Mock()
+        source.poll.return_value = list()
+
+        with mock.patch("time.sleep") as sleep, mock.patch(
+            "time.monotonic", side_effect=[0, 30, 61]
+        ):
+            with self.assertRaises(TaeinStoreCrawlerFailed):
+                stream_store.follow(source, self.entry)
+        self.assertEqual(1, sleep.call_count)
@@ -0,0 +1,112 @@
+import unittest
+
+from taein_store.store.exc import TaeinStoreRegionNotFound
+from taein_store.store.tree import (
+    RunTree,
+    etag_version,
+    parse_page_number,
+)
+
+REGION = dict(sido="서울", gugun="강남구", dong="개포동", mulgun="아파트")
+
+
+class RunTreeTest(unittest.TestCase):
+    def test_add_manifest_entry(self) -> None:
+        tree = RunTree()
+        for page in (2, 1):
+            tree.add_manifest_entry(
+                dict(
+                    REGION,
+                    key=f"taein/a_bid_{page}.html",
+                    data_type="bid",
+                    page=page,
+                    sha256=f"sha{page}",
+                    etag=f"etag{page}",
+                )
+            )
+        tree.add_manifest_entry(
+            dict(REGION, key="taein/a_statistics.html", data_type="statistics")
+        )
+        tree.add_manifest_entry(dict(REGION, data_type="dong_complete"))
+
+        [node] = tree.nodes("서울")
+        self.assertEqual(
+            ["taein/a_bid_1.html", "taein/a_bid_2.html"],
+            node.sorted_bid_keys(),
+        )
+        self.assertEqual(
+            ["taein/a_statistics.html"], node.sorted_statistics_keys()
+        )
+        # 목록 조회와 같은 ETag 를 버전으로 씁니다
+        self.assertEqual("etag1", node.versions["taein/a_bid_1.html"])
+
+    def test_select(self) -> None:
+        tree = RunTree()
+        tree.node("서울", "강남구", "개포동", "아파트")
+        tree.node("서울", "강남구", "대치동", "아파트")
+        tree.node("인천", "남구", "학익동", "아파트")
+        tree.node("인천", "미추홀구", "학익동", "아파트")
+
+        nodes = tree.select("", "", "")
+        self.assertEqual(
+            [
+                ("강남구", "개포동"),
+                ("강남구", "대치동"),
+                ("미추홀구", "학익동"),
+            ],
+            [(x.gugun_name, x.dong_name) for x in nodes],
+        )
+
+    def test_select_not_found(self) -> None:
+        tree = RunTree()
+        tree.node("서울", "강남구", "개포동", "아파트")
+        with self.assertRaises(TaeinStoreRegionNotFound):
+            tree.select("부산", "", "")
+        with self.assertRaises(TaeinStoreRegionNotFound):
+            tree.select("서울", "", "대치동")
+
+
+class AddObjectTest(unittest.TestCase):
+    def test_etag_version(self) -> None:
+        self.assertEqual("abc", etag_version('"abc"'))
+        self.assertIsNone(etag_version(None))
+
+    def test_parse_page_number(self) -> None:
+        self.assertEqual(0, parse_page_number("a_최소_40_statistics.html"))
+        self.assertEqual(60, parse_page_number("a_60_85_statistics.html"))
+        self.assertEqual(3, parse_page_number("a_bid_3.html"))
+        self.assertEqual(0, parse_page_number("records.jsonl"))
+
+    def test_add_object(self) -> None:
+        data_prefix = "dev/2020/10/12/100/data/"
+        tree = RunTree()
+        for key in (
+            "서울/강남구/개포동/아파트/a_60_85_statistics.html",
+            "서울/강남구/개포동/아파트/a_최소_40_statistics.html",
+            "서울/강남구/개포동/아파트/bid/a_bid_10.html",
+            "서울/강남구/개포동/아파트/bid/a_bid_2.html",
+            "서울/강남구/개포동/아파트/pages.shard.gz",
+            "서울/강남구/개포동/a.html",
+        ):
+            tree.add_object(data_prefix + key, data_prefix, f"etag-{key}")
+
+        [node] = tree.nodes("서울")
+        self.assertEqual(
+            [
+                data_prefix + "서울/강남구/개포동/아파트/a_최소_40_statistics.html",
+                data_prefix + "서울/강남구/개포동/아파트/a_60_85_statistics.html",
+            ],
+            node.sorted_statistics_keys(),
+        )
+        self.assertEqual(
+            [
+                data_prefix + "서울/강남구/개포동/아파트/bid/a_bid_2.html",
+                data_prefix + "서울/강남구/개포동/아파트/bid/a_bid_10.html",
+            ],
+            node.sorted_bid_keys(),
+        )
+        self.assertEqual(
+            data_prefix + "서울/강남구/개포동/아파트/pages.shard.gz",
+            node.shard_key,
+        )
+        self.assertEqual(5, len(node.versions))
@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+from taein_store.store.exc import TaeinStoreError, TaeinStoreLeaseLost
+from taein_store.store.tree import RunTree
+from taein_store.store.worker import TaeinStoreWorker
+
+from .test_prefetch import mulgun_nodes
+
+RUN_PREFIX = "dev/2020/10/12/100/"
+UNIT = ("서울", "강남구")
+
+
+def create_worker() -> TaeinStoreWorker:
+    worker = TaeinStoreWorker.__new__(TaeinStoreWorker)
+    worker.config = {"LEASE_POLL_SECONDS": 0}
+    worker.store = mock.Mock()
+    worker.queue = mock.Mock(ttl_seconds=300)
+    return worker
+
+
+class TaeinStoreWorkerTest(unittest.TestCase):
+    def test_complete_unit(self) -> None:
+        worker = create_worker()
+        nodes = mulgun_nodes(2)
+        worker.load_unit(RUN_PREFIX, UNIT, {UNIT: nodes}, RunTree())
+
+        args = worker.store.load_selected_nodes.call_args[0]
+        self.assertEqual((RUN_PREFIX, nodes), args[:2])
+        worker.queue.complete.assert_called_once_with(RUN_PREFIX, UNIT)
+
+    def test_abort_unit_when_lease_is_lost(self) -> None:
+        worker = create_worker()
+        worker.store.load_selected_nodes.side_effect = TaeinStoreLeaseLost(
+            "lost lease"
+        )
+        worker.load_unit(RUN_PREFIX, UNIT, {UNIT: mulgun_nodes(1)}, RunTree())
+
+        worker.queue.complete.assert_not_called()
+        worker.queue.release.assert_not_called()
+
+    def test_release_unit_on_error(self) -> None:
+        worker = create_worker()
+        worker.store.load_selected_nodes.side_effect = TaeinStoreError("db")
+        with self.assertRaises(TaeinStoreError):
+            worker.load_unit(
+                RUN_PREFIX, UNIT, {UNIT: mulgun_nodes(1)}, RunTree()
+            )
+
+        worker.queue.release.assert_called_once_with(RUN_PREFIX, UNIT)
+        worker.queue.complete.assert_not_called()
+
+    def test_report_failed_units(self) -> None:
+        worker = create_worker()
+        worker.config.update(ENVIRONMENT="dev", FORCE_LOAD=True)
+        worker.store.fetch_log_id_prefix.return_value = RUN_PREFIX
+        worker.store.fetch_load_tree.return_value.select.return_value = list()
+        worker.queue.acquire.return_value = None
+        worker.queue.remaining.return_value = 0
+        worker.queue.failed_units.return_value = [UNIT]
+
+        with mock.patch("taein_store.store.worker.init_store_db_schema"):
+            with self.assertRaises(TaeinStoreError):
+                worker.run("WORKER")
+
+        worker.queue.enqueue.assert_called_once_with(
+            RUN_PREFIX, dict(), force=True
+        )